@@ -0,0 +1,396 @@
+#!/usr/bin/env python3
+# script: analysis_daemon.py
+
+import os
+import sys
+import json
+import heapq
+import signal
+import socket
+import logging
+import importlib
+import socketserver
+import itertools
+import threading
+import multiprocessing
+from pathlib import Path
+from datetime import datetime
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+
+import event_journal
+
+# الوحدات الثقيلة التي تُحمّل مرة واحدة في العملية الأم وترثها عمليات المهام
+PRELOAD_MODULES = [
+    "git",
+    "networkx",
+    "matplotlib.pyplot",
+    "build_analysis",
+    "assemble_architecture",
+    "grade_assessment",
+    "mix_opportunities",
+    "render_concepts",
+    "export_deliverables",
+    "run_full_analysis"
+]
+
+# حالات المهام
+JOB_STATUSES = ["queued", "running", "completed", "failed", "cancelled"]
+FINAL_STATUSES = {"completed", "failed", "cancelled"}
+
+def preload_phase_modules(logger: logging.Logger) -> List[str]:
+    """تحميل وحدات المراحل مسبقاً حتى لا تدفع كل مهمة تكلفة الاستيراد البارد"""
+    # الخادم بلا واجهة رسومية
+    os.environ.setdefault("MPLBACKEND", "Agg")
+
+    loaded = []
+    for module in PRELOAD_MODULES:
+        try:
+            importlib.import_module(module)
+            loaded.append(module)
+        except Exception as e:
+            logger.warning(f"⚠️ تعذر التحميل المسبق لـ {module}: {e}")
+    return loaded
+
+@dataclass
+class AnalysisJob:
+    """مهمة تحليل في طابور الخادم"""
+    job_id: str
+    repo_url: str
+    branch: str
+    output_dir: str
+    priority: int = 0
+    status: str = "queued"
+    submitted_at: str = field(default_factory=lambda: datetime.now().isoformat())
+    started_at: Optional[str] = None
+    finished_at: Optional[str] = None
+    exit_code: Optional[int] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.job_id,
+            "repo_url": self.repo_url,
+            "branch": self.branch,
+            "output_dir": self.output_dir,
+            "priority": self.priority,
+            "status": self.status,
+            "submitted_at": self.submitted_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "exit_code": self.exit_code
+        }
+
+def _run_job_process(job: Dict[str, Any]) -> None:
+    """تشغيل مهمة داخل عملية متفرعة من العملية الأم الدافئة"""
+    from process_streaming import terminate_active_processes
+    from run_batch_analysis import _run_job
+
+    # مجموعة عمليات خاصة بالمهمة حتى يصل الإلغاء إلى git و npm وغيرهما
+    os.setpgrp()
+
+    def cancel(signum, frame):
+        # العمليات التي شغلها run_streaming في جلسات مستقلة تُنهى صراحةً
+        terminate_active_processes()
+        os._exit(128 + signum)
+
+    signal.signal(signal.SIGTERM, cancel)
+
+    result = _run_job(job)
+    sys.exit(0 if result["status"] == "success" else 1)
+
+class AnalysisDaemon:
+    """خادم تحليل طويل التشغيل مع طابور مهام بأولويات
+
+    تُحمّل وحدات المراحل مرة واحدة، وتعمل كل مهمة في عملية متفرعة
+    (fork) فترث الوحدات المحملة دون إعادة استيرادها، ويمكن إلغاؤها
+    بإنهاء مجموعة عملياتها.
+    """
+
+    def __init__(self, jobs_root: str, workers: int = 1, execution_mode: str = "inprocess",
+                 max_workers: Optional[int] = None, cache_dir: Optional[str] = None,
+                 clone_cache_dir: Optional[str] = None, history_file: Optional[str] = None,
+                 install_cache_dir: Optional[str] = None):
+        self.jobs_root = Path(jobs_root)
+        self.workers = max(1, workers)
+        self.execution_mode = execution_mode
+        self.max_workers = max_workers or max(1, (os.cpu_count() or 1) // self.workers)
+        self.cache_dir = cache_dir
+        self.clone_cache_dir = clone_cache_dir or str(self.jobs_root / "clone_cache")
+        self.history_file = history_file
+        self.install_cache_dir = install_cache_dir
+
+        logging.basicConfig(
+            level=logging.INFO,
+            format='%(asctime)s - %(levelname)s - %(message)s'
+        )
+        self.logger = logging.getLogger(__name__)
+
+        # fork يحتفظ بالوحدات المحملة، و spawn احتياطي للأنظمة التي لا تدعمه
+        methods = multiprocessing.get_all_start_methods()
+        self._context = multiprocessing.get_context("fork" if "fork" in methods else "spawn")
+
+        self.jobs: Dict[str, AnalysisJob] = {}
+        self._queue: List[Any] = []
+        self._processes: Dict[str, Any] = {}
+        self._sequence = itertools.count(1)
+        self._condition = threading.Condition()
+        self._stopping = False
+        self._dispatcher: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """تحميل الوحدات وبدء موزع المهام"""
+        self.jobs_root.mkdir(parents=True, exist_ok=True)
+
+        loaded = preload_phase_modules(self.logger)
+        self.logger.info(f"🔥 وحدات محملة مسبقاً: {', '.join(loaded)}")
+
+        self._dispatcher = threading.Thread(target=self._dispatch, daemon=True)
+        self._dispatcher.start()
+
+    def submit(self, repo_url: str, branch: str = "main", priority: int = 0) -> AnalysisJob:
+        """إضافة مهمة إلى الطابور (الأولوية الأعلى تُنفذ أولاً)"""
+        sequence = next(self._sequence)
+        job_id = f"RAMP-{datetime.now().strftime('%Y%m%d%H%M%S')}-{sequence:04d}"
+        job = AnalysisJob(
+            job_id=job_id,
+            repo_url=repo_url,
+            branch=branch,
+            output_dir=str(self.jobs_root / job_id),
+            priority=priority
+        )
+
+        with self._condition:
+            self.jobs[job_id] = job
+            heapq.heappush(self._queue, (-priority, sequence, job_id))
+            self._condition.notify_all()
+
+        self.logger.info(f"📥 مهمة جديدة {job_id}: {repo_url} ({branch}) أولوية {priority}")
+        return job
+
+    def cancel(self, job_id: str) -> Optional[AnalysisJob]:
+        """إلغاء مهمة في الطابور أو قيد التشغيل"""
+        with self._condition:
+            job = self.jobs.get(job_id)
+            if not job or job.status in FINAL_STATUSES:
+                return job
+
+            if job.status == "queued":
+                # تُتجاهل المهمة الملغاة عند سحبها من الطابور
+                job.status = "cancelled"
+                job.finished_at = datetime.now().isoformat()
+                self._condition.notify_all()
+            else:
+                job.status = "cancelled"
+                process = self._processes.get(job_id)
+                if process and process.pid:
+                    try:
+                        os.killpg(process.pid, signal.SIGTERM)
+                    except ProcessLookupError:
+                        # لم تنشئ العملية مجموعتها بعد
+                        process.terminate()
+
+        self.logger.info(f"🛑 إلغاء المهمة {job_id}")
+        return job
+
+    def status(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """حالة مهمة مع حالات مراحلها من سجل الأحداث"""
+        job = self.jobs.get(job_id)
+        if not job:
+            return None
+
+        data = job.to_dict()
+        journal = Path(job.output_dir) / "events.jsonl"
+        if journal.exists():
+            state = event_journal.fold_events(event_journal.read_events(str(journal)))
+            data["phases"] = state.get("phases", {})
+        return data
+
+    def list_jobs(self) -> List[Dict[str, Any]]:
+        """جميع المهام بترتيب الإرسال"""
+        with self._condition:
+            return [job.to_dict() for job in self.jobs.values()]
+
+    def _dispatch(self) -> None:
+        """سحب المهام من الطابور وتشغيلها عند توفر عامل"""
+        while True:
+            with self._condition:
+                while not self._stopping and (not self._queue or len(self._processes) >= self.workers):
+                    self._condition.wait()
+                if self._stopping:
+                    return
+
+                _, _, job_id = heapq.heappop(self._queue)
+                job = self.jobs[job_id]
+                if job.status != "queued":
+                    continue
+
+                process = self._context.Process(
+                    target=_run_job_process,
+                    args=(self._job_spec(job),),
+                    name=f"analysis-{job_id}"
+                )
+                process.start()
+
+                job.status = "running"
+                job.started_at = datetime.now().isoformat()
+                self._processes[job_id] = process
+
+            self.logger.info(f"🚀 تشغيل المهمة {job_id} (PID {process.pid})")
+            threading.Thread(target=self._watch, args=(job_id, process), daemon=True).start()
+
+    def _job_spec(self, job: AnalysisJob) -> Dict[str, Any]:
+        """وصف المهمة بالصيغة التي يتوقعها منفذ الدفعات"""
+        return {
+            "repo_url": job.repo_url,
+            "branch": job.branch,
+            "output_dir": job.output_dir,
+            "analysis_id": job.job_id,
+            "execution_mode": self.execution_mode,
+            "max_workers": self.max_workers,
+            "cache_dir": self.cache_dir,
+            "clone_cache_dir": self.clone_cache_dir,
+            "history_file": self.history_file,
+            "install_cache_dir": self.install_cache_dir
+        }
+
+    def _watch(self, job_id: str, process: Any) -> None:
+        """انتظار انتهاء عملية المهمة وتسجيل نتيجتها"""
+        process.join()
+
+        with self._condition:
+            job = self.jobs[job_id]
+            job.exit_code = process.exitcode
+            job.finished_at = datetime.now().isoformat()
+            if job.status != "cancelled":
+                job.status = "completed" if process.exitcode == 0 else "failed"
+            del self._processes[job_id]
+            self._condition.notify_all()
+
+        icon = "✅" if job.status == "completed" else "❌"
+        self.logger.info(f"{icon} المهمة {job_id}: {job.status}")
+
+    def stop(self) -> None:
+        """إيقاف الموزع وإلغاء المهام الجارية"""
+        with self._condition:
+            self._stopping = True
+            running = list(self._processes)
+            self._condition.notify_all()
+
+        for job_id in running:
+            self.cancel(job_id)
+
+class _DaemonRequestHandler(BaseHTTPRequestHandler):
+    """واجهة HTTP بسيطة بصيغة JSON لطابور المهام
+
+    POST /jobs              إرسال مهمة {"repo_url", "branch", "priority"}
+    GET /jobs               قائمة المهام
+    GET /jobs/<id>          حالة مهمة ومراحلها
+    DELETE /jobs/<id>       إلغاء مهمة
+    GET /health             فحص الخادم
+    """
+
+    analysis_daemon: AnalysisDaemon = None
+
+    def _send(self, status: int, payload: Any) -> None:
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _job_id(self) -> Optional[str]:
+        parts = self.path.strip("/").split("/")
+        if len(parts) == 2 and parts[0] == "jobs":
+            return parts[1]
+        return None
+
+    def do_GET(self):
+        if self.path.rstrip("/") == "/health":
+            self._send(200, {"status": "ok"})
+        elif self.path.rstrip("/") == "/jobs":
+            self._send(200, self.analysis_daemon.list_jobs())
+        else:
+            job = self.analysis_daemon.status(self._job_id() or "")
+            if job:
+                self._send(200, job)
+            else:
+                self._send(404, {"error": "مهمة غير موجودة"})
+
+    def do_POST(self):
+        if self.path.rstrip("/") != "/jobs":
+            self._send(404, {"error": "مسار غير معروف"})
+            return
+
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            request = json.loads(self.rfile.read(length) or b"{}")
+            job = self.analysis_daemon.submit(
+                request["repo_url"],
+                request.get("branch", "main"),
+                int(request.get("priority", 0))
+            )
+        except (KeyError, ValueError, TypeError) as e:
+            self._send(400, {"error": f"طلب غير صالح: {e}"})
+            return
+
+        self._send(202, job.to_dict())
+
+    def do_DELETE(self):
+        job = self.analysis_daemon.cancel(self._job_id() or "")
+        if job:
+            self._send(200, job.to_dict())
+        else:
+            self._send(404, {"error": "مهمة غير موجودة"})
+
+    def address_string(self) -> str:
+        # عميل مقبس Unix بلا عنوان
+        return self.client_address[0] if self.client_address else "unix"
+
+    def log_message(self, format: str, *args: Any) -> None:
+        logging.getLogger(__name__).debug(f"{self.address_string()} - {format % args}")
+
+class _UnixHTTPServer(ThreadingHTTPServer):
+    """خادم HTTP على مقبس Unix محلي"""
+    address_family = socket.AF_UNIX
+
+    def server_bind(self):
+        # HTTPServer.server_bind يفترض عنوان (host, port)
+        socketserver.TCPServer.server_bind(self)
+        self.server_name = "localhost"
+        self.server_port = 0
+
+def _create_server(listen: str) -> ThreadingHTTPServer:
+    """إنشاء الخادم من عنوان host:port أو unix:/path"""
+    if listen.startswith("unix:"):
+        path = listen[len("unix:"):]
+        if os.path.exists(path):
+            os.unlink(path)
+        return _UnixHTTPServer(path, _DaemonRequestHandler)
+
+    host, _, port = listen.rpartition(":")
+    return ThreadingHTTPServer((host or "127.0.0.1", int(port)), _DaemonRequestHandler)
+
+def serve(listen: str, daemon: AnalysisDaemon) -> None:
+    """تشغيل الخادم حتى المقاطعة"""
+    daemon.start()
+
+    _DaemonRequestHandler.analysis_daemon = daemon
+    server = _create_server(listen)
+    daemon.logger.info(f"🛰️ خادم التحليل يستمع على {listen} ({daemon.workers} عامل)")
+
+    def shutdown(signum, frame):
+        raise KeyboardInterrupt
+
+    signal.signal(signal.SIGTERM, shutdown)
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        daemon.logger.info("⏹️ إيقاف خادم التحليل...")
+    finally:
+        server.server_close()
+        daemon.stop()
+        if listen.startswith("unix:") and os.path.exists(listen[len("unix:"):]):
+            os.unlink(listen[len("unix:"):])
@@ -3,21 +3,49 @@
 
 import os
 import json
-import subprocess
 from pathlib import Path
-from typing import Dict, List, Any, Set, Tuple
-import ast
+from typing import Dict, List, Any, Optional, Set, Tuple
 import re
 import logging
 
+from file_inventory import FileInventory, load_inventory
+from graph_cycles import MAX_CYCLES, cyclic_components, elementary_cycles
+from graph_render import GRAPH_IMAGE_BASE, render_dependency_graph
+from js_imports import SOURCE_EXTENSIONS, extract_import_graph
+from module_graph import ModuleGraph
+from python_parser import parse_files
+
 class ArchitectureMapper:
     """راسم خرائط المعمارية والتبعيات"""
 
-    def __init__(self, repo_path: str, output_dir: str):
+    def __init__(self, repo_path: str, output_dir: str,
+                 artifacts: Optional[Dict[str, Any]] = None, max_workers: Optional[int] = None,
+                 max_cycles: int = MAX_CYCLES, parse_cache_dir: Optional[str] = None,
+                 layout_cache_dir: Optional[str] = None):
         self.repo_path = Path(repo_path)
         self.output_dir = Path(output_dir)
+        self.max_workers = max_workers
+        # حد تعداد الدورات الأولية (0 يكتفي بالمكونات المترابطة بقوة)
+        self.max_cycles = max_cycles
+        # ذاكرة نتائج تحليل ملفات Python (None يعطلها)
+        self.parse_cache_dir = parse_cache_dir
+        # تخطيطات المخطط البصري حسب تجزئة الرسم (None يعطلها)
+        self.layout_cache_dir = layout_cache_dir
+        # الرسم الأخير (CSR) لإنتاج المخطط البصري
+        self.graph: Optional[ModuleGraph] = None
         self.logger = logging.getLogger(__name__)
 
+        # نتائج المراحل السابقة في الذاكرة (مفتاحها المسار النسبي للملف)
+        self.artifacts = artifacts if artifacts is not None else {}
+        self._inventory: Optional[FileInventory] = None
+
+    @property
+    def inventory(self) -> FileInventory:
+        """جرد ملفات المستودع من مرحلة BUILD بدلاً من المرور على الشجرة"""
+        if self._inventory is None:
+            self._inventory = load_inventory(str(self.repo_path), str(self.output_dir), self.artifacts)
+        return self._inventory
+
     def generate_dependency_graph(self) -> Dict[str, Any]:
         """إنتاج خريطة التبعيات"""
         self.logger.info("🗺️ إنتاج خريطة التبعيات...")
@@ -26,6 +54,7 @@ class ArchitectureMapper:
             "modules": {},
             "dependencies": [],
             "circular_dependencies": [],
+            "cycles": [],
             "metrics": {
                 "total_modules": 0,
                 "total_connections": 0,
@@ -66,203 +95,139 @@ class ArchitectureMapper:
         )
 
     def _analyze_js_dependencies(self) -> Dict[str, Any]:
-        """تحليل تبعيات JavaScript/TypeScript"""
+        """تحليل تبعيات JavaScript/TypeScript بالمستخرج المدمج (بدلاً من madge)"""
+        # مجلد src كما كان مع madge، وإلا المستودع كله
+        root = "src" if (self.repo_path / "src").is_dir() else ""
+        prefix = f"{root}/" if root else ""
+
+        files = [
+            entry.path for entry in self.inventory.entries()
+            if not entry.is_vendored and entry.path.startswith(prefix)
+            and entry.extension in SOURCE_EXTENSIONS
+        ]
+
         try:
-            # استخدام madge لتحليل التبعيات
-            result = subprocess.run(
-                ["npx", "madge", "--json", str(self.repo_path / "src")],
-                capture_output=True,
-                text=True,
-                timeout=120,
-                cwd=self.repo_path
-            )
+            import_graph = extract_import_graph(self.repo_path, files, root, self.max_workers)
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"⚠️ فشل تحليل تبعيات JavaScript: {e}")
+            return {"modules": {}, "dependencies": [], "circular_dependencies": [], "cycles": []}
+
+        # الوحدات بمساراتها (نسبية إلى src كما في madge)
+        graph = ModuleGraph("module")
+        for module, deps in import_graph.items():
+            source = graph.add_module(module)
+            for dep, kind in deps.items():
+                graph.add_edge(source, graph.add_module(dep), kind)
+        graph.finalize()
+
+        self.logger.info(f"🔗 {len(graph)} ملف، {graph.edge_count} استيراد داخلي")
+
+        return self._graph_report(graph)
+
+    def _graph_report(self, graph: ModuleGraph) -> Dict[str, Any]:
+        """مخرج dependency_graph.json من الرسم: الوحدات والحواف والدورات والمؤشرات"""
+        self.graph = graph
+        cycle_report = self._detect_circular_dependencies(graph)
+        metrics = self._calculate_dependency_metrics(graph)
+        metrics.update(cycle_report.pop("metrics"))
 
-            if result.returncode == 0:
-                madge_data = json.loads(result.stdout)
-
-                # تحويل بيانات madge إلى تنسيق موحد
-                modules = {}
-                dependencies = []
-
-                for module, deps in madge_data.items():
-                    module_name = Path(module).stem
-                    modules[module_name] = {
-                        "path": module,
-                        "type": "module",
-                        "dependencies": deps,
-                        "dependents": []
-                    }
-
-                    for dep in deps:
-                        dep_name = Path(dep).stem
-                        dependencies.append({
-                            "from": module_name,
-                            "to": dep_name,
-                            "type": "import"
-                        })
-
-                # حساب التبعيات العكسية
-                for dep in dependencies:
-                    if dep["to"] in modules:
-                        modules[dep["to"]]["dependents"].append(dep["from"])
-
-                # كشف التبعيات الدورية
-                circular = self._detect_circular_dependencies(dependencies)
-
-                return {
-                    "modules": modules,
-                    "dependencies": dependencies,
-                    "circular_dependencies": circular,
-                    "metrics": self._calculate_dependency_metrics(modules, dependencies)
-                }
-
-        except (subprocess.TimeoutExpired, json.JSONDecodeError, FileNotFoundError):
-            self.logger.warning("⚠️ فشل تحليل تبعيات JavaScript")
-
-        return {"modules": {}, "dependencies": [], "circular_dependencies": []}
+        return {
+            **graph.to_dict(),
+            **cycle_report,
+            "metrics": metrics
+        }
 
     def _analyze_python_dependencies(self) -> Dict[str, Any]:
         """تحليل تبعيات Python"""
-        modules = {}
-        dependencies = []
+        # فحص ملفات Python بعمليات متوازية، مع إعادة استخدام نتائج الملفات غير المتغيرة
+        py_files = [
+            py_file for py_file in self.inventory.rglob("*.py")
+            if not any(part.startswith('.') for part in py_file.parts)
+        ]
+        results, workers = parse_files(py_files, self.max_workers, self.parse_cache_dir)
 
-        # فحص ملفات Python
-        for py_file in self.repo_path.rglob("*.py"):
-            if any(part.startswith('.') for part in py_file.parts):
+        parsed = []
+        cached = 0
+        for py_file, result, error, from_cache in results:
+            if result is None:
+                self.logger.warning(f"⚠️ تعذر تحليل {py_file}: {error}")
                 continue
-
-            module_name = py_file.stem
-            relative_path = py_file.relative_to(self.repo_path)
-
-            try:
-                with open(py_file, 'r', encoding='utf-8') as f:
-                    content = f.read()
-
-                # تحليل الـ imports
-                tree = ast.parse(content)
-                imports = self._extract_python_imports(tree)
-
-                modules[module_name] = {
-                    "path": str(relative_path),
-                    "type": "python_module",
-                    "dependencies": imports,
-                    "dependents": [],
-                    "functions": self._extract_python_functions(tree),
-                    "classes": self._extract_python_classes(tree)
-                }
-
-                for imp in imports:
-                    dependencies.append({
-                        "from": module_name,
-                        "to": imp,
-                        "type": "import"
-                    })
-
-            except (SyntaxError, UnicodeDecodeError) as e:
-                self.logger.warning(f"⚠️ تعذر تحليل {py_file}: {e}")
-
-        # حساب التبعيات العكسية
-        for dep in dependencies:
-            if dep["to"] in modules:
-                modules[dep["to"]]["dependents"].append(dep["from"])
-
-        circular = self._detect_circular_dependencies(dependencies)
+            cached += from_cache
+            parsed.append((Path(py_file).relative_to(self.repo_path).as_posix(), result))
+
+        self.logger.info(f"🐍 {len(parsed)} ملف Python ({cached} من الذاكرة المؤقتة، {workers} عملية)")
+
+        # الاستيراد يُحل إلى وحدة المستودع ذات الاسم نفسه (الأقرب إلى الجذر)،
+        # وإلا يبقى هدفاً خارجياً باسم الحزمة
+        local_modules: Dict[str, str] = {}
+        for relative_path, _ in sorted(parsed, key=lambda item: (item[0].count("/"), item[0])):
+            path = Path(relative_path)
+            name = path.parent.name if path.stem == "__init__" else path.stem
+            local_modules.setdefault(name, relative_path)
+
+        graph = ModuleGraph("python_module")
+        for relative_path, result in parsed:
+            source = graph.add_module(
+                relative_path, functions=result["functions"], classes=result["classes"], methods=result["methods"]
+            )
+            for imp in result["imports"]:
+                target = local_modules.get(imp)
+                graph.add_edge(source, graph.add_module(target or imp, internal=bool(target)))
+        graph.finalize()
+
+        return self._graph_report(graph)
+
+    def _detect_circular_dependencies(self, graph: ModuleGraph) -> Dict[str, Any]:
+        """كشف التبعيات الدورية
+
+        كل مكون مترابط بقوة يحتوي دورة يُعد تبعية دورية واحدة مع وحداته
+        وحوافه الداخلية، والدورات الأولية تُعدد بعدها حتى max_cycles.
+        """
+        names = graph.paths
+        components = cyclic_components(graph)
+
+        circular = []
+        for component in components:
+            members = set(component)
+            circular.append({
+                "modules": sorted(names[i] for i in component),
+                "size": len(component),
+                "edges": sorted(
+                    [names[a], names[b]] for a in component for b in graph.successors(a) if b in members
+                )
+            })
+        circular.sort(key=lambda c: c["size"], reverse=True)
+
+        # دورة إضافية بعد الحد تدل على أن التعداد اقتُطع
+        cycles = [
+            [names[i] for i in cycle] + [names[cycle[0]]]
+            for cycle in elementary_cycles(graph, components, self.max_cycles + 1)
+        ] if self.max_cycles else []
+        truncated = len(cycles) > self.max_cycles
 
         return {
-            "modules": modules,
-            "dependencies": dependencies,
             "circular_dependencies": circular,
-            "metrics": self._calculate_dependency_metrics(modules, dependencies)
+            "cycles": cycles[:self.max_cycles],
+            "metrics": {
+                "cyclic_components": len(circular),
+                "modules_in_cycles": sum(c["size"] for c in circular),
+                "largest_cycle_component": circular[0]["size"] if circular else 0,
+                "elementary_cycles": min(len(cycles), self.max_cycles),
+                "cycles_truncated": truncated
+            }
         }
 
-    def _extract_python_imports(self, tree: ast.AST) -> List[str]:
-        """استخراج الـ imports من AST"""
-        imports = []
-
-        for node in ast.walk(tree):
-            if isinstance(node, ast.Import):
-                for alias in node.names:
-                    imports.append(alias.name.split('.')[0])
-            elif isinstance(node, ast.ImportFrom):
-                if node.module:
-                    imports.append(node.module.split('.')[0])
-
-        return list(set(imports))
-
-    def _extract_python_functions(self, tree: ast.AST) -> List[str]:
-        """استخراج أسماء الدوال"""
-        functions = []
-
-        for node in ast.walk(tree):
-            if isinstance(node, ast.FunctionDef):
-                functions.append(node.name)
-
-        return functions
-
-    def _extract_python_classes(self, tree: ast.AST) -> List[str]:
-        """استخراج أسماء الفئات"""
-        classes = []
-
-        for node in ast.walk(tree):
-            if isinstance(node, ast.ClassDef):
-                classes.append(node.name)
-
-        return classes
-
-    def _detect_circular_dependencies(self, dependencies: List[Dict]) -> List[List[str]]:
-        """كشف التبعيات الدورية"""
-        # بناء الرسم البياني
-        graph = {}
-        for dep in dependencies:
-            if dep["from"] not in graph:
-                graph[dep["from"]] = []
-            graph[dep["from"]].append(dep["to"])
-
-        # البحث عن الدورات
-        visited = set()
-        rec_stack = set()
-        cycles = []
-
-        def dfs(node: str, path: List[str]) -> None:
-            if node in rec_stack:
-                # عثرنا على دورة
-                cycle_start = path.index(node)
-                cycle = path[cycle_start:] + [node]
-                cycles.append(cycle)
-                return
-
-            if node in visited:
-                return
-
-            visited.add(node)
-            rec_stack.add(node)
-            path.append(node)
-
-            for neighbor in graph.get(node, []):
-                dfs(neighbor, path[:])
-
-            rec_stack.remove(node)
-            path.pop()
-
-        for node in graph:
-            if node not in visited:
-                dfs(node, [])
-
-        return cycles
-
-    def _calculate_dependency_metrics(self, modules: Dict, dependencies: List[Dict]) -> Dict[str, Any]:
+    def _calculate_dependency_metrics(self, graph: ModuleGraph) -> Dict[str, Any]:
         """حساب مؤشرات التبعيات"""
-        if not modules:
+        internal = list(graph.internal_nodes())
+        if not internal:
             return {"total_modules": 0, "total_connections": 0, "coupling_score": 0.0}
 
-        total_modules = len(modules)
-        total_connections = len(dependencies)
-
-        # حساب متوسط الـ coupling
+        # حساب متوسط الـ coupling من درجات CSR
         coupling_scores = []
-        for module_name, module_data in modules.items():
-            efferent = len(module_data.get("dependencies", []))  # صادر
-            afferent = len(module_data.get("dependents", []))    # وارد
+        for node in internal:
+            efferent = graph.out_degree(node)  # صادر
+            afferent = graph.in_degree(node)   # وارد
 
             if efferent + afferent > 0:
                 instability = efferent / (efferent + afferent)
@@ -271,8 +236,8 @@ class ArchitectureMapper:
         avg_coupling = sum(coupling_scores) / len(coupling_scores) if coupling_scores else 0.0
 
         return {
-            "total_modules": total_modules,
-            "total_connections": total_connections,
+            "total_modules": len(internal),
+            "total_connections": graph.edge_count,
             "average_coupling": round(avg_coupling, 3),
             "coupling_distribution": {
                 "low": len([s for s in coupling_scores if s < 0.3]),
@@ -282,50 +247,25 @@ class ArchitectureMapper:
         }
 
     def _generate_visual_graph(self, graph_data: Dict[str, Any]) -> None:
-        """إنتاج مخطط بصري للتبعيات"""
-        try:
-            import matplotlib.pyplot as plt
-            import networkx as nx
-
-            # إنشاء الرسم البياني
-            G = nx.DiGraph()
-
-            # إضافة العقد
-            for module_name in graph_data["modules"].keys():
-                G.add_node(module_name)
-
-            # إضافة الحواف
-            for dep in graph_data["dependencies"]:
-                G.add_edge(dep["from"], dep["to"])
-
-            # رسم المخطط
-            plt.figure(figsize=(15, 10))
-            pos = nx.spring_layout(G, k=1, iterations=50)
-
-            # رسم العقد
-            nx.draw_networkx_nodes(G, pos, node_color='lightblue',
-                                 node_size=1000, alpha=0.7)
-
-            # رسم الحواف
-            nx.draw_networkx_edges(G, pos, edge_color='gray',
-                                 arrows=True, arrowsize=20)
+        """إنتاج مخطط بصري للتبعيات (DOT و PNG و SVG) من الرسم المكثف"""
+        if self.graph is None or not len(self.graph):
+            return
 
-            # إضافة التسميات
-            nx.draw_networkx_labels(G, pos, font_size=8)
-
-            plt.title("خريطة التبعيات", fontsize=16)
-            plt.axis('off')
-            plt.tight_layout()
+        try:
+            output_base = self.output_dir / GRAPH_IMAGE_BASE
+            summary = render_dependency_graph(self.graph, str(output_base), self.layout_cache_dir)
+            graph_data["visualization"] = summary
 
-            # حفظ المخطط
-            output_path = self.output_dir / "artifacts/assemble/dependency_graph.png"
-            plt.savefig(output_path, dpi=300, bbox_inches='tight')
-            plt.close()
+            if "png" not in summary["formats"]:
+                self.logger.warning("⚠️ matplotlib غير متوفر لإنتاج المخططات البصرية (DOT فقط)")
+                return
 
-            self.logger.info(f"✅ تم حفظ المخطط البصري: {output_path}")
+            cached = " (تخطيط مخزن)" if summary["layout_cached"] else ""
+            self.logger.info(
+                f"✅ تم حفظ المخطط البصري: {output_base}.png - {summary['visible_nodes']} عقدة "
+                f"بمستوى {summary['level']}{cached}"
+            )
 
-        except ImportError:
-            self.logger.warning("⚠️ matplotlib أو networkx غير متوفر لإنتاج المخططات البصرية")
         except Exception as e:
             self.logger.error(f"❌ خطأ في إنتاج المخطط البصري: {e}")
 
@@ -341,10 +281,10 @@ class ArchitectureMapper:
         }
 
         # البحث عن ملفات OpenAPI/Swagger
-        openapi_files = list(self.repo_path.rglob("*openapi*.yml")) + \
-                       list(self.repo_path.rglob("*swagger*.yml")) + \
-                       list(self.repo_path.rglob("*openapi*.yaml")) + \
-                       list(self.repo_path.rglob("*swagger*.yaml"))
+        openapi_files = self.inventory.rglob("*openapi*.yml") + \
+                       self.inventory.rglob("*swagger*.yml") + \
+                       self.inventory.rglob("*openapi*.yaml") + \
+                       self.inventory.rglob("*swagger*.yaml")
 
         for api_file in openapi_files:
             try:
@@ -359,8 +299,7 @@ class ArchitectureMapper:
                 self.logger.warning(f"⚠️ تعذر قراءة {api_file}: {e}")
 
         # البحث عن ملفات GraphQL
-        graphql_files = list(self.repo_path.rglob("*.graphql")) + \
-                       list(self.repo_path.rglob("*.gql"))
+        graphql_files = self.inventory.with_suffix(".graphql", ".gql")
 
         for gql_file in graphql_files:
             try:
@@ -377,7 +316,7 @@ class ArchitectureMapper:
                 self.logger.warning(f"⚠️ تعذر قراءة {gql_file}: {e}")
 
         # البحث عن ملفات Proto (gRPC)
-        proto_files = list(self.repo_path.rglob("*.proto"))
+        proto_files = self.inventory.with_suffix(".proto")
 
         for proto_file in proto_files:
             try:
@@ -415,47 +354,54 @@ class ArchitectureMapper:
         ]
 
         # فحص ملفات الكود
-        for code_file in self.repo_path.rglob("*"):
-            if code_file.suffix in ['.py', '.java', '.js', '.ts', '.kt']:
-                try:
-                    with open(code_file, 'r', encoding='utf-8') as f:
-                        content = f.read()
-
-                        for pattern in patterns:
-                            matches = re.finditer(pattern, content, re.IGNORECASE)
-                            for match in matches:
-                                if len(match.groups()) >= 2:
-                                    path = match.group(1) if match.group(1).startswith('/') else match.group(2)
-                                    method = match.group(2) if match.group(1).startswith('/') else match.group(1)
-
-                                    endpoints.append({
-                                        "path": path,
-                                        "method": method.upper(),
-                                        "file": str(code_file.relative_to(self.repo_path)),
-                                        "line": content[:match.start()].count('\n') + 1
-                                    })
-
-                except (UnicodeDecodeError, Exception):
-                    continue
+        for code_file in self.inventory.with_suffix('.py', '.java', '.js', '.ts', '.kt'):
+            try:
+                with open(code_file, 'r', encoding='utf-8') as f:
+                    content = f.read()
+
+                    for pattern in patterns:
+                        matches = re.finditer(pattern, content, re.IGNORECASE)
+                        for match in matches:
+                            if len(match.groups()) >= 2:
+                                path = match.group(1) if match.group(1).startswith('/') else match.group(2)
+                                method = match.group(2) if match.group(1).startswith('/') else match.group(1)
+
+                                endpoints.append({
+                                    "path": path,
+                                    "method": method.upper(),
+                                    "file": str(code_file.relative_to(self.repo_path)),
+                                    "line": content[:match.start()].count('\n') + 1
+                                })
+
+            except (UnicodeDecodeError, Exception):
+                continue
 
         return endpoints
 
 def main():
     """الدالة الرئيسية"""
-    import sys
-
-    if len(sys.argv) < 3:
-        print("الاستخدام: python assemble_architecture.py <repo_path> <output_dir>")
-        sys.exit(1)
-
-    repo_path = sys.argv[1]
-    output_dir = sys.argv[2]
-
-    mapper = ArchitectureMapper(repo_path, output_dir)
-
-    # تشغيل التحليل
-    mapper.generate_dependency_graph()
-    mapper.analyze_api_interfaces()
+    import argparse
+
+    parser = argparse.ArgumentParser(description="خريطة التبعيات وتحليل واجهات API")
+    parser.add_argument("repo_path")
+    parser.add_argument("output_dir")
+    parser.add_argument("step", nargs="?", default="all", choices=["all", "graph", "api"])
+    parser.add_argument("--workers", type=int, help="حد العمليات لتحليل الملفات (ميزانية المرحلة)")
+    parser.add_argument("--parse-cache-dir", help="ذاكرة نتائج تحليل ملفات Python")
+    parser.add_argument("--layout-cache-dir", help="ذاكرة تخطيطات المخطط البصري")
+    args = parser.parse_args()
+    step = args.step
+
+    mapper = ArchitectureMapper(
+        args.repo_path, args.output_dir, max_workers=args.workers,
+        parse_cache_dir=args.parse_cache_dir, layout_cache_dir=args.layout_cache_dir
+    )
+
+    # تشغيل التحليل (يمكن تشغيل كل جزء منفصلاً بالتوازي)
+    if step in ("all", "graph"):
+        mapper.generate_dependency_graph()
+    if step in ("all", "api"):
+        mapper.analyze_api_interfaces()
 
     print("✅ تمت مرحلة التجميع بنجاح")
 
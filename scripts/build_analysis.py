@@ -1,23 +1,69 @@
 #!/usr/bin/env python3
 # script: build_analysis.py
 
-import os
 import git
 import json
+import re
+import hashlib
+import time
+import shutil
 import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, List, Any
+from typing import Any, Callable, Dict, List, Optional, Tuple
 import logging
 
+from file_inventory import INVENTORY_ARTIFACT, INVENTORY_MODES, VENDORED_DIRS, FileInventory, build_inventory
+from git_history import HISTORY_ARTIFACT, HistoryAnalyzer
+from git_metadata import GitMetadata
+from install_cache import InstallCache, tool_version
+from line_counter import count_lines
+from lockfile_analyzer import LOCKFILE_ARTIFACT, analyze_lockfile
+from process_streaming import run_streaming
+
 class RepositoryAnalyzer:
     """محلل شامل للمستودعات البرمجية"""
 
-    def __init__(self, repo_url: str, output_dir: str, branch: str = "main"):
+    def __init__(self, repo_url: str, output_dir: str, branch: str = "main",
+                 clone_cache_dir: Optional[str] = None, clone_depth: Optional[int] = None,
+                 clone_filter: Optional[str] = None, sparse_paths: Optional[List[str]] = None,
+                 max_workers: Optional[int] = None, inventory_mode: str = "auto",
+                 install_cache_dir: Optional[str] = None, blob_counts_file: Optional[str] = None,
+                 use_existing_checkout: bool = False):
         self.repo_url = repo_url
         self.output_dir = Path(output_dir)
         self.branch = branch
         self.repo_path = self.output_dir / "repository"
 
+
+        # مجلد مرايا محلية مشتركة بين التحليلات لتجنب الاستنساخ الكامل من الشبكة
+        self.clone_cache_dir = Path(clone_cache_dir) if clone_cache_dir else None
+
+        # خيارات تقليل حجم الاستنساخ: عمق التاريخ (shallow)، ترشيح الكائنات
+        # (partial، مثل blob:none) ومسارات العمل المحددة (sparse checkout)
+        self.clone_depth = clone_depth
+        self.clone_filter = clone_filter
+        self.sparse_paths = sparse_paths or []
+
+        # ذاكرة مؤقتة لتثبيت التبعيات معنونة بملفات القفل (اختيارية)
+        self.install_cache = InstallCache(install_cache_dir) if install_cache_dir else None
+
+        # حد المعالجات لإحصاء الأسطر
+        self.max_workers = max_workers
+
+        # عدادات أسطر محسوبة مسبقاً لكل كائن git (تحليل عدة فروع)
+        self.blob_counts_file = blob_counts_file
+
+        # نسخة عمل جاهزة ومحدّثة مسبقاً (worktree لتحليل عدة فروع): لا pull ولا شبكة،
+        # فعمليات pull المتوازية على .git المشترك تتسابق على أقفال المراجع
+        self.use_existing_checkout = use_existing_checkout
+
+        # جرد ملفات المستودع (يُبنى مرة واحدة في analyze_codebase_structure)
+        # من فهرس git افتراضياً حتى لا تدخله الملفات المتجاهلة
+        self.inventory_mode = inventory_mode
+        self.inventory: Optional[FileInventory] = None
+
         # إعداد التسجيل
         logging.basicConfig(
             level=logging.INFO,
@@ -30,33 +76,38 @@ class RepositoryAnalyzer:
         try:
             self.logger.info(f"🔄 استنساخ المستودع: {self.repo_url}")
 
-            if self.repo_path.exists():
+            if self.repo_path.exists() and self.use_existing_checkout:
+                self.logger.info("📁 استخدام نسخة العمل الموجودة دون تحديث")
+            elif self.repo_path.exists():
                 self.logger.info("📁 المستودع موجود، تحديث...")
                 repo = git.Repo(self.repo_path)
                 repo.remotes.origin.pull()
+            elif self.clone_cache_dir:
+                repo = self._clone_from_cache()
             else:
                 repo = git.Repo.clone_from(
                     self.repo_url,
                     self.repo_path,
-                    branch=self.branch
+                    branch=self.branch,
+                    **self._clone_options()
                 )
+                self._apply_sparse_checkout(repo)
 
-            # الحصول على معلومات الالتزام
-            commit_info = {
-                "sha": repo.head.commit.hexsha,
-                "message": repo.head.commit.message.strip(),
-                "author": str(repo.head.commit.author),
-                "date": repo.head.commit.committed_datetime.isoformat()
-            }
+            # معلومات الالتزام والمراجع دون إنشاء كائن لكل التزام في التاريخ
+            with GitMetadata(self.repo_path) as metadata:
+                summary = metadata.summary()
 
             # حفظ معلومات المستودع
             repo_info = {
                 "url": self.repo_url,
                 "branch": self.branch,
-                "last_commit": commit_info,
-                "total_commits": len(list(repo.iter_commits())),
-                "branches": [str(branch) for branch in repo.branches],
-                "tags": [str(tag) for tag in repo.tags]
+                "clone": {
+                    "depth": self.clone_depth,
+                    "filter": self.clone_filter,
+                    "sparse_paths": self.sparse_paths,
+                    "shallow": summary.pop("shallow")
+                },
+                **summary
             }
 
             with open(self.output_dir / "artifacts/build/repo_info.json", "w") as f:
@@ -69,26 +120,103 @@ class RepositoryAnalyzer:
             self.logger.error(f"❌ خطأ في استنساخ المستودع: {e}")
             return False
 
-    def analyze_codebase_structure(self) -> Dict[str, Any]:
-        """تحليل هيكل قاعدة الكود"""
-        self.logger.info("🔍 تحليل هيكل قاعدة الكود...")
+    def _clone_from_cache(self) -> git.Repo:
+        """الاستنساخ من مرآة محلية مشتركة بعد تحديثها"""
+        import fcntl
 
-        # تشغيل cloc لإحصاء الأسطر
-        try:
-            cloc_result = subprocess.run(
-                ["cloc", str(self.repo_path), "--json"],
-                capture_output=True,
-                text=True,
-                timeout=120
+        self.clone_cache_dir.mkdir(parents=True, exist_ok=True)
+        key = hashlib.sha256(self.repo_url.encode("utf-8")).hexdigest()[:16]
+        mirror_path = self.clone_cache_dir / f"{key}.git"
+
+        # قفل لكل مرآة لأن عدة تحليلات متوازية قد تستهدف المستودع نفسه
+        with open(self.clone_cache_dir / f"{key}.lock", "w") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+
+            if mirror_path.exists():
+                self.logger.info("📦 تحديث المرآة المحلية...")
+                git.Repo(mirror_path).git.fetch("--prune", "origin")
+            else:
+                self.logger.info("📦 إنشاء مرآة محلية للمستودع...")
+                git.Repo.clone_from(self.repo_url, mirror_path, mirror=True)
+
+            # الاستنساخ المحلي يستخدم روابط صلبة للكائنات فلا يلمس الشبكة، لذا
+            # لا يُطبق العمق أو الترشيح هنا (يتطلبان نسخ الكائنات عبر file://)
+            repo = git.Repo.clone_from(
+                str(mirror_path), self.repo_path, branch=self.branch,
+                **({"sparse": True} if self.sparse_paths else {})
             )
 
-            if cloc_result.returncode == 0:
-                cloc_data = json.loads(cloc_result.stdout)
+        repo.remotes.origin.set_url(self.repo_url)
+        self._apply_sparse_checkout(repo)
+        return repo
+
+    def _clone_options(self) -> Dict[str, Any]:
+        """خيارات git clone حسب وضع الاستنساخ"""
+        options: Dict[str, Any] = {}
+        if self.clone_depth:
+            options["depth"] = self.clone_depth
+        if self.clone_filter:
+            options["filter"] = self.clone_filter
+        if self.sparse_paths:
+            options["sparse"] = True
+        return options
+
+    def _apply_sparse_checkout(self, repo: git.Repo) -> None:
+        """قصر شجرة العمل على المسارات المحددة"""
+        if self.sparse_paths:
+            self.logger.info(f"🌿 sparse checkout: {', '.join(self.sparse_paths)}")
+            repo.git.sparse_checkout("set", *self.sparse_paths)
+
+    def deepen_history(self, depth: Optional[int] = None) -> bool:
+        """تعميق استنساخ سطحي عند الطلب للمراحل التي تحتاج التاريخ
+
+        بدون depth يُجلب التاريخ كاملاً، وإلا يُضاف depth التزاماً.
+        """
+        try:
+            if not GitMetadata(self.repo_path).is_shallow():
+                return True
+
+            repo = git.Repo(self.repo_path)
+            self.logger.info("📜 تعميق تاريخ المستودع...")
+            if depth:
+                repo.git.fetch(f"--deepen={depth}", "origin", self.branch)
             else:
-                cloc_data = {"error": "فشل تشغيل cloc"}
+                repo.git.fetch("--unshallow", "origin", self.branch)
+            return True
+
+        except Exception as e:
+            self.logger.error(f"❌ خطأ في تعميق تاريخ المستودع: {e}")
+            return False
+
+    def analyze_history(self) -> Dict[str, Any]:
+        """تحليل تاريخ التعديلات: النقاط الساخنة واقتران الملفات"""
+        self.logger.info("📜 تحليل تاريخ التعديلات...")
 
-        except (subprocess.TimeoutExpired, json.JSONDecodeError, FileNotFoundError):
-            cloc_data = {"error": "cloc غير متوفر"}
+        report = HistoryAnalyzer(str(self.repo_path)).analyze().report()
+
+        with open(self.output_dir / HISTORY_ARTIFACT, "w") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+
+        self.logger.info(
+            f"🔥 {report['total_commits']} التزام، {len(report['hotspots'])} نقطة ساخنة، "
+            f"{len(report['coupling'])} زوج مقترن"
+        )
+        return report
+
+    def analyze_codebase_structure(self) -> Dict[str, Any]:
+        """تحليل هيكل قاعدة الكود"""
+        self.logger.info("🔍 تحليل هيكل قاعدة الكود...")
+
+        # جرد الملفات بمرور واحد تستخدمه هذه المرحلة والمراحل اللاحقة
+        self.inventory = build_inventory(str(self.repo_path), self.inventory_mode)
+        self.inventory.save(str(self.output_dir / INVENTORY_ARTIFACT))
+
+        # إحصاء الأسطر بالعداد المدمج (الشيفرة الخارجية المضمنة مستثناة)
+        line_counts = count_lines(
+            (self.repo_path / entry.path for entry in self.inventory.entries() if not entry.is_vendored),
+            max_workers=self.max_workers,
+            known=self._known_line_counts()
+        )
 
         # تحليل هيكل المجلدات
         structure_analysis = self._analyze_directory_structure()
@@ -100,7 +228,7 @@ class RepositoryAnalyzer:
         dependencies = self._analyze_dependencies()
 
         analysis_result = {
-            "line_counts": cloc_data,
+            "line_counts": line_counts,
             "directory_structure": structure_analysis,
             "project_types": project_types,
             "dependencies": dependencies,
@@ -113,6 +241,28 @@ class RepositoryAnalyzer:
 
         return analysis_result
 
+    def _known_line_counts(self) -> Optional[Dict[str, Any]]:
+        """عدادات الملفات التي حُسبت كائناتها مسبقاً، مفتاحها مسار الملف"""
+        if not self.blob_counts_file:
+            return None
+
+        try:
+            with open(self.blob_counts_file, "r", encoding="utf-8") as f:
+                blob_counts = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            self.logger.warning(f"⚠️ تعذر تحميل عدادات الكائنات: {e}")
+            return None
+
+        return {
+            str(self.repo_path / entry.path): tuple(blob_counts[entry.blob_id])
+            for entry in self.inventory.entries() if entry.blob_id in blob_counts
+        }
+
+    @staticmethod
+    def _outside_git_dirs(relative_path: str) -> bool:
+        """استبعاد مجلدات .git* (مثل .github) من إحصائيات الهيكل"""
+        return not any(part.startswith('.git') for part in relative_path.split('/'))
+
     def _analyze_directory_structure(self) -> Dict[str, Any]:
         """تحليل هيكل المجلدات"""
         structure = {
@@ -123,31 +273,23 @@ class RepositoryAnalyzer:
             "common_patterns": {}
         }
 
-        for root, dirs, files in os.walk(self.repo_path):
-            # تجاهل مجلدات Git
-            dirs[:] = [d for d in dirs if not d.startswith('.git')]
-
-            level = root.replace(str(self.repo_path), '').count(os.sep)
-            structure["max_depth"] = max(structure["max_depth"], level)
-            structure["total_directories"] += len(dirs)
+        directories = [d for d in self.inventory.directories[1:] if self._outside_git_dirs(d)]
+        structure["total_directories"] = len(directories)
+        structure["max_depth"] = max((d.count('/') + 1 for d in directories), default=0)
 
-            for file in files:
-                if file.startswith('.'):
-                    continue
+        for entry in self.inventory.entries():
+            directory, _, name = entry.path.rpartition('/')
+            if name.startswith('.') or not self._outside_git_dirs(directory):
+                continue
 
-                file_path = Path(root) / file
-                structure["total_files"] += 1
+            structure["total_files"] += 1
 
-                # فحص الملفات الكبيرة
-                try:
-                    file_size = file_path.stat().st_size
-                    if file_size > 1024 * 1024:  # > 1MB
-                        structure["large_files"].append({
-                            "path": str(file_path.relative_to(self.repo_path)),
-                            "size_mb": round(file_size / (1024 * 1024), 2)
-                        })
-                except OSError:
-                    pass
+            # فحص الملفات الكبيرة
+            if entry.size > 1024 * 1024:  # > 1MB
+                structure["large_files"].append({
+                    "path": entry.path,
+                    "size_mb": round(entry.size / (1024 * 1024), 2)
+                })
 
         return structure
 
@@ -203,6 +345,23 @@ class RepositoryAnalyzer:
             except json.JSONDecodeError:
                 pass
 
+            # الشجرة الانتقالية من ملف القفل (قراءة متدفقة بذاكرة محدودة)
+            try:
+                lockfile = analyze_lockfile(self.repo_path)
+            except (OSError, ValueError) as e:
+                self.logger.warning(f"⚠️ تعذر تحليل ملف القفل: {e}")
+                lockfile = None
+
+            if lockfile:
+                analyzer, summary = lockfile
+                analyzer.save(str(self.output_dir / LOCKFILE_ARTIFACT))
+                dependencies["transitive_dependencies"] = summary["total_packages"]
+                dependencies["lockfile"] = summary
+                self.logger.info(
+                    f"📦 {summary['total_packages']} حزمة انتقالية، {summary['duplicated_packages']} مكررة "
+                    f"الإصدار، أقصى عمق {summary['max_depth']}"
+                )
+
         # Python dependencies
         requirements_txt = self.repo_path / "requirements.txt"
         if requirements_txt.exists():
@@ -223,11 +382,9 @@ class RepositoryAnalyzer:
         """إحصائيات امتدادات الملفات"""
         extensions = {}
 
-        for file_path in self.repo_path.rglob("*"):
-            if file_path.is_file() and not any(
-                part.startswith('.git') for part in file_path.parts
-            ):
-                ext = file_path.suffix.lower()
+        for entry in self.inventory.entries():
+            if self._outside_git_dirs(entry.path):
+                ext = entry.extension.lower()
                 if ext:
                     extensions[ext] = extensions.get(ext, 0) + 1
 
@@ -235,7 +392,7 @@ class RepositoryAnalyzer:
         return dict(sorted(extensions.items(), key=lambda x: x[1], reverse=True))
 
     def run_build_tests(self) -> Dict[str, Any]:
-        """تشغيل اختبارات البناء"""
+        """تشغيل اختبارات البناء لكل سلاسل الأدوات المكتشفة بالتوازي"""
         self.logger.info("🧪 تشغيل اختبارات البناء...")
 
         test_results = {
@@ -244,16 +401,36 @@ class RepositoryAnalyzer:
             "coverage": None,
             "build_time": None,
             "errors": [],
-            "warnings": []
+            "warnings": [],
+            "runners": []
         }
 
-        # Node.js project
-        if (self.repo_path / "package.json").exists():
-            test_results.update(self._test_nodejs_project())
-
-        # Python project
-        elif (self.repo_path / "setup.py").exists() or (self.repo_path / "requirements.txt").exists():
-            test_results.update(self._test_python_project())
+        projects = self._detect_build_runners()
+        if projects:
+            self.logger.info("🧰 سلاسل الأدوات: " + ", ".join(
+                f"{runner.name} ({self._relative_dir(project_dir)})" for runner, project_dir in projects
+            ))
+
+            # كل مشغل في مجلده عبر cwd للعمليات الفرعية، فلا حالة مشتركة بين الخيوط
+            started = time.time()
+            with ThreadPoolExecutor(max_workers=min(len(projects), self.max_workers or len(projects))) as executor:
+                runs = [executor.submit(runner.run, self, project_dir) for runner, project_dir in projects]
+                outcomes = [run.result() for run in runs]
+            test_results["build_time"] = round(time.time() - started, 2)
+
+            for (runner, project_dir), outcome in zip(projects, outcomes):
+                outcome.update(runner=runner.name, path=self._relative_dir(project_dir))
+                test_results["runners"].append(outcome)
+                if outcome.get("error"):
+                    test_results["errors"].append(f"{runner.name} ({outcome['path']}): {outcome['error']}")
+
+            test_results["project_type"] = ", ".join(
+                dict.fromkeys(outcome["project_type"] for outcome in outcomes)
+            )
+            for key in ("install_status", "build_status"):
+                statuses = [outcome[key] for outcome in outcomes if key in outcome]
+                if statuses:
+                    test_results[key] = self._merge_status(statuses)
 
         # حفظ نتائج الاختبارات
         with open(self.output_dir / "artifacts/build/test_results.json", "w") as f:
@@ -261,29 +438,85 @@ class RepositoryAnalyzer:
 
         return test_results
 
-    def _test_nodejs_project(self) -> Dict[str, Any]:
-        """اختبار مشروع Node.js"""
-        results = {"project_type": "Node.js"}
+    def _detect_build_runners(self) -> List[Tuple["BuildRunner", Path]]:
+        """المشغلات المنطبقة في جذر المستودع ومجلداته العليا (مثل frontend/ و backend/)"""
+        candidates = [self.repo_path] + sorted(
+            path for path in self.repo_path.iterdir()
+            if path.is_dir() and not path.name.startswith(".")
+            and path.name not in VENDORED_DIRS and path.name != "test_env"
+        )
 
-        os.chdir(self.repo_path)
+        return [
+            (runner, project_dir)
+            for project_dir in candidates
+            for runner in BUILD_RUNNERS
+            if any((project_dir / marker).exists() for marker in runner.markers)
+        ]
+
+    def _relative_dir(self, project_dir: Path) -> str:
+        return project_dir.relative_to(self.repo_path).as_posix() if project_dir != self.repo_path else "."
+
+    def _build_log_path(self, runner: str, project_dir: Path) -> Path:
+        """سجل مخرجات التثبيت والبناء لمشغل في مجلد واحد (logs/build_tests_<runner>_<slug>.log)
+
+        المشغلات تعمل بالتوازي، فلكل منها ملفه حتى لا تتداخل مخرجاتها.
+        """
+        relative = self._relative_dir(project_dir)
+        slug = "root" if relative == "." else re.sub(r"[^\w.-]+", "_", relative).strip("_")
+        return self.output_dir / "logs" / f"build_tests_{runner}_{slug}.log"
+
+    @staticmethod
+    def _merge_status(statuses: List[str]) -> str:
+        """حالة مجمعة: أسوأ حالة بين المشغلات"""
+        for status in ("error", "timeout", "failed", "unknown"):
+            if status in statuses:
+                return status
+        return "success"
+
+    def _test_nodejs_project(self, project_dir: Path) -> Dict[str, Any]:
+        """اختبار مشروع Node.js"""
+        log_path = self._build_log_path("npm", project_dir)
+        results = {"project_type": "Node.js", "log_file": str(log_path)}
 
         try:
-            # تثبيت التبعيات
-            install_result = subprocess.run(
-                ["npm", "ci"],
-                capture_output=True,
-                text=True,
-                timeout=300
+            # استعادة node_modules من الذاكرة المؤقتة إذا لم يتغير ملف القفل
+            node_modules = project_dir / "node_modules"
+            cache_key = self._install_cache_key(
+                project_dir, "npm", ["package-lock.json", "npm-shrinkwrap.json"], ["node", "--version"]
             )
 
-            if install_result.returncode == 0:
+            if cache_key and self.install_cache.restore(cache_key, node_modules):
+                self.logger.info("⚡ استُعيدت node_modules من ذاكرة التثبيت")
+                results["install_cache"] = "hit"
+                install_ok = True
+            else:
+                # تثبيت التبعيات
+                install_result = run_streaming(
+                    ["npm", "ci"],
+                    log_path,
+                    "npm ci",
+                    self.logger,
+                    cwd=project_dir,
+                    timeout=300
+                )
+                install_ok = install_result.returncode == 0
+
+                if install_ok and cache_key and node_modules.is_dir():
+                    self.install_cache.store(cache_key, node_modules)
+                    results["install_cache"] = "miss"
+                elif not install_ok:
+                    results["install_errors"] = install_result.stderr
+
+            if install_ok:
                 results["install_status"] = "success"
 
-                # تشغيل البناء
-                build_result = subprocess.run(
+                # تشغيل البناء (تُحفظ آخر الأسطر فقط، والمخرجات الكاملة في السجل)
+                build_result = run_streaming(
                     ["npm", "run", "build"],
-                    capture_output=True,
-                    text=True,
+                    log_path,
+                    "npm run build",
+                    self.logger,
+                    cwd=project_dir,
                     timeout=300
                 )
 
@@ -293,7 +526,6 @@ class RepositoryAnalyzer:
 
             else:
                 results["install_status"] = "failed"
-                results["install_errors"] = install_result.stderr
 
         except subprocess.TimeoutExpired:
             results["build_status"] = "timeout"
@@ -303,22 +535,41 @@ class RepositoryAnalyzer:
 
         return results
 
-    def _test_python_project(self) -> Dict[str, Any]:
+    def _test_python_project(self, project_dir: Path) -> Dict[str, Any]:
         """اختبار مشروع Python"""
-        results = {"project_type": "Python"}
-
-        os.chdir(self.repo_path)
+        log_path = self._build_log_path("pip", project_dir)
+        results = {"project_type": "Python", "log_file": str(log_path)}
+        venv_dir = project_dir / "test_env"
 
         try:
+            # استعادة البيئة الافتراضية من الذاكرة المؤقتة إذا لم يتغير requirements.txt
+            cache_key = self._install_cache_key(
+                project_dir, "pip", ["requirements.txt"], ["python", "--version"]
+            )
+            if cache_key and self._restore_venv(project_dir, cache_key, venv_dir):
+                self.logger.info("⚡ استُعيدت حزم البيئة الافتراضية من ذاكرة التثبيت")
+                results["install_cache"] = "hit"
+                results["install_status"] = "success"
+                return results
+
             # إنشاء بيئة افتراضية
-            subprocess.run(["python", "-m", "venv", "test_env"], timeout=60)
+            run_streaming(
+                ["python", "-m", "venv", "test_env"],
+                log_path,
+                "venv",
+                self.logger,
+                cwd=project_dir,
+                timeout=60
+            )
 
             # تثبيت التبعيات
-            if (self.repo_path / "requirements.txt").exists():
-                install_result = subprocess.run(
+            if (project_dir / "requirements.txt").exists():
+                install_result = run_streaming(
                     ["./test_env/bin/pip", "install", "-r", "requirements.txt"],
-                    capture_output=True,
-                    text=True,
+                    log_path,
+                    "pip install",
+                    self.logger,
+                    cwd=project_dir,
                     timeout=300
                 )
 
@@ -326,6 +577,11 @@ class RepositoryAnalyzer:
 
                 if install_result.returncode != 0:
                     results["install_errors"] = install_result.stderr
+                elif cache_key:
+                    site_packages = self._venv_site_packages(venv_dir)
+                    if site_packages:
+                        self.install_cache.store(cache_key, site_packages)
+                        results["install_cache"] = "miss"
 
         except subprocess.TimeoutExpired:
             results["install_status"] = "timeout"
@@ -335,24 +591,122 @@ class RepositoryAnalyzer:
 
         return results
 
-def main():
-    """الدالة الرئيسية"""
-    import sys
+    def _install_cache_key(self, project_dir: Path, kind: str, lockfiles: List[str],
+                           version_command: List[str]) -> Optional[str]:
+        """مفتاح ذاكرة التثبيت من ملفات القفل وإصدار الأداة، أو None بلا ذاكرة أو قفل"""
+        if not self.install_cache:
+            return None
+        return self.install_cache.compute_key(
+            kind, [project_dir / name for name in lockfiles], tool_version(version_command)
+        )
 
-    if len(sys.argv) < 3:
-        print("الاستخدام: python build_analysis.py <repo_url> <output_dir> [branch]")
-        sys.exit(1)
+    @staticmethod
+    def _venv_site_packages(venv_dir: Path) -> Optional[Path]:
+        """مجلد site-packages في بيئة افتراضية (Linux/macOS أو Windows)"""
+        candidates = list(venv_dir.glob("lib/python*/site-packages")) + [venv_dir / "Lib" / "site-packages"]
+        return next((path for path in candidates if path.is_dir()), None)
 
-    repo_url = sys.argv[1]
-    output_dir = sys.argv[2]
-    branch = sys.argv[3] if len(sys.argv) > 3 else "main"
+    def _restore_venv(self, project_dir: Path, cache_key: str, venv_dir: Path) -> bool:
+        """بيئة افتراضية جديدة تُستعاد حزمها من الذاكرة المؤقتة
 
-    analyzer = RepositoryAnalyzer(repo_url, output_dir, branch)
+        البيئات الافتراضية غير قابلة للنقل (مسارات مطلقة في bin/)، لذا تُنشأ
+        البيئة في مكانها دون pip ويُستعاد site-packages وحده، وهو يتضمن pip.
+        """
+        if not self.install_cache.contains(cache_key) or venv_dir.exists():
+            return False
+
+        run_streaming(
+            ["python", "-m", "venv", "--without-pip", "test_env"],
+            self._build_log_path("pip", project_dir),
+            "venv",
+            self.logger,
+            cwd=project_dir,
+            timeout=60
+        )
+
+        site_packages = self._venv_site_packages(venv_dir)
+        if site_packages:
+            shutil.rmtree(site_packages)
+            if self.install_cache.restore(cache_key, site_packages):
+                return True
+
+        shutil.rmtree(venv_dir, ignore_errors=True)
+        return False
+
+@dataclass
+class BuildRunner:
+    """مشغل بناء واختبار لسلسلة أدوات واحدة"""
+    name: str
+    # ملفات تدل على وجود المشروع في مجلده
+    markers: List[str]
+    run: Callable[[RepositoryAnalyzer, Path], Dict[str, Any]]
+
+# سجل المشغلات: تُضاف سلاسل الأدوات الجديدة هنا
+BUILD_RUNNERS: List[BuildRunner] = [
+    BuildRunner("npm", ["package.json"], RepositoryAnalyzer._test_nodejs_project),
+    BuildRunner("pip", ["setup.py", "requirements.txt"], RepositoryAnalyzer._test_python_project),
+]
+
+def main():
+    """الدالة الرئيسية"""
+    import sys
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="مرحلة BUILD: استنساخ المستودع وتحليله واختبارات البناء"
+    )
+    parser.add_argument("repo_url")
+    parser.add_argument("output_dir")
+    parser.add_argument("branch", nargs="?", default="main")
+    parser.add_argument("step", nargs="?", default="all", choices=["all", "clone", "analyze", "tests", "deepen", "history"])
+    parser.add_argument("clone_cache_dir", nargs="?")
+    parser.add_argument("--depth", type=int, help="استنساخ سطحي بعدد التزامات محدد")
+    parser.add_argument("--filter", dest="clone_filter", help="استنساخ جزئي، مثل blob:none")
+    parser.add_argument("--sparse-path", dest="sparse_paths", action="append", help="مسار ضمن sparse checkout (قابل للتكرار)")
+    parser.add_argument("--workers", type=int, help="حد المعالجات لإحصاء الأسطر")
+    parser.add_argument("--install-cache-dir", help="ذاكرة مؤقتة لتثبيت التبعيات معنونة بملفات القفل")
+    parser.add_argument("--blob-counts", help="عدادات أسطر محسوبة مسبقاً لكل كائن git (JSON)")
+    parser.add_argument("--inventory-mode", choices=INVENTORY_MODES, default="auto", help="مصدر جرد الملفات")
+    parser.add_argument("--use-existing-checkout", action="store_true", help="استخدام نسخة العمل الموجودة دون pull")
+    args = parser.parse_args()
+
+    analyzer = RepositoryAnalyzer(
+        args.repo_url, args.output_dir, args.branch, args.clone_cache_dir,
+        clone_depth=args.depth, clone_filter=args.clone_filter, sparse_paths=args.sparse_paths,
+        max_workers=args.workers, inventory_mode=args.inventory_mode,
+        install_cache_dir=args.install_cache_dir, blob_counts_file=args.blob_counts,
+        use_existing_checkout=args.use_existing_checkout
+    )
+    step = args.step
+
+    # تعميق استنساخ سطحي موجود
+    if step == "deepen":
+        if not analyzer.deepen_history():
+            sys.exit(1)
+        print("✅ تم تعميق تاريخ المستودع")
+        return
+
+    # تحليل التاريخ وحده (يفترض أن المستودع مستنسخ بتاريخه)
+    if step == "history":
+        analyzer.analyze_history()
+        print("✅ تم تحليل تاريخ التعديلات")
+        return
+
+    # اختبارات البناء وحدها (تفترض أن المستودع مستنسخ مسبقاً)
+    if step == "tests":
+        analyzer.run_build_tests()
+        print("✅ تمت اختبارات البناء")
+        return
 
     # تشغيل التحليل
     if analyzer.clone_repository():
+        if step == "clone":
+            print("✅ تم استنساخ المستودع")
+            return
+
         analyzer.analyze_codebase_structure()
-        analyzer.run_build_tests()
+        if step == "all":
+            analyzer.run_build_tests()
         print("✅ تمت مرحلة البناء بنجاح")
     else:
         print("❌ فشلت مرحلة البناء")
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+# script: event_journal.py
+
+import os
+import json
+import copy
+import time
+import threading
+from pathlib import Path
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator
+
+# أنواع الأحداث
+ANALYSIS_INITIALIZED = "analysis_initialized"
+ANALYSIS_RESUMED = "analysis_resumed"
+PHASE_STARTED = "phase_started"
+PHASE_PROGRESS = "phase_progress"
+PHASE_FINISHED = "phase_finished"
+PHASE_METRICS = "phase_metrics"
+ARTIFACT_PRODUCED = "artifact_produced"
+
+class EventJournal:
+    """سجل أحداث إلحاقي بصيغة JSONL
+
+    كل تغيير حالة يُلحق كسطر مستقل بدلاً من إعادة كتابة config.json، فيبقى
+    آمناً مع المراحل المتوازية. يُجمع fsync على دفعات (عدد أحداث أو فترة
+    زمنية) إلا للأحداث التي تُطلب متانتها فوراً.
+    """
+
+    def __init__(self, path: str, fsync_batch: int = 32, fsync_interval: float = 1.0):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.fsync_batch = fsync_batch
+        self.fsync_interval = fsync_interval
+
+        self._lock = threading.Lock()
+        self._file = open(self.path, "a", encoding="utf-8")
+        self._pending = 0
+        self._last_sync = time.monotonic()
+
+    def append(self, event_type: str, durable: bool = False, **data: Any) -> None:
+        """إلحاق حدث بالسجل"""
+        event = {"type": event_type, "timestamp": datetime.now().isoformat(), **data}
+        line = json.dumps(event, ensure_ascii=False)
+
+        with self._lock:
+            self._file.write(line + "\n")
+            self._file.flush()
+            self._pending += 1
+
+            if (durable or self._pending >= self.fsync_batch or
+                    time.monotonic() - self._last_sync >= self.fsync_interval):
+                self._sync()
+
+    def _sync(self) -> None:
+        """مزامنة الأحداث المعلقة مع القرص"""
+        os.fsync(self._file.fileno())
+        self._pending = 0
+        self._last_sync = time.monotonic()
+
+    def close(self) -> None:
+        """مزامنة الأحداث المتبقية وإغلاق الملف"""
+        with self._lock:
+            if not self._file.closed:
+                if self._pending:
+                    self._sync()
+                self._file.close()
+
+def read_events(path: str) -> Iterator[Dict[str, Any]]:
+    """قراءة أحداث السجل مع تجاهل سطر أخير ناقص (انقطاع أثناء الكتابة)"""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+    except FileNotFoundError:
+        return
+
+def fold_events(events: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+    """إعادة بناء الحالة الحالية (بنية config.json) من تسلسل الأحداث"""
+    state: Dict[str, Any] = {"phases": {}}
+
+    for event in events:
+        event_type = event.get("type")
+        timestamp = event.get("timestamp")
+
+        if event_type == ANALYSIS_INITIALIZED:
+            state = copy.deepcopy(event["config"])
+            state.setdefault("phases", {})
+            continue
+
+        if event_type == ANALYSIS_RESUMED:
+            state.setdefault("resumed_at", []).append(timestamp)
+            continue
+
+        phase_name = event.get("phase")
+        if not phase_name:
+            continue
+        phase = state["phases"].setdefault(phase_name, {"status": "pending"})
+
+        if event_type == PHASE_STARTED:
+            phase["status"] = "running"
+            phase["started_at"] = timestamp
+        elif event_type == PHASE_PROGRESS:
+            phase["progress"] = event.get("message")
+        elif event_type == PHASE_FINISHED:
+            phase["status"] = event["status"]
+            phase["timestamp"] = timestamp
+        elif event_type == PHASE_METRICS:
+            phase["metrics"] = event["metrics"]
+        elif event_type == ARTIFACT_PRODUCED:
+            artifacts = phase.setdefault("artifacts", [])
+            if event["artifact"] not in artifacts:
+                artifacts.append(event["artifact"])
+
+    return state
+
+def write_snapshot(journal_path: str, snapshot_path: str) -> Dict[str, Any]:
+    """توليد لقطة config.json من السجل (كتابة ذرية)"""
+    state = fold_events(read_events(journal_path))
+
+    snapshot_path = Path(snapshot_path)
+    tmp_path = snapshot_path.with_suffix(snapshot_path.suffix + ".tmp")
+    with open(tmp_path, "w") as f:
+        json.dump(state, f, indent=2)
+    os.replace(tmp_path, snapshot_path)
+
+    return state
@@ -5,19 +5,25 @@ import json
 import shutil
 import zipfile
 from pathlib import Path
-from typing import Dict, List, Any
+from typing import Callable, Dict, List, Any, Optional
 from datetime import datetime
 import logging
+from concurrent.futures import ThreadPoolExecutor
 
 class DeliverablesExporter:
     """مصدر حزمة التسليمات النهائية"""
 
-    def __init__(self, output_dir: str, analysis_id: str):
+    def __init__(self, output_dir: str, analysis_id: str,
+                 artifacts: Optional[Dict[str, Any]] = None, max_workers: Optional[int] = None):
         self.output_dir = Path(output_dir)
         self.analysis_id = analysis_id
+        self.max_workers = max_workers
         self.deliverables_dir = self.output_dir / "deliverables"
         self.logger = logging.getLogger(__name__)
 
+        # نتائج المراحل السابقة في الذاكرة (مفتاحها المسار النسبي للملف)
+        self.artifacts = artifacts if artifacts is not None else {}
+
         # إنشاء مجلد التسليمات
         self.deliverables_dir.mkdir(parents=True, exist_ok=True)
 
@@ -25,17 +31,14 @@ class DeliverablesExporter:
         """تصدير جميع التسليمات وإنشاء أرشيف"""
         self.logger.info("📦 بدء تصدير التسليمات النهائية...")
 
-        # إنتاج README الرئيسي
-        self._generate_main_readme()
-
-        # نسخ وتنظيم التقارير
-        self._organize_reports()
-
-        # إنتاج ملخص تنفيذي
-        self._generate_executive_summary()
-
-        # إنتاج دليل إعادة الإنتاج
-        self._generate_reproduction_guide()
+        # المولدات مستقلة (كل منها يكتب ملفاته الخاصة) فتعمل بالتوازي:
+        # README الرئيسي، تنظيم التقارير، الملخص التنفيذي، دليل إعادة الإنتاج
+        self._run_parallel([
+            self._generate_main_readme,
+            self._organize_reports,
+            self._generate_executive_summary,
+            self._generate_reproduction_guide
+        ])
 
         # إنشاء أرشيف نهائي
         archive_path = self._create_final_archive()
@@ -97,6 +100,8 @@ deliverables/
 │   └── concept_03.json            # بيانات JSON للمفهوم الثالث
 ├── visuals/
 │   ├── dependency_graph.png       # خريطة التبعيات
+│   ├── dependency_graph.svg       # خريطة التبعيات (متجهة)
+│   ├── dependency_graph.dot       # خريطة التبعيات بصيغة Graphviz
 │   └── architecture_overview.png  # نظرة عامة على المعمارية
 └── raw_data/
     ├── build_analysis.json        # بيانات التحليل الأولي
@@ -173,6 +178,8 @@ deliverables/
 
             # الرسوم البيانية
             "artifacts/assemble/dependency_graph.png": visuals_dir / "dependency_graph.png",
+            "artifacts/assemble/dependency_graph.svg": visuals_dir / "dependency_graph.svg",
+            "artifacts/assemble/dependency_graph.dot": visuals_dir / "dependency_graph.dot",
         }
 
         # نسخ الملفات الموجودة
@@ -185,9 +192,18 @@ deliverables/
                 self.logger.warning(f"⚠️ ملف غير موجود: {src_path}")
 
         # إنتاج تقارير مدمجة
-        self._generate_architecture_report(reports_dir)
-        self._generate_risk_register(reports_dir)
-        self._generate_opportunities_report(reports_dir)
+        self._run_parallel([
+            lambda: self._generate_architecture_report(reports_dir),
+            lambda: self._generate_risk_register(reports_dir),
+            lambda: self._generate_opportunities_report(reports_dir)
+        ])
+
+    def _run_parallel(self, generators: List[Callable[[], None]]) -> None:
+        """تشغيل مولدات مستقلة بالتوازي وإعادة رفع أول خطأ"""
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = [executor.submit(generator) for generator in generators]
+            for future in futures:
+                future.result()
 
     def _generate_architecture_report(self, reports_dir: Path) -> None:
         """إنتاج تقرير تحليل المعمارية"""
@@ -664,9 +680,6 @@ pip install ast-unparser pylint bandit safety
 
 ### أدوات التحليل الإضافية
 ```bash
-# لتحليل JavaScript/TypeScript
-npm install -g madge cloc
-
 # لتحليل Java
 # تثبيت Maven 3.6+ أو Gradle 6+
 
@@ -803,11 +816,9 @@ git config --global credential.helper store
 #### نقص في أدوات التحليل
 ```bash
 # تحقق من التثبيت
-which cloc madge pylint
-npm list -g madge
+which pylint
 
 # إعادة تثبيت
-npm install -g madge cloc
 pip install --upgrade pylint bandit
 ```
 
@@ -914,6 +925,9 @@ python scripts/compare_analyses.py \
 
     def _load_json(self, file_path: str) -> Dict[str, Any]:
         """تحميل ملف JSON"""
+        if file_path in self.artifacts:
+            return self.artifacts[file_path]
+
         try:
             with open(self.output_dir / file_path, 'r', encoding='utf-8') as f:
                 return json.load(f)
@@ -0,0 +1,332 @@
+#!/usr/bin/env python3
+# script: file_inventory.py
+
+import os
+import re
+import gzip
+import json
+import subprocess
+from array import array
+from fnmatch import fnmatchcase
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional
+
+# المسار النسبي لمخرج الجرد ضمن مجلد التحليل
+INVENTORY_ARTIFACT = "artifacts/build/file_inventory.json.gz"
+
+# مصادر الجرد: فهرس git (الملفات المتتبعة فقط) أو المرور على القرص،
+# و auto يستخدم الفهرس إذا كان المستودع مستودع git
+INVENTORY_MODES = ["auto", "git", "walk"]
+
+# أنماط الملفات العادية والتنفيذية في فهرس git (تُستبعد الروابط والوحدات الفرعية)
+_GIT_FILE_MODES = {b"100644", b"100755"}
+
+# مجلدات الشيفرة الخارجية المضمنة في المستودع
+VENDORED_DIRS = {
+    "node_modules", "vendor", "third_party", "bower_components",
+    ".venv", "venv", "site-packages"
+}
+
+# أنماط ملفات ومجلدات الاختبارات الشائعة
+_TEST_PATTERN = re.compile(
+    r"(^|/)(tests?|__tests__|spec)/"
+    r"|(^|/)test_[^/]*\.py$|_test\.(py|go)$"
+    r"|\.(test|spec)\.[jt]sx?$|Tests?\.java$"
+)
+
+# بتات حقل flags
+IS_TEST = 1
+IS_VENDORED = 2
+
+class FileEntry(NamedTuple):
+    """ملف واحد في الجرد"""
+    path: str
+    size: int
+    mtime: int
+    extension: str
+    depth: int
+    is_test: bool
+    is_vendored: bool
+    blob_id: str = ""
+
+class FileInventory:
+    """جرد ملفات المستودع في مرور واحد بـ os.scandir أو من فهرس git
+
+    يُخزن الجرد بأعمدة (مصفوفات array) بدلاً من كائن لكل ملف، وتُخزن
+    المجلدات والامتدادات مرة واحدة في جداول يُشار إليها بالفهرس. تستعلم
+    المراحل اللاحقة الجرد بدلاً من المرور على نظام الملفات من جديد.
+    المجلد .git مستثنى.
+    """
+
+    def __init__(self, repo_path: str):
+        self.repo_path = Path(repo_path)
+        self.source = "walk"
+
+        # جدول المجلدات (النسبية بصيغة POSIX، والجذر "") والامتدادات
+        self.directories: List[str] = [""]
+        self.extensions: List[str] = [""]
+        self._extension_ids: Dict[str, int] = {"": 0}
+
+        # أعمدة الملفات
+        self.names: List[str] = []
+        self.dir_ids = array("I")
+        self.sizes = array("q")
+        self.mtimes = array("q")
+        self.ext_ids = array("I")
+        self.flags = array("B")
+        # معرف كائن git لكل ملف (في جرد الفهرس فقط) لإعادة استخدام النتائج بين الفروع
+        self.blob_ids: List[str] = []
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    @classmethod
+    def scan(cls, repo_path: str) -> "FileInventory":
+        """بناء الجرد بمرور واحد على شجرة المستودع"""
+        inventory = cls(repo_path)
+        stack = [(str(inventory.repo_path), 0, False)]
+
+        while stack:
+            dir_path, dir_id, vendored = stack.pop()
+            prefix = inventory.directories[dir_id]
+
+            try:
+                entries = list(os.scandir(dir_path))
+            except OSError:
+                continue
+
+            for entry in entries:
+                relative = f"{prefix}/{entry.name}" if prefix else entry.name
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        if entry.name == ".git":
+                            continue
+                        inventory.directories.append(relative)
+                        stack.append((
+                            entry.path,
+                            len(inventory.directories) - 1,
+                            vendored or entry.name in VENDORED_DIRS
+                        ))
+                    elif entry.is_file():
+                        stat = entry.stat()
+                        inventory._add(entry.name, dir_id, stat.st_size, int(stat.st_mtime),
+                                       relative, vendored)
+                except OSError:
+                    continue
+
+        return inventory
+
+    @classmethod
+    def from_git_index(cls, repo_path: str) -> "FileInventory":
+        """بناء الجرد من فهرس git دون المرور على شجرة العمل
+
+        يغطي الملفات المتتبعة فقط، فلا تدخل node_modules والبيئات الافتراضية
+        ومخرجات البناء المتجاهلة. الأحجام من `git cat-file --batch-check`
+        حسب معرف الكائن؛ الكائنات غير الموجودة محلياً (استنساخ جزئي) تأخذ حجم
+        الملف في شجرة العمل أو صفراً. أزمنة التعديل غير متاحة من الفهرس فتبقى صفراً.
+        """
+        def git(*args: str, input: Optional[bytes] = None, check: bool = True) -> bytes:
+            return subprocess.run(
+                ["git", "-C", str(repo_path), *args],
+                input=input,
+                capture_output=True,
+                check=check,
+                # لا جلب للكائنات الناقصة من الشبكة في الاستنساخ الجزئي
+                env={**os.environ, "GIT_NO_LAZY_FETCH": "1"}
+            ).stdout
+
+        # -t يضيف وسم الحالة: S للملفات خارج sparse checkout
+        listing = git("ls-files", "-z", "--stage", "-t")
+
+        files: Dict[str, bytes] = {}
+        for record in listing.split(b"\0"):
+            if not record:
+                continue
+            meta, _, path = record.partition(b"\t")
+            tag, mode, sha, _ = meta.split(b" ")
+            if tag != b"S" and mode in _GIT_FILE_MODES:
+                files[path.decode("utf-8", errors="surrogateescape")] = sha
+
+        # سطر "<oid> missing" لكل كائن غير موجود، فتُربط الأحجام بالمعرف لا بالترتيب.
+        # مع تعطيل الجلب قد يتوقف git عند أول كائن ناقص، فيُستخدم ما كُتب قبله
+        sizes: Dict[bytes, int] = {}
+        output = git("cat-file", "--batch-check=%(objectname) %(objectsize)",
+                     input=b"".join(sha + b"\n" for sha in dict.fromkeys(files.values())), check=False)
+        for line in output.splitlines():
+            sha, _, size = line.partition(b" ")
+            if size.isdigit():
+                sizes[sha] = int(size)
+
+        def size_of(relative: str, sha: bytes) -> int:
+            if sha in sizes:
+                return sizes[sha]
+            try:
+                return os.stat(os.path.join(repo_path, relative)).st_size
+            except OSError:
+                return 0
+
+        inventory = cls(repo_path)
+        inventory.source = "git"
+        dir_ids: Dict[str, int] = {"": 0}
+
+        def dir_id(directory: str) -> int:
+            if directory not in dir_ids:
+                parent = directory.rpartition("/")[0]
+                dir_id(parent)
+                dir_ids[directory] = len(inventory.directories)
+                inventory.directories.append(directory)
+            return dir_ids[directory]
+
+        for relative, sha in files.items():
+            directory, _, name = relative.rpartition("/")
+            vendored = any(part in VENDORED_DIRS for part in directory.split("/"))
+            inventory._add(name, dir_id(directory), size_of(relative, sha), 0, relative, vendored, sha.decode("ascii"))
+
+        return inventory
+
+    def _add(self, name: str, dir_id: int, size: int, mtime: int,
+             relative: str, vendored: bool, blob_id: str = "") -> None:
+        extension = os.path.splitext(name)[1]
+        ext_id = self._extension_ids.get(extension)
+        if ext_id is None:
+            ext_id = self._extension_ids[extension] = len(self.extensions)
+            self.extensions.append(extension)
+
+        flags = IS_VENDORED if vendored else 0
+        if _TEST_PATTERN.search(relative):
+            flags |= IS_TEST
+
+        self.names.append(name)
+        self.dir_ids.append(dir_id)
+        self.sizes.append(size)
+        self.mtimes.append(mtime)
+        self.ext_ids.append(ext_id)
+        self.flags.append(flags)
+        self.blob_ids.append(blob_id)
+
+    def relative_path(self, index: int) -> str:
+        directory = self.directories[self.dir_ids[index]]
+        return f"{directory}/{self.names[index]}" if directory else self.names[index]
+
+    @staticmethod
+    def _depth(directory: str) -> int:
+        return directory.count("/") + 1 if directory else 0
+
+    def entries(self) -> Iterator[FileEntry]:
+        """جميع الملفات كسجلات FileEntry"""
+        for i in range(len(self.names)):
+            directory = self.directories[self.dir_ids[i]]
+            yield FileEntry(
+                path=self.relative_path(i),
+                size=self.sizes[i],
+                mtime=self.mtimes[i],
+                extension=self.extensions[self.ext_ids[i]],
+                depth=self._depth(directory),
+                is_test=bool(self.flags[i] & IS_TEST),
+                is_vendored=bool(self.flags[i] & IS_VENDORED),
+                blob_id=self.blob_ids[i]
+            )
+
+    def with_suffix(self, *suffixes: str) -> List[Path]:
+        """الملفات ذات الامتدادات المحددة (مطابقة حرفية مثل Path.suffix)"""
+        wanted = {self._extension_ids[s] for s in suffixes if s in self._extension_ids}
+        return [
+            self.repo_path / self.relative_path(i)
+            for i, ext_id in enumerate(self.ext_ids) if ext_id in wanted
+        ]
+
+    def rglob(self, pattern: str, under: str = "") -> List[Path]:
+        """مكافئ Path.rglob على الجرد دون لمس نظام الملفات
+
+        يطابق النمط آخر مكونات المسار (ملفات ومجلدات)، والنمط المنتهي بـ /
+        يطابق المجلدات فقط. under يقصر البحث على مجلد نسبي.
+        """
+        dirs_only = pattern.endswith("/")
+        parts = pattern.rstrip("/").split("/")
+        prefix = f"{under.strip('/')}/" if under.strip("/") else ""
+
+        def matches(relative: str) -> bool:
+            if prefix and not relative.startswith(prefix):
+                return False
+            components = relative[len(prefix):].split("/")
+            if len(components) < len(parts):
+                return False
+            return all(fnmatchcase(c, p) for c, p in zip(components[-len(parts):], parts))
+
+        results = [self.repo_path / d for d in self.directories[1:] if matches(d)]
+        if not dirs_only:
+            results += [
+                self.repo_path / relative
+                for relative in map(self.relative_path, range(len(self.names)))
+                if matches(relative)
+            ]
+        return results
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "version": 1,
+            "source": self.source,
+            "directories": self.directories,
+            "extensions": self.extensions,
+            "files": {
+                "name": self.names,
+                "dir": self.dir_ids.tolist(),
+                "size": self.sizes.tolist(),
+                "mtime": self.mtimes.tolist(),
+                "ext": self.ext_ids.tolist(),
+                "flags": self.flags.tolist(),
+                "blob": self.blob_ids
+            }
+        }
+
+    def save(self, path: str) -> None:
+        """حفظ الجرد بأعمدة JSON مضغوطة"""
+        # mtime=0 لثبات الملف المضغوط بين التشغيلات
+        with open(path, "wb") as raw, gzip.GzipFile(fileobj=raw, mode="wb", mtime=0) as f:
+            f.write(json.dumps(self.to_dict(), ensure_ascii=False, separators=(",", ":")).encode("utf-8"))
+
+    @classmethod
+    def load(cls, path: str, repo_path: str) -> "FileInventory":
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            data = json.load(f)
+
+        inventory = cls(repo_path)
+        inventory.source = data.get("source", "walk")
+        inventory.directories = data["directories"]
+        inventory.extensions = data["extensions"]
+        inventory._extension_ids = {ext: i for i, ext in enumerate(inventory.extensions)}
+
+        files = data["files"]
+        inventory.names = files["name"]
+        inventory.dir_ids = array("I", files["dir"])
+        inventory.sizes = array("q", files["size"])
+        inventory.mtimes = array("q", files["mtime"])
+        inventory.ext_ids = array("I", files["ext"])
+        inventory.flags = array("B", files["flags"])
+        inventory.blob_ids = files.get("blob") or [""] * len(inventory.names)
+        return inventory
+
+def build_inventory(repo_path: str, mode: str = "auto") -> FileInventory:
+    """بناء الجرد حسب المصدر المطلوب (انظر INVENTORY_MODES)"""
+    if mode == "git" or (mode == "auto" and (Path(repo_path) / ".git").exists()):
+        try:
+            return FileInventory.from_git_index(repo_path)
+        except (OSError, subprocess.CalledProcessError, ValueError):
+            if mode == "git":
+                raise
+    return FileInventory.scan(repo_path)
+
+def load_inventory(repo_path: str, output_dir: str,
+                   artifacts: Optional[Dict[str, Any]] = None) -> FileInventory:
+    """جرد المستودع من الذاكرة أو من مخرج BUILD، أو مسح جديد إذا لم يوجد"""
+    if artifacts and INVENTORY_ARTIFACT in artifacts:
+        return artifacts[INVENTORY_ARTIFACT]
+
+    path = Path(output_dir) / INVENTORY_ARTIFACT
+    if path.exists():
+        try:
+            return FileInventory.load(str(path), repo_path)
+        except (OSError, ValueError, KeyError):
+            pass
+
+    return build_inventory(repo_path)
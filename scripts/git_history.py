@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+# script: git_history.py
+
+import math
+import subprocess
+from array import array
+from datetime import datetime, timezone
+from itertools import combinations
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+# المسار النسبي لمخرج تحليل التاريخ
+HISTORY_ARTIFACT = "artifacts/build/history_analysis.json"
+
+# الالتزامات التي تلمس ملفات أكثر من هذا (إعادة تسمية جماعية، تنسيق) لا تدخل في الاقتران
+MAX_COUPLING_FILES = 30
+
+# الحد الأقصى لأزواج الاقتران في الذاكرة؛ عند تجاوزه تُحذف الأزواج الأقل تكراراً
+MAX_COUPLING_PAIRS = 500_000
+
+# أقل عدد التزامات مشتركة لاعتبار زوج ملفات مقترناً
+MIN_SHARED_COMMITS = 3
+
+# عدد النقاط الساخنة وأزواج الاقتران في التقرير
+TOP_N = 50
+
+READ_CHUNK_SIZE = 1024 * 1024
+
+# فواصل رأس الالتزام في صيغة git log (لا تظهر في SHA أو الطوابع الزمنية)
+_RECORD_SEP = b"\x1e"
+_FIELD_SEP = b"\x1f"
+
+class HistoryAnalyzer:
+    """تحليل تاريخ التعديلات بمرور واحد متدفق على `git log --numstat -z`
+
+    تُحوّل المسارات إلى معرفات رقمية (interning) وتُخزن العدادات في مصفوفات
+    لكل ملف، فتبقى الذاكرة متناسبة مع عدد الملفات لا عدد الالتزامات. إعادة
+    التسمية تربط المسار القديم بمعرف الملف الحالي فيُحسب تاريخه كاملاً.
+    """
+
+    def __init__(self, repo_path: str, max_commits: Optional[int] = None,
+                 since: Optional[str] = None):
+        self.repo_path = Path(repo_path)
+        self.max_commits = max_commits
+        self.since = since
+
+        self._ids: Dict[str, int] = {}
+        self.paths: List[str] = []
+        self.commits = array("I")
+        self.added = array("Q")
+        self.deleted = array("Q")
+        self.last_touched = array("q")
+
+        self.coupling: Dict[Tuple[int, int], int] = {}
+        self._prune_floor = 0
+        self.total_commits = 0
+        self.first_commit: Optional[int] = None
+        self.last_commit: Optional[int] = None
+
+    def _intern(self, path: str) -> int:
+        file_id = self._ids.get(path)
+        if file_id is None:
+            file_id = self._ids[path] = len(self.paths)
+            self.paths.append(path)
+            self.commits.append(0)
+            self.added.append(0)
+            self.deleted.append(0)
+            self.last_touched.append(0)
+        return file_id
+
+    def _stream_tokens(self) -> Iterator[bytes]:
+        """حقول مخرجات git log المفصولة بـ NUL دون تحميل السجل في الذاكرة"""
+        cmd = ["git", "-C", str(self.repo_path), "log", "--numstat", "-z", "-M",
+               "--no-merges", "--format=%x1e%H%x1f%ct"]
+        if self.max_commits:
+            cmd.append(f"--max-count={self.max_commits}")
+        if self.since:
+            cmd.append(f"--since={self.since}")
+
+        process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+        try:
+            pending = b""
+            for chunk in iter(lambda: process.stdout.read(READ_CHUNK_SIZE), b""):
+                tokens = (pending + chunk).split(b"\0")
+                pending = tokens.pop()
+                yield from tokens
+            if pending:
+                yield pending
+        finally:
+            process.stdout.close()
+            if process.wait() != 0:
+                raise subprocess.CalledProcessError(process.returncode, cmd)
+
+    def analyze(self) -> "HistoryAnalyzer":
+        """قراءة التاريخ (الأحدث أولاً) وتحديث العدادات"""
+        timestamp = 0
+        files: List[int] = []
+        rename: Optional[List[bytes]] = None
+
+        for token in self._stream_tokens():
+            token = token.lstrip(b"\n")
+
+            if rename is not None:
+                # إعادة التسمية: "added\tdeleted\t" ثم المسار القديم ثم الجديد
+                rename.append(token)
+                if len(rename) == 3:
+                    stats, old_path, new_path = rename
+                    rename = None
+                    file_id = self._intern(new_path.decode("utf-8", errors="surrogateescape"))
+                    # الالتزامات الأقدم تستخدم الاسم القديم لنفس الملف
+                    self._ids.setdefault(old_path.decode("utf-8", errors="surrogateescape"), file_id)
+                    self._count_change(file_id, stats, timestamp, files)
+                continue
+
+            if token.startswith(_RECORD_SEP):
+                self._finish_commit(files)
+                files = []
+                _, _, committed = token[1:].partition(_FIELD_SEP)
+                timestamp = int(committed or 0)
+                self.total_commits += 1
+                self.last_commit = self.last_commit or timestamp
+                self.first_commit = timestamp
+                continue
+
+            if not token:
+                continue
+
+            added, deleted, path = token.split(b"\t", 2)
+            if not path:
+                rename = [added + b"\t" + deleted]
+                continue
+
+            file_id = self._intern(path.decode("utf-8", errors="surrogateescape"))
+            self._count_change(file_id, added + b"\t" + deleted, timestamp, files)
+
+        self._finish_commit(files)
+        return self
+
+    def _count_change(self, file_id: int, stats: bytes, timestamp: int, files: List[int]) -> None:
+        added, _, deleted = stats.partition(b"\t")
+        self.commits[file_id] += 1
+        # الملفات الثنائية تظهر بـ "-" بدلاً من عدد الأسطر
+        if added != b"-":
+            self.added[file_id] += int(added)
+            self.deleted[file_id] += int(deleted)
+        if not self.last_touched[file_id]:
+            self.last_touched[file_id] = timestamp
+        files.append(file_id)
+
+    def _finish_commit(self, files: List[int]) -> None:
+        """تحديث أزواج الاقتران للملفات التي تغيرت معاً في التزام واحد"""
+        if not 2 <= len(files) <= MAX_COUPLING_FILES:
+            return
+
+        for pair in combinations(sorted(set(files)), 2):
+            self.coupling[pair] = self.coupling.get(pair, 0) + 1
+
+        if len(self.coupling) > MAX_COUPLING_PAIRS:
+            self._prune_coupling()
+
+    def _prune_coupling(self) -> None:
+        """حذف الأزواج النادرة (عد تقريبي يحفظ الأزواج المتكررة)"""
+        while len(self.coupling) > MAX_COUPLING_PAIRS // 2:
+            self._prune_floor += 1
+            self.coupling = {
+                pair: count for pair, count in self.coupling.items() if count > self._prune_floor
+            }
+
+    def _tracked_paths(self) -> set:
+        """الملفات الموجودة حالياً (النقاط الساخنة تقتصر عليها)"""
+        output = subprocess.run(
+            ["git", "-C", str(self.repo_path), "ls-files", "-z"],
+            capture_output=True,
+            check=True
+        ).stdout
+        return {path.decode("utf-8", errors="surrogateescape") for path in output.split(b"\0") if path}
+
+    @staticmethod
+    def _iso(timestamp: Optional[int]) -> Optional[str]:
+        return datetime.fromtimestamp(timestamp, timezone.utc).isoformat() if timestamp else None
+
+    def _file_record(self, file_id: int) -> Dict[str, Any]:
+        churn = self.added[file_id] + self.deleted[file_id]
+        return {
+            "path": self.paths[file_id],
+            "commits": self.commits[file_id],
+            "added": self.added[file_id],
+            "deleted": self.deleted[file_id],
+            "churn": churn,
+            "last_touched": self._iso(self.last_touched[file_id]),
+            # تكرار التغيير مرجحاً بحجمه
+            "score": round(self.commits[file_id] * math.log1p(churn), 2)
+        }
+
+    def report(self, top_n: int = TOP_N) -> Dict[str, Any]:
+        """ملخص النقاط الساخنة والاقتران بصيغة history_analysis.json"""
+        tracked = self._tracked_paths()
+        # المسارات القديمة (قبل إعادة التسمية) تشير إلى معرف الملف الحالي
+        current = [file_id for file_id, path in enumerate(self.paths) if path in tracked]
+
+        hotspots = sorted(
+            (self._file_record(file_id) for file_id in current),
+            key=lambda record: record["score"], reverse=True
+        )
+
+        # نسبة التعديلات التي يتركز فيها أعلى 10% من الملفات
+        churns = sorted((self.added[i] + self.deleted[i] for i in current), reverse=True)
+        top_share = sum(churns[:max(1, len(churns) // 10)]) / sum(churns) if sum(churns) else 0.0
+
+        coupling = []
+        current_ids = set(current)
+        for (a, b), shared in self.coupling.items():
+            if shared < MIN_SHARED_COMMITS or a not in current_ids or b not in current_ids:
+                continue
+            coupling.append({
+                "files": [self.paths[a], self.paths[b]],
+                "shared_commits": shared,
+                # نسبة التغييرات المشتركة إلى متوسط تغييرات الملفين
+                "degree": round(shared / ((self.commits[a] + self.commits[b]) / 2), 2)
+            })
+        coupling.sort(key=lambda pair: (pair["degree"], pair["shared_commits"]), reverse=True)
+
+        return {
+            "total_commits": self.total_commits,
+            "first_commit_date": self._iso(self.first_commit),
+            "last_commit_date": self._iso(self.last_commit),
+            "files_changed": len(current),
+            "churn_concentration": round(top_share, 3),
+            "hotspots": hotspots[:top_n],
+            "coupling": coupling[:top_n],
+            "window": {"max_commits": self.max_commits, "since": self.since}
+        }
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+# script: git_metadata.py
+
+import subprocess
+import threading
+from pathlib import Path
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+class GitMetadata:
+    """قراءة بيانات Git الوصفية دون إنشاء كائن لكل التزام
+
+    تُقرأ الكائنات عبر جلسة `git cat-file --batch` واحدة طويلة التشغيل،
+    وتُحسب الأعداد والمراجع بأوامر git المخصصة لها (rev-list --count و
+    for-each-ref) فتبقى الذاكرة ثابتة مهما كان طول التاريخ.
+    """
+
+    def __init__(self, repo_path: str):
+        self.repo_path = Path(repo_path)
+        self._batch: Optional[subprocess.Popen] = None
+        self._batch_lock = threading.Lock()
+
+    def __enter__(self) -> "GitMetadata":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        self.close()
+        return False
+
+    def _git(self, *args: str) -> str:
+        """تشغيل أمر git قصير المخرجات في المستودع"""
+        result = subprocess.run(
+            ["git", "-C", str(self.repo_path), *args],
+            capture_output=True,
+            text=True,
+            check=True
+        )
+        return result.stdout
+
+    def read_object(self, rev: str) -> Tuple[str, str, bytes]:
+        """قراءة كائن (sha، النوع، المحتوى) من جلسة cat-file المشتركة"""
+        with self._batch_lock:
+            if self._batch is None:
+                self._batch = subprocess.Popen(
+                    ["git", "-C", str(self.repo_path), "cat-file", "--batch"],
+                    stdin=subprocess.PIPE,
+                    stdout=subprocess.PIPE
+                )
+
+            self._batch.stdin.write(rev.encode("utf-8") + b"\n")
+            self._batch.stdin.flush()
+
+            header = self._batch.stdout.readline().decode("utf-8").split()
+            if len(header) != 3:
+                raise KeyError(f"كائن غير موجود: {rev}")
+
+            sha, object_type, size = header
+            content = self._batch.stdout.read(int(size))
+            self._batch.stdout.read(1)  # السطر الفاصل بعد المحتوى
+            return sha, object_type, content
+
+    def commit(self, rev: str = "HEAD") -> Dict[str, Any]:
+        """معلومات التزام واحد بصيغة repo_info.json"""
+        sha, _, content = self.read_object(rev)
+        headers, _, message = content.decode("utf-8", errors="replace").partition("\n\n")
+
+        fields: Dict[str, str] = {}
+        for line in headers.splitlines():
+            key, _, value = line.partition(" ")
+            fields.setdefault(key, value)
+
+        author_name = fields.get("author", "").rsplit("<", 1)[0].strip()
+        return {
+            "sha": sha,
+            "message": message.strip(),
+            "author": author_name,
+            "date": self._parse_signature_date(fields.get("committer", ""))
+        }
+
+    @staticmethod
+    def _parse_signature_date(signature: str) -> Optional[str]:
+        """تحويل '<name> <email> <epoch> <+hhmm>' إلى تاريخ ISO بمنطقته الزمنية"""
+        try:
+            epoch, offset = signature.rsplit(" ", 2)[-2:]
+            sign = -1 if offset.startswith("-") else 1
+            tz = timezone(sign * timedelta(hours=int(offset[1:3]), minutes=int(offset[3:5])))
+            return datetime.fromtimestamp(int(epoch), tz).isoformat()
+        except (ValueError, IndexError):
+            return None
+
+    def commit_count(self, rev: str = "HEAD") -> int:
+        """عدد الالتزامات القابلة للوصول من rev"""
+        return int(self._git("rev-list", "--count", rev).strip() or 0)
+
+    def refs(self) -> Dict[str, List[Dict[str, str]]]:
+        """الفروع المحلية والبعيدة والوسوم مع SHA كل منها"""
+        output = self._git(
+            "for-each-ref",
+            "--format=%(refname)%00%(refname:short)%00%(objectname)",
+            "refs/heads", "refs/remotes", "refs/tags"
+        )
+
+        refs: Dict[str, List[Dict[str, str]]] = {"branches": [], "remote_branches": [], "tags": []}
+        for line in output.splitlines():
+            full_name, short_name, sha = line.split("\0")
+            if full_name.startswith("refs/heads/"):
+                kind = "branches"
+            elif full_name.startswith("refs/tags/"):
+                kind = "tags"
+            elif not full_name.endswith("/HEAD"):
+                kind = "remote_branches"
+            else:
+                continue
+            refs[kind].append({"name": short_name, "sha": sha})
+        return refs
+
+    def is_shallow(self) -> bool:
+        return self._git("rev-parse", "--is-shallow-repository").strip() == "true"
+
+    def summary(self) -> Dict[str, Any]:
+        """ملخص المستودع الذي تحفظه مرحلة BUILD في repo_info.json"""
+        refs = self.refs()
+        return {
+            "last_commit": self.commit("HEAD"),
+            "total_commits": self.commit_count("HEAD"),
+            "shallow": self.is_shallow(),
+            "branches": [ref["name"] for ref in refs["branches"]],
+            "tags": [ref["name"] for ref in refs["tags"]],
+            "refs": refs
+        }
+
+    def close(self) -> None:
+        """إنهاء جلسة cat-file"""
+        with self._batch_lock:
+            if self._batch is not None:
+                self._batch.stdin.close()
+                self._batch.wait()
+                self._batch = None
@@ -4,11 +4,13 @@
 import json
 import math
 from pathlib import Path
-from typing import Dict, List, Any, Tuple
+from typing import Dict, List, Any, Optional, Tuple
 from dataclasses import dataclass, asdict
 from enum import Enum
 import logging
 
+from file_inventory import load_inventory
+
 class RiskLevel(Enum):
     """مستويات المخاطر"""
     LOW = "منخفض"
@@ -56,14 +58,28 @@ class RiskItem:
     def risk_score(self) -> float:
         return self.probability * self.impact
 
+    def to_dict(self) -> Dict[str, Any]:
+        """تحويل إلى قاموس قابل للتسلسل JSON"""
+        data = asdict(self)
+        data["level"] = self.level.value
+        return data
+
 class QualityAssessor:
     """مقيم جودة المشروع"""
 
-    def __init__(self, repo_path: str, output_dir: str):
+    def __init__(self, repo_path: str, output_dir: str,
+                 artifacts: Optional[Dict[str, Any]] = None):
         self.repo_path = Path(repo_path)
         self.output_dir = Path(output_dir)
         self.logger = logging.getLogger(__name__)
 
+        # نتائج المراحل السابقة في الذاكرة (مفتاحها المسار النسبي للملف)
+        self.artifacts = artifacts if artifacts is not None else {}
+
+        # جرد ملفات المستودع من مرحلة BUILD (بدلاً من rglob متكرر على الشجرة)
+        self.inventory = load_inventory(str(self.repo_path), str(self.output_dir), self.artifacts)
+        self._lower_paths: Optional[List[str]] = None
+
         # أوزان المعايير (يمكن تخصيصها)
         self.weights = {
             QualityMetric.ARCHITECTURE: 0.20,
@@ -80,9 +96,19 @@ class QualityAssessor:
         self.build_data = self._load_json("artifacts/build/codebase_analysis.json")
         self.assemble_data = self._load_json("artifacts/assemble/dependency_graph.json")
         self.api_data = self._load_json("artifacts/assemble/api_analysis.json")
+        self.history_data = self._load_json("artifacts/build/history_analysis.json")
+
+    def _any_path_contains(self, keyword: str) -> bool:
+        """هل يحتوي أي مسار في المستودع على الكلمة (تُحسب المسارات مرة واحدة)"""
+        if self._lower_paths is None:
+            self._lower_paths = [str(path).lower() for path in self.inventory.rglob("*")]
+        return any(keyword in path for path in self._lower_paths)
 
     def _load_json(self, file_path: str) -> Dict[str, Any]:
         """تحميل ملف JSON"""
+        if file_path in self.artifacts:
+            return self.artifacts[file_path]
+
         try:
             with open(self.output_dir / file_path, 'r', encoding='utf-8') as f:
                 return json.load(f)
@@ -111,7 +137,11 @@ class QualityAssessor:
                     evidence.append("لا توجد تبعيات دورية")
                 else:
                     score -= len(circular_deps) * 0.5
-                    evidence.append(f"تم العثور على {len(circular_deps)} تبعية دورية")
+                    modules_in_cycles = sum(len(c["modules"]) for c in circular_deps)
+                    evidence.append(
+                        f"تم العثور على {len(circular_deps)} تبعية دورية (مكونات مترابطة بقوة) "
+                        f"تضم {modules_in_cycles} وحدة"
+                    )
                     recommendations.append("إصلاح التبعيات الدورية لتحسين بنية الكود")
 
                 # فحص مؤشرات الـ coupling
@@ -235,7 +265,7 @@ class QualityAssessor:
 
         found_sensitive = []
         for file_pattern in sensitive_files:
-            matches = list(self.repo_path.rglob(file_pattern))
+            matches = self.inventory.rglob(file_pattern)
             if matches:
                 found_sensitive.extend([str(f.name) for f in matches])
 
@@ -249,9 +279,9 @@ class QualityAssessor:
 
         # فحص استخدام HTTPS
         has_https_config = any(
-            list(self.repo_path.rglob("*ssl*")) +
-            list(self.repo_path.rglob("*tls*")) +
-            list(self.repo_path.rglob("*https*"))
+            self.inventory.rglob("*ssl*") +
+            self.inventory.rglob("*tls*") +
+            self.inventory.rglob("*https*")
         )
 
         if has_https_config:
@@ -261,7 +291,7 @@ class QualityAssessor:
             recommendations.append("إضافة تكوين HTTPS/TLS")
 
         # فحص ملفات Docker
-        dockerfiles = list(self.repo_path.rglob("Dockerfile*"))
+        dockerfiles = self.inventory.rglob("Dockerfile*")
         if dockerfiles:
             score += 0.5
             evidence.append("استخدام Docker (عزل أفضل)")
@@ -285,7 +315,7 @@ class QualityAssessor:
         ]
 
         potential_secrets = []
-        for code_file in self.repo_path.rglob("*"):
+        for code_file in self.inventory.rglob("*"):
             if code_file.suffix in ['.py', '.js', '.java', '.go', '.rs']:
                 try:
                     with open(code_file, 'r', encoding='utf-8') as f:
@@ -317,10 +347,10 @@ class QualityAssessor:
         recommendations = []
 
         # فحص وجود containerization
-        has_docker = bool(list(self.repo_path.rglob("Dockerfile*")))
-        has_compose = bool(list(self.repo_path.rglob("docker-compose*.yml")))
-        has_k8s = bool(list(self.repo_path.rglob("k8s/*.yaml"))) or \
-                  bool(list(self.repo_path.rglob("kubernetes/*.yaml")))
+        has_docker = bool(self.inventory.rglob("Dockerfile*"))
+        has_compose = bool(self.inventory.rglob("docker-compose*.yml"))
+        has_k8s = bool(self.inventory.rglob("k8s/*.yaml")) or \
+                  bool(self.inventory.rglob("kubernetes/*.yaml"))
 
         container_score = 0
         if has_docker:
@@ -345,7 +375,7 @@ class QualityAssessor:
 
         microservices_score = 0
         for indicator in microservices_indicators:
-            if any(indicator in str(path).lower() for path in self.repo_path.rglob("*")):
+            if self._any_path_contains(indicator):
                 microservices_score += 0.25
 
         score += microservices_score
@@ -354,11 +384,11 @@ class QualityAssessor:
 
         # فحص قواعد البيانات
         db_files = (
-            list(self.repo_path.rglob("*redis*")) +
-            list(self.repo_path.rglob("*mongo*")) +
-            list(self.repo_path.rglob("*postgres*")) +
-            list(self.repo_path.rglob("*mysql*")) +
-            list(self.repo_path.rglob("*elastic*"))
+            self.inventory.rglob("*redis*") +
+            self.inventory.rglob("*mongo*") +
+            self.inventory.rglob("*postgres*") +
+            self.inventory.rglob("*mysql*") +
+            self.inventory.rglob("*elastic*")
         )
 
         if db_files:
@@ -367,10 +397,10 @@ class QualityAssessor:
 
         # فحص CI/CD
         ci_files = (
-            list(self.repo_path.rglob(".github/workflows/*.yml")) +
-            list(self.repo_path.rglob(".gitlab-ci.yml")) +
-            list(self.repo_path.rglob("Jenkinsfile")) +
-            list(self.repo_path.rglob(".circleci/config.yml"))
+            self.inventory.rglob(".github/workflows/*.yml") +
+            self.inventory.rglob(".gitlab-ci.yml") +
+            self.inventory.rglob("Jenkinsfile") +
+            self.inventory.rglob(".circleci/config.yml")
         )
 
         if ci_files:
@@ -394,7 +424,7 @@ class QualityAssessor:
         recommendations = []
 
         # فحص وجود README
-        readme_files = list(self.repo_path.rglob("README*"))
+        readme_files = self.inventory.rglob("README*")
         if readme_files:
             score += 1.0
             evidence.append("ملف README موجود")
@@ -424,9 +454,9 @@ class QualityAssessor:
 
         # فحص ملفات التوثيق
         doc_files = (
-            list(self.repo_path.rglob("docs/*")) +
-            list(self.repo_path.rglob("documentation/*")) +
-            list(self.repo_path.rglob("*.md"))
+            self.inventory.rglob("docs/*") +
+            self.inventory.rglob("documentation/*") +
+            self.inventory.rglob("*.md")
         )
 
         if len(doc_files) > 3:
@@ -455,11 +485,11 @@ class QualityAssessor:
 
         # فحص اختبارات
         test_files = (
-            list(self.repo_path.rglob("test_*.py")) +
-            list(self.repo_path.rglob("*test.py")) +
-            list(self.repo_path.rglob("*.test.js")) +
-            list(self.repo_path.rglob("*Test.java")) +
-            list(self.repo_path.rglob("tests/*"))
+            self.inventory.rglob("test_*.py") +
+            self.inventory.rglob("*test.py") +
+            self.inventory.rglob("*.test.js") +
+            self.inventory.rglob("*Test.java") +
+            self.inventory.rglob("tests/*")
         )
 
         if test_files:
@@ -469,6 +499,31 @@ class QualityAssessor:
         else:
             recommendations.append("إضافة اختبارات للكود")
 
+        # النقاط الساخنة من تاريخ التعديلات: تركز التغييرات في ملفات قليلة
+        hotspots = self.history_data.get("hotspots", [])
+        if hotspots:
+            concentration = self.history_data.get("churn_concentration", 0)
+            top_files = ", ".join(h["path"] for h in hotspots[:3])
+            evidence.append(f"النقاط الساخنة الأكثر تعديلاً: {top_files}")
+
+            if concentration > 0.5:
+                score -= 0.5
+                evidence.append(f"{concentration:.0%} من التعديلات في 10% من الملفات")
+                recommendations.append("إعادة هيكلة الملفات الأكثر تعديلاً وتقسيمها")
+
+        # شجرة التبعيات الانتقالية من ملف القفل
+        lockfile = self.build_data.get("dependencies", {}).get("lockfile")
+        if lockfile:
+            evidence.append(
+                f"شجرة التبعيات: {lockfile['total_packages']} حزمة انتقالية، "
+                f"أقصى عمق {lockfile['max_depth']}"
+            )
+
+            if lockfile["duplicate_copies"] > 0.1 * lockfile["total_packages"]:
+                score -= 0.5
+                evidence.append(f"{lockfile['duplicated_packages']} حزمة بإصدارات متعددة")
+                recommendations.append("توحيد الإصدارات المكررة (npm dedupe) وتحديث التبعيات المتأخرة")
+
         return ScoreCard(
             metric="Maintainability",
             score=min(score, 10.0),
@@ -491,13 +546,13 @@ class QualityAssessor:
 
         all_test_files = []
         for pattern in test_patterns:
-            all_test_files.extend(list(self.repo_path.rglob(pattern)))
+            all_test_files.extend(self.inventory.rglob(pattern))
 
         # حساب نسبة الاختبارات
         all_code_files = []
         code_patterns = ["*.py", "*.js", "*.java", "*.go", "*.php", "*.ts"]
         for pattern in code_patterns:
-            all_code_files.extend(list(self.repo_path.rglob(pattern)))
+            all_code_files.extend(self.inventory.rglob(pattern))
 
         # تصفية ملفات الاختبار من ملفات الكود
         code_files = [f for f in all_code_files if f not in all_test_files]
@@ -540,7 +595,7 @@ class QualityAssessor:
         found_frameworks = []
         for framework, indicators in test_frameworks.items():
             for indicator in indicators:
-                if list(self.repo_path.rglob(f"*{indicator}*")):
+                if self.inventory.rglob(f"*{indicator}*"):
                     found_frameworks.append(framework)
                     break
 
@@ -549,9 +604,9 @@ class QualityAssessor:
             evidence.append(f"أطر اختبار: {', '.join(found_frameworks)}")
 
         # فحص ملفات تكوين التغطية
-        coverage_files = list(self.repo_path.rglob(".coveragerc")) + \
-                        list(self.repo_path.rglob("coverage.xml")) + \
-                        list(self.repo_path.rglob("jest.config.js"))
+        coverage_files = self.inventory.rglob(".coveragerc") + \
+                        self.inventory.rglob("coverage.xml") + \
+                        self.inventory.rglob("jest.config.js")
 
         if coverage_files:
             score += 0.5
@@ -583,7 +638,7 @@ class QualityAssessor:
         for doc_type, file_patterns in essential_docs:
             found = False
             for pattern in file_patterns:
-                if list(self.repo_path.rglob(pattern)):
+                if self.inventory.rglob(pattern):
                     found = True
                     break
 
@@ -594,14 +649,15 @@ class QualityAssessor:
                 recommendations.append(f"إضافة {doc_type}")
 
         # فحص مجلد التوثيق المخصص
-        docs_dirs = list(self.repo_path.rglob("docs/")) + \
-                   list(self.repo_path.rglob("documentation/"))
+        docs_dirs = self.inventory.rglob("docs/") + \
+                   self.inventory.rglob("documentation/")
 
         if docs_dirs:
             docs_files = []
             for docs_dir in docs_dirs:
-                docs_files.extend(list(docs_dir.rglob("*.md")))
-                docs_files.extend(list(docs_dir.rglob("*.rst")))
+                under = str(docs_dir.relative_to(self.repo_path))
+                docs_files.extend(self.inventory.rglob("*.md", under=under))
+                docs_files.extend(self.inventory.rglob("*.rst", under=under))
 
             if len(docs_files) >= 5:
                 score += 1.5
@@ -614,7 +670,7 @@ class QualityAssessor:
         documented_files = 0
         total_code_files = 0
 
-        for code_file in self.repo_path.rglob("*.py"):
+        for code_file in self.inventory.rglob("*.py"):
             if any(part.startswith('.') for part in code_file.parts):
                 continue
 
@@ -664,7 +720,7 @@ class QualityAssessor:
         found_optimizations = []
         for opt_type, keywords in optimization_indicators.items():
             for keyword in keywords:
-                if any(keyword in str(path).lower() for path in self.repo_path.rglob("*")):
+                if self._any_path_contains(keyword):
                     found_optimizations.append(opt_type)
                     break
 
@@ -674,9 +730,9 @@ class QualityAssessor:
 
         # فحص ملفات قياس الأداء
         benchmark_files = (
-            list(self.repo_path.rglob("*benchmark*")) +
-            list(self.repo_path.rglob("*performance*")) +
-            list(self.repo_path.rglob("*profiling*"))
+            self.inventory.rglob("*benchmark*") +
+            self.inventory.rglob("*performance*") +
+            self.inventory.rglob("*profiling*")
         )
 
         if benchmark_files:
@@ -693,7 +749,7 @@ class QualityAssessor:
 
         found_monitoring = []
         for tool in monitoring_tools:
-            if any(tool in str(path).lower() for path in self.repo_path.rglob("*")):
+            if self._any_path_contains(tool):
                 found_monitoring.append(tool)
 
         if found_monitoring:
@@ -756,7 +812,8 @@ class QualityAssessor:
             risks.append(RiskItem(
                 id="RISK-ARCH-001",
                 title="تبعيات دورية في المعمارية",
-                description=f"وجود {len(circular_deps)} تبعية دورية قد تعقد الصيانة",
+                description=f"وجود {len(circular_deps)} تبعية دورية قد تعقد الصيانة، أكبرها: "
+                            + " ↔ ".join(circular_deps[0]["modules"][:5]),
                 category="architecture",
                 probability=1.0,
                 impact=6.0,
@@ -768,6 +825,69 @@ class QualityAssessor:
                 ]
             ))
 
+        # مخاطر النقاط الساخنة: ملفات كثيرة التعديل بحجم تغييرات كبير
+        hotspots = self.history_data.get("hotspots", [])
+        if hotspots and self.history_data.get("churn_concentration", 0) > 0.5:
+            top = hotspots[:5]
+            risks.append(RiskItem(
+                id="RISK-HOTSPOT-001",
+                title="تركز التعديلات في نقاط ساخنة",
+                description="ملفات تتكرر تعديلاتها أكثر من غيرها: " + ", ".join(
+                    f"{h['path']} ({h['commits']} التزام)" for h in top
+                ),
+                category="maintainability",
+                probability=0.7,
+                impact=6.0,
+                level=RiskLevel.MEDIUM,
+                mitigation_strategies=[
+                    "تقسيم الملفات الساخنة إلى وحدات أصغر",
+                    "زيادة تغطية الاختبارات للملفات الأكثر تعديلاً",
+                    "مراجعة أدق للتغييرات على هذه الملفات"
+                ]
+            ))
+
+        # مخاطر الاقتران الخفي: ملفات في مجلدات مختلفة تتغير معاً دائماً
+        hidden_coupling = [
+            pair for pair in self.history_data.get("coupling", [])
+            if pair["degree"] >= 0.7
+            and Path(pair["files"][0]).parent != Path(pair["files"][1]).parent
+        ]
+        if hidden_coupling:
+            risks.append(RiskItem(
+                id="RISK-COUPLING-001",
+                title="اقتران خفي بين الوحدات",
+                description=f"{len(hidden_coupling)} زوج ملفات في مجلدات مختلفة يتغير معاً، مثل: "
+                            + " و ".join(hidden_coupling[0]["files"]),
+                category="architecture",
+                probability=0.6,
+                impact=5.0,
+                level=RiskLevel.MEDIUM,
+                mitigation_strategies=[
+                    "جمع المنطق المشترك في وحدة واحدة",
+                    "توضيح الواجهات بين الوحدات المقترنة"
+                ]
+            ))
+
+        # مخاطر حجم شجرة التبعيات: سطح أوسع لثغرات سلسلة التوريد
+        lockfile = self.build_data.get("dependencies", {}).get("lockfile")
+        if lockfile and lockfile["total_packages"] >= 1000:
+            risks.append(RiskItem(
+                id="RISK-DEPS-001",
+                title="شجرة تبعيات انتقالية كبيرة",
+                description=f"{lockfile['total_packages']} حزمة في {lockfile['lockfile']} "
+                            f"({lockfile['direct_dependencies'] + lockfile['direct_dev_dependencies']} مباشرة، "
+                            f"أقصى عمق {lockfile['max_depth']})",
+                category="security",
+                probability=0.5,
+                impact=5.0,
+                level=RiskLevel.MEDIUM,
+                mitigation_strategies=[
+                    "إزالة التبعيات غير المستخدمة",
+                    "تشغيل npm audit دورياً",
+                    "توحيد الإصدارات المكررة"
+                ]
+            ))
+
         # مخاطر قابلية التوسع
         scalability_score = next((s.score for s in scorecards if s.metric == "Scalability"), 5.0)
         if scalability_score < 6.0:
@@ -846,7 +966,7 @@ class QualityAssessor:
                 "assessment_date": json.dumps(None, default=str)  # سيتم استبدالها بالتاريخ الفعلي
             },
             "detailed_scores": [asdict(card) for card in scorecards],
-            "risk_register": [asdict(risk) for risk in risks],
+            "risk_register": [risk.to_dict() for risk in risks],
             "recommendations": {
                 "immediate": [],
                 "short_term": [],
@@ -874,6 +994,16 @@ class QualityAssessor:
 
         return report
 
+    def save_report(self, report: Dict[str, Any]) -> Path:
+        """حفظ تقرير التقييم"""
+        output_path = self.output_dir / "artifacts/grade/scorecard.json"
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+
+        with open(output_path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+
+        return output_path
+
 def main():
     """الدالة الرئيسية"""
     import sys
@@ -893,11 +1023,7 @@ def main():
     report["summary"]["assessment_date"] = datetime.now().isoformat()
 
     # حفظ التقرير
-    output_path = Path(output_dir) / "artifacts/grade/scorecard.json"
-    output_path.parent.mkdir(parents=True, exist_ok=True)
-
-    with open(output_path, "w", encoding="utf-8") as f:
-        json.dump(report, f, indent=2, ensure_ascii=False)
+    output_path = assessor.save_report(report)
 
     # طباعة ملخص
     print(f"✅ تم إنتاج تقرير التقييم")
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+# script: graph_cycles.py
+
+from array import array
+from typing import Dict, Iterator, List, Sequence, Set
+
+# الحد الأقصى للدورات الأولية المعدودة (عددها قد ينمو أسياً في الرسوم الكثيفة)
+MAX_CYCLES = 1000
+
+# الرسم البياني: لكل عقدة (معرف صحيح من 0) قائمة العقد التي تشير إليها
+Adjacency = Sequence[Sequence[int]]
+
+def strongly_connected_components(adjacency: Adjacency) -> List[List[int]]:
+    """المكونات المترابطة بقوة بخوارزمية Tarjan التكرارية في زمن خطي
+
+    تُستخدم مكدسات صريحة بدلاً من الاستدعاء الذاتي فلا يُبلغ حد العودية
+    في السلاسل العميقة. تُعاد المكونات بترتيب طوبولوجي عكسي.
+    """
+    count = len(adjacency)
+    index = array("i", [-1]) * count
+    low = array("i", [0]) * count
+    on_stack = bytearray(count)
+    stack: List[int] = []
+    components: List[List[int]] = []
+    counter = 0
+
+    for root in range(count):
+        if index[root] >= 0:
+            continue
+
+        index[root] = low[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack[root] = 1
+        work = [(root, iter(adjacency[root]))]
+
+        while work:
+            node, successors = work[-1]
+            for successor in successors:
+                if index[successor] < 0:
+                    index[successor] = low[successor] = counter
+                    counter += 1
+                    stack.append(successor)
+                    on_stack[successor] = 1
+                    work.append((successor, iter(adjacency[successor])))
+                    break
+                if on_stack[successor] and index[successor] < low[node]:
+                    low[node] = index[successor]
+            else:
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    if low[node] < low[parent]:
+                        low[parent] = low[node]
+
+                if low[node] == index[node]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack[member] = 0
+                        component.append(member)
+                        if member == node:
+                            break
+                    components.append(component)
+
+    return components
+
+def cyclic_components(adjacency: Adjacency) -> List[List[int]]:
+    """المكونات التي تحتوي دورة: أكثر من عقدة، أو عقدة تشير إلى نفسها"""
+    return [
+        component for component in strongly_connected_components(adjacency)
+        if len(component) > 1 or component[0] in adjacency[component[0]]
+    ]
+
+def _unblock(node: int, blocked: Set[int], blocked_by: Dict[int, Set[int]]) -> None:
+    pending = {node}
+    while pending:
+        node = pending.pop()
+        if node in blocked:
+            blocked.remove(node)
+            pending.update(blocked_by.pop(node, ()))
+
+def _circuits_from(start: int, adjacency: Adjacency, allowed: Set[int]) -> Iterator[List[int]]:
+    """الدورات الأولية التي تبدأ من start ضمن العقد المسموحة (Johnson)"""
+    def successors(node: int) -> List[int]:
+        return [successor for successor in adjacency[node] if successor in allowed]
+
+    path = [start]
+    blocked = {start}
+    blocked_by: Dict[int, Set[int]] = {}
+    closed: Set[int] = set()
+    stack = [(start, successors(start))]
+
+    while stack:
+        node, pending = stack[-1]
+        if pending:
+            successor = pending.pop()
+            if successor == start:
+                yield path[:]
+                closed.update(path)
+            elif successor not in blocked:
+                path.append(successor)
+                stack.append((successor, successors(successor)))
+                closed.discard(successor)
+                blocked.add(successor)
+                continue
+
+        if not pending:
+            if node in closed:
+                _unblock(node, blocked, blocked_by)
+            else:
+                for successor in successors(node):
+                    blocked_by.setdefault(successor, set()).add(node)
+            stack.pop()
+            path.pop()
+
+def elementary_cycles(adjacency: Adjacency, components: List[List[int]],
+                      max_cycles: int = MAX_CYCLES) -> Iterator[List[int]]:
+    """الدورات الأولية داخل المكونات الدورية بخوارزمية Johnson، حتى max_cycles
+
+    كل دورة تُعد مرة واحدة من أصغر عقدها؛ البحث من عقدة لا يتجاوز
+    العقد الأكبر منها في المكون نفسه.
+    """
+    found = 0
+    for component in components:
+        allowed = set(component)
+        for start in sorted(component):
+            for cycle in _circuits_from(start, adjacency, allowed):
+                yield cycle
+                found += 1
+                if found >= max_cycles:
+                    return
+            allowed.discard(start)
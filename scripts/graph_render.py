@@ -0,0 +1,317 @@
+#!/usr/bin/env python3
+# script: graph_render.py
+
+import os
+import json
+import math
+import uuid
+import hashlib
+import posixpath
+import importlib.util
+import multiprocessing
+from array import array
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from graph_cycles import strongly_connected_components
+from module_graph import ModuleGraph
+from phase_cache import evict_files
+
+# المسار النسبي لمخرجات المخطط دون امتداد (.png و .svg و .dot)
+GRAPH_IMAGE_BASE = "artifacts/assemble/dependency_graph"
+
+# الحد الأقصى للعقد الظاهرة؛ بعده تُجمع الوحدات حسب المجلد مع فئة "أخرى"
+MAX_VISIBLE_NODES = 60
+
+# الحد الأقصى للحواف الظاهرة (الأثقل وزناً)؛ الباقي يُعد في hidden_edges
+MAX_VISIBLE_EDGES = 150
+
+# عدد مكونات المسار التي تحدد مجموعة الوحدة (src/agents/core/x.ts -> src/agents)
+CLUSTER_DEPTH = 2
+
+# المهلة القصوى لعملية الرسم
+RENDER_TIMEOUT = 180
+
+# يُرفع عند تغيير خوارزمية التخطيط (يبطل التخطيطات المخزنة)
+LAYOUT_VERSION = 1
+
+# الحد الأقصى لحجم التخطيطات المخزنة قبل إزالة الأقدم استخداماً (LRU)
+LAYOUT_CACHE_MAX_BYTES = 64 * 1024 ** 2
+
+OTHERS_LABEL = "أخرى"
+
+def _cluster_of(path: str, internal: bool, depth: int) -> str:
+    if not internal:
+        return "external"
+    return "/".join(posixpath.dirname(path).split("/")[:depth]) or "."
+
+def condense_graph(graph: ModuleGraph, max_nodes: int = MAX_VISIBLE_NODES,
+                   cluster_depth: int = CLUSTER_DEPTH) -> Dict[str, Any]:
+    """الرسم المرئي: المكونات الدورية عقدة واحدة، أو المجلدات إذا تجاوزت العقد الحد
+
+    الناتج قاموس بسيط (عقد وحواف موزونة) يُرسل إلى عملية الرسم.
+    """
+    components = strongly_connected_components(graph)
+    component_of = array("i", [0]) * len(graph)
+    for component_id, component in enumerate(components):
+        for node in component:
+            component_of[node] = component_id
+
+    clusters = [
+        _cluster_of(path, bool(graph.internal[node]), cluster_depth) for node, path in enumerate(graph.paths)
+    ]
+
+    nodes = []
+    cyclic_nodes = bytearray(len(graph))
+    for component in components:
+        members = sorted(component, key=lambda node: graph.paths[node])
+        cyclic = len(members) > 1 or members[0] in graph.successors(members[0])
+        for node in members:
+            cyclic_nodes[node] = cyclic
+        nodes.append({
+            "label": f"⟳ {len(members)}" if len(members) > 1 else posixpath.basename(graph.paths[members[0]]),
+            "cluster": Counter(clusters[node] for node in members).most_common(1)[0][0],
+            "size": len(members),
+            "cyclic": cyclic
+        })
+
+    if len(nodes) <= max_nodes:
+        weights: Counter = Counter()
+        for source, target, _ in graph.edges():
+            if component_of[source] != component_of[target]:
+                weights[(component_of[source], component_of[target])] += 1
+        return _cap_edges({"level": "modules", "nodes": nodes, "hidden_modules": 0}, weights)
+
+    # تجميع الوحدات حسب المجلد (المكون الدوري الواسع قد يمتد عبر مجلدات عدة):
+    # تبقى المجموعات الأكبر حجماً وارتباطاً، والباقي في "أخرى"
+    cluster_size = Counter(clusters)
+    cluster_degree: Counter = Counter()
+    for source, target, _ in graph.edges():
+        if clusters[source] != clusters[target]:
+            cluster_degree[clusters[source]] += 1
+            cluster_degree[clusters[target]] += 1
+
+    ranked = sorted(cluster_size, key=lambda c: (cluster_size[c] + cluster_degree[c], c), reverse=True)
+    visible = ranked[:max_nodes - 1] if len(ranked) > max_nodes else ranked
+    index = {cluster: i for i, cluster in enumerate(visible)}
+    hidden = [cluster for cluster in ranked if cluster not in index]
+
+    cyclic_clusters = {clusters[node] for node in range(len(graph)) if cyclic_nodes[node]}
+    cluster_nodes = [
+        {"label": cluster, "cluster": cluster, "size": cluster_size[cluster], "cyclic": cluster in cyclic_clusters}
+        for cluster in visible
+    ]
+    if hidden:
+        index.update((cluster, len(visible)) for cluster in hidden)
+        cluster_nodes.append({
+            "label": f"{OTHERS_LABEL} ({len(hidden)})", "cluster": OTHERS_LABEL,
+            "size": sum(cluster_size[c] for c in hidden), "cyclic": False
+        })
+
+    cluster_weights: Counter = Counter()
+    for source, target, _ in graph.edges():
+        source, target = index[clusters[source]], index[clusters[target]]
+        if source != target:
+            cluster_weights[(source, target)] += 1
+
+    return _cap_edges({
+        "level": "clusters",
+        "nodes": cluster_nodes,
+        "hidden_modules": sum(cluster_size[c] for c in hidden)
+    }, cluster_weights)
+
+def _cap_edges(spec: Dict[str, Any], weights: Counter) -> Dict[str, Any]:
+    """إبقاء الحواف الأثقل فقط حتى لا يطغى عددها على المخطط"""
+    strongest = sorted(weights.items(), key=lambda item: (-item[1], item[0]))[:MAX_VISIBLE_EDGES]
+    spec["edges"] = sorted([a, b, w] for (a, b), w in strongest)
+    spec["hidden_edges"] = len(weights) - len(strongest)
+    return spec
+
+def graph_hash(spec: Dict[str, Any]) -> str:
+    """تجزئة الرسم المرئي مفتاحاً لتخطيطه المخزن"""
+    payload = json.dumps(
+        {"version": LAYOUT_VERSION, "nodes": spec["nodes"], "edges": spec["edges"]},
+        sort_keys=True, ensure_ascii=False, separators=(",", ":")
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+def to_dot(spec: Dict[str, Any]) -> str:
+    """الرسم المرئي بصيغة Graphviz DOT (المجموعات كـ subgraph cluster)"""
+    def quote(text: str) -> str:
+        return '"' + text.replace("\\", "\\\\").replace('"', '\\"') + '"'
+
+    lines = ["digraph dependencies {", "  rankdir=LR;", "  node [shape=box, style=rounded];"]
+
+    clusters: Dict[str, List[int]] = {}
+    for i, node in enumerate(spec["nodes"]):
+        clusters.setdefault(node["cluster"], []).append(i)
+
+    for c, (cluster, members) in enumerate(sorted(clusters.items())):
+        grouped = spec["level"] == "modules" and len(members) > 1
+        indent = "    " if grouped else "  "
+        if grouped:
+            lines += [f"  subgraph cluster_{c} {{", f"    label={quote(cluster)};"]
+        for i in members:
+            node = spec["nodes"][i]
+            attributes = [f"label={quote(node['label'])}"]
+            if node["cyclic"]:
+                attributes.append("color=red")
+            if node["size"] > 1:
+                attributes.append(f"tooltip={quote(str(node['size']))}")
+            lines.append(f"{indent}n{i} [{', '.join(attributes)}];")
+        if grouped:
+            lines.append("  }")
+
+    for source, target, weight in spec["edges"]:
+        attributes = f" [penwidth={1 + math.log2(weight):.1f}, label={weight}]" if weight > 1 else ""
+        lines.append(f"  n{source} -> n{target}{attributes};")
+
+    lines.append("}")
+    return "\n".join(lines) + "\n"
+
+def compute_layout(spec: Dict[str, Any]) -> List[Tuple[float, float]]:
+    """مواقع العقد: spring_layout بمعامل بذرة ثابت، أو دائرة مرتبة بالمجموعات"""
+    count = len(spec["nodes"])
+    try:
+        import networkx as nx
+
+        G = nx.DiGraph()
+        G.add_nodes_from(range(count))
+        G.add_weighted_edges_from(spec["edges"])
+        positions = nx.spring_layout(G, k=2 / math.sqrt(max(count, 1)), iterations=100, seed=42)
+        return [(float(positions[i][0]), float(positions[i][1])) for i in range(count)]
+
+    except ImportError:
+        order = sorted(range(count), key=lambda i: (spec["nodes"][i]["cluster"], spec["nodes"][i]["label"]))
+        positions = [(0.0, 0.0)] * count
+        for rank, i in enumerate(order):
+            angle = 2 * math.pi * rank / max(count, 1)
+            positions[i] = (math.cos(angle), math.sin(angle))
+        return positions
+
+def _render_images(spec: Dict[str, Any], positions: Optional[List[Tuple[float, float]]],
+                   output_base: str) -> List[Tuple[float, float]]:
+    """رسم PNG و SVG بواجهة Agg (داخل عملية عاملة) وإعادة التخطيط المستخدم"""
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    if positions is None:
+        positions = compute_layout(spec)
+
+    nodes = spec["nodes"]
+    clusters = sorted({node["cluster"] for node in nodes})
+    colors = plt.get_cmap("tab20")
+    color_of = {cluster: colors(i % 20) for i, cluster in enumerate(clusters)}
+
+    side = min(16, 8 + len(nodes) / 8)
+    fig, ax = plt.subplots(figsize=(side * 1.5, side))
+
+    for source, target, weight in spec["edges"]:
+        ax.annotate(
+            "", xy=positions[target], xytext=positions[source],
+            arrowprops={"arrowstyle": "-|>", "color": "gray", "alpha": 0.5,
+                        "linewidth": 0.5 + math.log2(weight), "shrinkA": 8, "shrinkB": 8}
+        )
+
+    for cluster in clusters:
+        members = [i for i, node in enumerate(nodes) if node["cluster"] == cluster]
+        ax.scatter(
+            [positions[i][0] for i in members], [positions[i][1] for i in members],
+            s=[200 + 120 * math.sqrt(nodes[i]["size"]) for i in members],
+            c=[color_of[cluster]], edgecolors=["red" if nodes[i]["cyclic"] else "white" for i in members],
+            linewidths=1.5, alpha=0.85, label=cluster, zorder=2
+        )
+
+    for i, node in enumerate(nodes):
+        ax.text(positions[i][0], positions[i][1], node["label"], fontsize=7, ha="center", va="center", zorder=3)
+
+    if len(clusters) <= 20:
+        ax.legend(loc="upper left", fontsize=7, markerscale=0.4, frameon=False)
+    ax.set_title("خريطة التبعيات", fontsize=16)
+    ax.axis("off")
+    fig.tight_layout()
+
+    fig.savefig(f"{output_base}.png", dpi=150, bbox_inches="tight")
+    fig.savefig(f"{output_base}.svg", bbox_inches="tight")
+    plt.close(fig)
+    return positions
+
+class LayoutCache:
+    """مواقع العقد المحسوبة معنونة بتجزئة الرسم المرئي (مع إزالة LRU حسب الحجم)"""
+
+    def __init__(self, cache_dir: str, max_bytes: int = LAYOUT_CACHE_MAX_BYTES):
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+
+    def get(self, key: str) -> Optional[List[Tuple[float, float]]]:
+        path = self.cache_dir / f"{key}.json"
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                positions = [tuple(position) for position in json.load(f)]
+            # زمن التعديل يمثل آخر استخدام لسياسة LRU
+            os.utime(path)
+            return positions
+        except (OSError, ValueError):
+            return None
+
+    def put(self, key: str, positions: List[Tuple[float, float]]) -> None:
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.cache_dir / f".{key}.{uuid.uuid4().hex}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(positions, f)
+            os.replace(tmp_path, self.cache_dir / f"{key}.json")
+        except OSError:
+            return
+        evict_files(self.cache_dir, self.max_bytes)
+
+def render_dependency_graph(graph: ModuleGraph, output_base: str,
+                            layout_cache_dir: Optional[str] = None,
+                            max_nodes: int = MAX_VISIBLE_NODES) -> Dict[str, Any]:
+    """إنتاج DOT دائماً، و PNG و SVG إذا توفر matplotlib، وإعادة ملخص المخطط
+
+    الرسم يجري في عملية عاملة بمهلة محددة، والتخطيط المخزن يُعاد استخدامه
+    إذا لم يتغير الرسم المرئي.
+    """
+    spec = condense_graph(graph, max_nodes)
+    key = graph_hash(spec)
+
+    with open(f"{output_base}.dot", "w", encoding="utf-8") as f:
+        f.write(to_dot(spec))
+
+    summary = {
+        "level": spec["level"],
+        "visible_nodes": len(spec["nodes"]),
+        "visible_edges": len(spec["edges"]),
+        "hidden_modules": spec["hidden_modules"],
+        "hidden_edges": spec["hidden_edges"],
+        "graph_hash": key,
+        "formats": ["dot"],
+        "layout_cached": False
+    }
+
+    # DOT وحده إذا لم يتوفر matplotlib
+    if importlib.util.find_spec("matplotlib") is None:
+        return summary
+
+    cache = LayoutCache(layout_cache_dir) if layout_cache_dir else None
+    positions = cache.get(key) if cache else None
+    summary["layout_cached"] = positions is not None
+
+    methods = multiprocessing.get_all_start_methods()
+    context = multiprocessing.get_context("fork" if "fork" in methods else "spawn")
+    pool = context.Pool(1)
+    try:
+        positions = pool.apply_async(_render_images, (spec, positions, output_base)).get(RENDER_TIMEOUT)
+    finally:
+        # terminate ينهي عملية رسم تجاوزت المهلة
+        pool.terminate()
+        pool.join()
+
+    if cache and not summary["layout_cached"]:
+        cache.put(key, positions)
+
+    summary["formats"] += ["png", "svg"]
+    return summary
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+# script: install_cache.py
+
+import os
+import json
+import time
+import uuid
+import shutil
+import hashlib
+import logging
+import platform
+import subprocess
+from pathlib import Path
+from typing import List, Optional
+
+# الحد الافتراضي لحجم الذاكرة المؤقتة قبل الإزالة (LRU)
+DEFAULT_MAX_BYTES = 10 * 1024 ** 3
+
+# يُرفع عند تغيير بنية الإدخالات
+INSTALL_CACHE_VERSION = 1
+
+def tool_version(command: List[str]) -> str:
+    """إصدار أداة (node، python...) كجزء من مفتاح الإدخال"""
+    try:
+        result = subprocess.run(command, capture_output=True, text=True, timeout=30)
+        return (result.stdout or result.stderr).strip()
+    except (OSError, subprocess.TimeoutExpired):
+        return ""
+
+def _tree_size(path: Path) -> int:
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.lstat(os.path.join(root, name)).st_size
+            except OSError:
+                continue
+    return total
+
+def _reflink_tree(src: Path, dst: Path) -> bool:
+    """نسخ شجرة بـ reflink (نسخ عند الكتابة) إذا دعمه نظام الملفات"""
+    if platform.system() != "Linux":
+        return False
+    try:
+        result = subprocess.run(
+            ["cp", "-a", "--reflink=always", str(src), str(dst)],
+            capture_output=True,
+            timeout=600
+        )
+    except (OSError, subprocess.TimeoutExpired):
+        return False
+
+    if result.returncode != 0:
+        shutil.rmtree(dst, ignore_errors=True)
+        return False
+    return True
+
+class InstallCache:
+    """ذاكرة مؤقتة محلية لتثبيت التبعيات معنونة بتجزئة ملفات القفل
+
+    تُخزن node_modules أو site-packages للبيئة الافتراضية بعد تثبيت ناجح،
+    وتُستعاد في التشغيلات اللاحقة بـ reflink أو بنسخ مستقل دون الحاجة
+    إلى الشبكة. تُزال الإدخالات الأقدم استخداماً عند تجاوز الحد الأقصى للحجم.
+    """
+
+    def __init__(self, cache_dir: str, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.logger = logging.getLogger(__name__)
+
+    def compute_key(self, kind: str, lockfiles: List[Path], toolchain: str) -> Optional[str]:
+        """مفتاح الإدخال من نوع التثبيت ومحتوى ملفات القفل وإصدار الأدوات"""
+        existing = [path for path in lockfiles if path.exists()]
+        if not existing:
+            return None
+
+        digest = hashlib.sha256()
+        digest.update(f"{INSTALL_CACHE_VERSION}\0{kind}\0{toolchain}\0{platform.machine()}".encode("utf-8"))
+        for path in existing:
+            digest.update(b"\0" + path.name.encode("utf-8") + b"\0")
+            digest.update(path.read_bytes())
+        return f"{kind}-{digest.hexdigest()[:32]}"
+
+    def contains(self, key: str) -> bool:
+        return (self.cache_dir / key / "manifest.json").exists()
+
+    def restore(self, key: str, target: Path) -> bool:
+        """استعادة شجرة مخزنة إلى target (يجب ألا يكون موجوداً)"""
+        entry_dir = self.cache_dir / key
+        data_dir = entry_dir / "data"
+        if not self.contains(key) or target.exists():
+            return False
+
+        try:
+            target.parent.mkdir(parents=True, exist_ok=True)
+            # نسخة مستقلة دائماً: الروابط الصلبة تجعل أي كتابة من البناء أو
+            # الاختبارات تعدل الإدخال المخزن نفسه
+            if not _reflink_tree(data_dir, target):
+                shutil.copytree(data_dir, target, symlinks=True)
+            # زمن التعديل يمثل آخر استخدام لسياسة LRU
+            os.utime(entry_dir)
+            return True
+
+        except OSError as e:
+            self.logger.warning(f"⚠️ تعذر استعادة التثبيت المخزن {key}: {e}")
+            shutil.rmtree(target, ignore_errors=True)
+            return False
+
+    def store(self, key: str, source: Path) -> None:
+        """تخزين شجرة تثبيت ناجح (نسخة مستقلة حتى لا يغيرها البناء لاحقاً)"""
+        entry_dir = self.cache_dir / key
+        if entry_dir.exists() or not source.is_dir():
+            return
+
+        tmp_dir = self.cache_dir / f".tmp-{key}-{uuid.uuid4().hex}"
+        try:
+            tmp_dir.mkdir(parents=True)
+            if not _reflink_tree(source, tmp_dir / "data"):
+                shutil.copytree(source, tmp_dir / "data", symlinks=True)
+
+            size = _tree_size(tmp_dir / "data")
+            with open(tmp_dir / "manifest.json", "w", encoding="utf-8") as f:
+                json.dump({"key": key, "size": size, "stored_at": time.time()}, f, indent=2)
+
+            tmp_dir.rename(entry_dir)
+            self.logger.info(f"💾 خُزن التثبيت {key} ({size / 1024 ** 2:.1f} MB)")
+
+        except OSError as e:
+            self.logger.warning(f"⚠️ تعذر تخزين التثبيت {key}: {e}")
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            return
+
+        self.evict()
+
+    def evict(self) -> None:
+        """إزالة الإدخالات الأقدم استخداماً حتى يعود الحجم تحت الحد"""
+        entries = []
+        for entry_dir in self.cache_dir.iterdir():
+            manifest_path = entry_dir / "manifest.json"
+            try:
+                with open(manifest_path, "r", encoding="utf-8") as f:
+                    size = json.load(f)["size"]
+                entries.append((entry_dir.stat().st_mtime, size, entry_dir))
+            except (OSError, ValueError, KeyError):
+                continue
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, entry_dir in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            self.logger.info(f"🗑️ إزالة تثبيت مخزن: {entry_dir.name}")
+            shutil.rmtree(entry_dir, ignore_errors=True)
+            total -= size
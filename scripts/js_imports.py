@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+# script: js_imports.py
+
+import os
+import re
+import json
+import posixpath
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# امتدادات الوحدات بترتيب تجربتها عند حل مسار بلا امتداد (كما يفعل TypeScript)
+SOURCE_EXTENSIONS = [".ts", ".tsx", ".d.ts", ".js", ".jsx", ".mjs", ".cjs", ".mts", ".cts"]
+
+# امتدادات JavaScript التي يكتبها TypeScript بصيغة ESM بدلاً من المصدر ("./a.js" -> a.ts)
+_EMITTED_EXTENSIONS = {".js": [".ts", ".tsx"], ".jsx": [".tsx"], ".mjs": [".mts"], ".cjs": [".cts"]}
+
+# عدد الملفات في كل دفعة ترسل إلى عملية عاملة
+BATCH_SIZE = 64
+
+# الماسح يتخطى التعليقات والنصوص والقوالب في مرور واحد لمحرك التعابير النمطية،
+# ويلتقط مواصفات الاستيراد فقط. التعابير النمطية الحرفية (/.../) غير مميزة:
+# علامة اقتباس داخلها قد تخفي استيراداً في السطر نفسه فقط.
+_SCANNER = re.compile(
+    r"""
+      //[^\n]*
+    | /\*.*?\*/
+    | (?<![.\w$])(?:import|export)\b[^;'"`()=]*?\bfrom\s*(?P<q1>['"])(?P<from>[^'"\n]+)(?P=q1)
+    | (?<![.\w$])import\s*(?P<q2>['"])(?P<bare>[^'"\n]+)(?P=q2)
+    | (?<![.\w$])(?P<call>require|import)\s*\(\s*(?P<q3>['"`])(?P<arg>[^'"`\n]+)(?P=q3)\s*\)
+    | '(?:[^'\\\n]|\\.)*'
+    | "(?:[^"\\\n]|\\.)*"
+    | `(?:[^`\\]|\\.)*`
+    """,
+    re.VERBOSE | re.DOTALL
+)
+
+# أنواع الحواف في مخرجات الاستخراج
+STATIC_IMPORT = "import"
+DYNAMIC_IMPORT = "dynamic_import"
+REQUIRE = "require"
+
+def extract_specifiers(source: str) -> List[Tuple[str, str]]:
+    """مواصفات الاستيراد في ملف واحد: (المواصفة، نوع الحافة)"""
+    specifiers = []
+    for match in _SCANNER.finditer(source):
+        if match.group("from"):
+            specifiers.append((match.group("from"), STATIC_IMPORT))
+        elif match.group("bare"):
+            specifiers.append((match.group("bare"), STATIC_IMPORT))
+        elif match.group("arg") and "${" not in match.group("arg"):
+            kind = REQUIRE if match.group("call") == "require" else DYNAMIC_IMPORT
+            specifiers.append((match.group("arg"), kind))
+    return specifiers
+
+def _extract_batch(paths: List[str]) -> List[Tuple[str, List[Tuple[str, str]]]]:
+    """استخراج مواصفات دفعة من الملفات (داخل عملية عاملة)"""
+    results = []
+    for path in paths:
+        try:
+            with open(path, "r", encoding="utf-8", errors="replace") as f:
+                results.append((path, extract_specifiers(f.read())))
+        except OSError:
+            continue
+    return results
+
+def _strip_json_comments(text: str) -> str:
+    """إزالة تعليقات JSONC والفواصل الزائدة من tsconfig.json"""
+    text = re.sub(r'("(?:[^"\\]|\\.)*")|//[^\n]*|/\*.*?\*/', lambda m: m.group(1) or "", text, flags=re.DOTALL)
+    return re.sub(r'("(?:[^"\\]|\\.)*")|,(\s*[}\]])', lambda m: m.group(1) or m.group(2), text)
+
+def load_tsconfig(path: Path, _seen: Optional[set] = None) -> Dict:
+    """compilerOptions من tsconfig.json مع دمج extends المحلية"""
+    seen = _seen or set()
+    if path in seen or not path.is_file():
+        return {}
+    seen.add(path)
+
+    try:
+        config = json.loads(_strip_json_comments(path.read_text(encoding="utf-8")))
+    except (OSError, ValueError):
+        return {}
+
+    options: Dict = {}
+    extends = config.get("extends")
+    if isinstance(extends, str) and extends.startswith("."):
+        parent = (path.parent / extends).resolve()
+        if parent.suffix != ".json":
+            parent = parent.with_name(parent.name + ".json")
+        options.update(load_tsconfig(parent, seen))
+
+    own = config.get("compilerOptions", {})
+    # baseUrl نسبي إلى ملف التكوين الذي عرّفه
+    if "baseUrl" in own:
+        own = {**own, "baseUrl": str((path.parent / own["baseUrl"]).resolve())}
+    if "paths" in own and "baseUrl" not in own and "baseUrl" not in options:
+        options["_pathsBase"] = str(path.parent.resolve())
+    options.update(own)
+    return options
+
+class ImportResolver:
+    """حل مواصفات الاستيراد إلى ملفات المستودع
+
+    المسارات النسبية من مجلد الملف، ثم أنماط paths في tsconfig (الأطول
+    بادئة أولاً)، ثم baseUrl. تجرب الامتدادات وملفات index كما يفعل
+    TypeScript؛ الحزم الخارجية (node_modules) لا تُحل.
+    """
+
+    def __init__(self, repo_path: Path, files: Iterable[str], compiler_options: Optional[Dict] = None):
+        self.repo_path = repo_path.resolve()
+        # مسارات نسبية بصيغة POSIX
+        self.files = set(files)
+
+        options = compiler_options or {}
+        base = options.get("baseUrl") or options.get("_pathsBase")
+        self.base_url = self._relative(base) if options.get("baseUrl") else None
+
+        self.paths: List[Tuple[str, str, List[str]]] = []
+        for pattern, targets in options.get("paths", {}).items():
+            prefix, star, suffix = pattern.partition("*")
+            mapped = [
+                posixpath.join(self._relative(base), target) if base else target
+                for target in targets
+            ]
+            self.paths.append((prefix, suffix if star else None, mapped))
+        # TypeScript يختار النمط ذا البادئة الأطول
+        self.paths.sort(key=lambda entry: len(entry[0]), reverse=True)
+
+    def _relative(self, path: str) -> str:
+        try:
+            relative = Path(path).resolve().relative_to(self.repo_path).as_posix()
+        except ValueError:
+            return ""
+        return "" if relative == "." else relative
+
+    def _probe(self, candidate: str) -> Optional[str]:
+        """ملف الوحدة لمسار مرشح (بامتداده، أو بإضافة امتداد، أو index)"""
+        candidate = posixpath.normpath(candidate)
+        if candidate.startswith("../"):
+            return None
+        if candidate in self.files:
+            return candidate
+
+        stem, extension = posixpath.splitext(candidate)
+        for source_extension in _EMITTED_EXTENSIONS.get(extension, []):
+            if stem + source_extension in self.files:
+                return stem + source_extension
+
+        for extension in SOURCE_EXTENSIONS:
+            if candidate + extension in self.files:
+                return candidate + extension
+        for extension in SOURCE_EXTENSIONS:
+            index = posixpath.join(candidate, "index" + extension)
+            if index in self.files:
+                return index
+        return None
+
+    def resolve(self, importer: str, specifier: str) -> Optional[str]:
+        """الملف المستورد (نسبياً إلى المستودع) أو None للحزم الخارجية"""
+        specifier = specifier.split("?", 1)[0]
+        if specifier.startswith("."):
+            return self._probe(posixpath.join(posixpath.dirname(importer), specifier))
+
+        for prefix, suffix, targets in self.paths:
+            if suffix is None:
+                if specifier != prefix:
+                    continue
+                wildcard = ""
+            elif specifier.startswith(prefix) and specifier.endswith(suffix) \
+                    and len(specifier) >= len(prefix) + len(suffix):
+                wildcard = specifier[len(prefix):len(specifier) - len(suffix)]
+            else:
+                continue
+
+            for target in targets:
+                resolved = self._probe(target.replace("*", wildcard, 1))
+                if resolved:
+                    return resolved
+            return None
+
+        if self.base_url is not None:
+            return self._probe(posixpath.join(self.base_url, specifier))
+        return None
+
+def extract_import_graph(repo_path: Path, files: List[str], root: str = "",
+                         max_workers: Optional[int] = None) -> Dict[str, Dict[str, str]]:
+    """رسم الاستيرادات بين ملفات المصدر: {ملف: {ملف مستورد: نوع الحافة}}
+
+    files مسارات نسبية إلى المستودع؛ المفاتيح في الناتج نسبية إلى root
+    (مثل مخرجات `madge --json src`). الدفعات الصغيرة تُعالج في العملية نفسها.
+    """
+    batches = [
+        [str(repo_path / path) for path in files[i:i + BATCH_SIZE]]
+        for i in range(0, len(files), BATCH_SIZE)
+    ]
+    workers = min(max_workers or os.cpu_count() or 1, len(batches))
+
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(_extract_batch, batches))
+    else:
+        results = [_extract_batch(batch) for batch in batches]
+
+    resolver = ImportResolver(repo_path, files, load_tsconfig(repo_path / "tsconfig.json"))
+    prefix = f"{root.strip('/')}/" if root.strip("/") else ""
+
+    def key(path: str) -> str:
+        return path[len(prefix):] if path.startswith(prefix) else path
+
+    graph: Dict[str, Dict[str, str]] = {}
+    for result in results:
+        for absolute, specifiers in result:
+            importer = Path(absolute).relative_to(repo_path).as_posix()
+            edges = graph.setdefault(key(importer), {})
+            for specifier, kind in specifiers:
+                target = resolver.resolve(importer, specifier)
+                if target and target != importer:
+                    # الاستيراد الثابت يغلب إذا تكرر الهدف بأنواع مختلفة
+                    if edges.get(key(target)) != STATIC_IMPORT:
+                        edges[key(target)] = kind
+    return graph
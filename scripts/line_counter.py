@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+# script: line_counter.py
+
+import os
+import re
+import time
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+class Language(NamedTuple):
+    """قواعد التعليقات للغة واحدة"""
+    name: str
+    line_comments: Tuple[str, ...] = ()
+    block_comments: Tuple[Tuple[str, str], ...] = ()
+    # سلاسل ثلاثية تُعد تعليقاً إذا بدأت بها السطر (docstrings في Python)
+    docstrings: Tuple[str, ...] = ()
+    # علامات السلاسل النصية؛ رموز التعليق داخلها كود. السلسلة غير المغلقة تنتهي
+    # بنهاية السطر، عدا multiline_strings (قوالب JavaScript) التي تمتد عبر الأسطر
+    strings: Tuple[str, ...] = ()
+    multiline_strings: Tuple[str, ...] = ()
+
+_C_STYLE = {
+    "line_comments": ("//",),
+    "block_comments": (("/*", "*/"),),
+    "strings": ('"', "'", "`"),
+    "multiline_strings": ("`",)
+}
+
+# اللغات حسب الامتداد (الأسماء كما في مخرجات cloc)
+LANGUAGES: Dict[str, Language] = {
+    ".ts": Language("TypeScript", **_C_STYLE),
+    ".tsx": Language("TypeScript", **_C_STYLE),
+    ".mts": Language("TypeScript", **_C_STYLE),
+    ".cts": Language("TypeScript", **_C_STYLE),
+    ".js": Language("JavaScript", **_C_STYLE),
+    ".jsx": Language("JavaScript", **_C_STYLE),
+    ".mjs": Language("JavaScript", **_C_STYLE),
+    ".cjs": Language("JavaScript", **_C_STYLE),
+    ".py": Language("Python", line_comments=("#",), docstrings=('"""', "'''"), strings=('"', "'")),
+    ".json": Language("JSON"),
+    ".md": Language("Markdown", block_comments=(("<!--", "-->"),)),
+    ".sh": Language("Bourne Shell", line_comments=("#",), strings=('"', "'")),
+    ".bash": Language("Bourne Again Shell", line_comments=("#",), strings=('"', "'")),
+    ".ps1": Language("PowerShell", line_comments=("#",), block_comments=(("<#", "#>"),), strings=('"', "'")),
+    ".psm1": Language("PowerShell", line_comments=("#",), block_comments=(("<#", "#>"),), strings=('"', "'")),
+}
+
+# عدد الملفات في كل دفعة ترسل إلى عملية عاملة
+BATCH_SIZE = 64
+
+# الملفات الأكبر من هذا الحد غالباً مولدة أو بيانات، ويتجاهلها الإحصاء
+MAX_FILE_SIZE = 8 * 1024 * 1024
+
+def language_for(path: str) -> Optional[Language]:
+    return LANGUAGES.get(os.path.splitext(path)[1].lower())
+
+_TOKEN_PATTERNS: Dict[str, "re.Pattern"] = {}
+
+def _token_pattern(language: Language) -> "re.Pattern":
+    """تعبير يطابق بدايات التعليقات والسلاسل النصية للغة"""
+    pattern = _TOKEN_PATTERNS.get(language.name)
+    if pattern is None:
+        tokens = [*language.line_comments, *(start for start, _ in language.block_comments),
+                  *language.docstrings, *language.strings]
+        # الرموز الأطول أولاً (مثل <# قبل #)
+        alternatives = "|".join(re.escape(t) for t in sorted(tokens, key=len, reverse=True))
+        pattern = _TOKEN_PATTERNS[language.name] = re.compile(alternatives or r"(?!)")
+    return pattern
+
+def _block_end(language: Language, start: str) -> str:
+    return next(end for begin, end in language.block_comments if begin == start)
+
+def _string_end(text: str, quote: str, position: int) -> int:
+    """موضع علامة الإغلاق غير المهربة للسلسلة، أو -1 إذا لم تُغلق في السطر"""
+    while True:
+        end = text.find(quote, position)
+        if end < 0:
+            return -1
+        escapes = end - len(text[position:end].rstrip("\\")) - position
+        if escapes % 2 == 0:
+            return end
+        position = end + 1
+
+def classify_lines(text: str, language: Language) -> Tuple[int, int, int]:
+    """تصنيف أسطر نص إلى (فارغة، تعليق، كود) حسب قواعد اللغة"""
+    blank = comment = code = 0
+    # نهاية الكتلة المفتوحة حالياً، وهل هي سلسلة نصية (تُحسب كوداً)
+    open_end: Optional[str] = None
+    open_is_code = False
+
+    for line in text.splitlines():
+        stripped = line.strip()
+        if not stripped:
+            blank += 1
+            continue
+
+        has_code = has_comment = False
+        position = 0
+
+        while position < len(stripped):
+            if open_end is not None:
+                if open_is_code and open_end in language.multiline_strings:
+                    end = _string_end(stripped, open_end, position)
+                else:
+                    end = stripped.find(open_end, position)
+                if open_is_code:
+                    has_code = True
+                else:
+                    has_comment = True
+                if end < 0:
+                    break
+                position = end + len(open_end)
+                open_end = None
+                continue
+
+            # القفز إلى أقرب رمز تعليق أو سلسلة ثلاثية؛ ما قبله كود
+            match = _token_pattern(language).search(stripped, position)
+            if match is None:
+                has_code = True
+                break
+            if match.start() > position and not stripped[position:match.start()].isspace():
+                has_code = True
+
+            token = match.group()
+            position = match.end()
+            if token in language.line_comments:
+                has_comment = True
+                break
+            if token in language.docstrings:
+                # في بداية السطر: docstring، وفي وسطه: سلسلة متعددة الأسطر
+                open_end, open_is_code = token, has_code
+            elif token in language.strings:
+                has_code = True
+                end = _string_end(stripped, token, position)
+                if end >= 0:
+                    position = end + len(token)
+                    continue
+                if token in language.multiline_strings:
+                    open_end, open_is_code = token, True
+                break
+            else:
+                open_end, open_is_code = _block_end(language, token), False
+
+        if has_code:
+            code += 1
+        elif has_comment:
+            comment += 1
+        else:
+            blank += 1
+
+    return blank, comment, code
+
+# عدادات ملف واحد: (اللغة، الفارغة، التعليقات، الكود)
+FileCounts = Tuple[str, int, int, int]
+
+def _count_batch(paths: List[str]) -> List[Tuple[str, FileCounts]]:
+    """إحصاء دفعة ملفات: [(المسار، عدادات الملف)]"""
+    counted = []
+
+    for path in paths:
+        language = language_for(path)
+        if language is None:
+            continue
+
+        try:
+            if os.path.getsize(path) > MAX_FILE_SIZE:
+                continue
+            with open(path, "rb") as f:
+                data = f.read()
+        except OSError:
+            continue
+
+        # تجاهل الملفات الثنائية
+        if b"\0" in data[:8192]:
+            continue
+
+        counted.append((path, (language.name, *classify_lines(data.decode("utf-8", errors="replace"), language))))
+
+    return counted
+
+def count_files(paths: Iterable[Path], max_workers: Optional[int] = None) -> Tuple[Dict[str, FileCounts], int]:
+    """إحصاء كل ملف على حدة بعمليات متوازية: (عدادات كل مسار، عدد العمليات)
+
+    max_workers هو حد المعالجات المتاح للإحصاء؛ الدفعات الصغيرة تُحسب
+    في العملية نفسها لأن كلفة إنشاء العمليات تفوق الفائدة.
+    """
+    files = [str(path) for path in paths if language_for(str(path))]
+    batches = [files[i:i + BATCH_SIZE] for i in range(0, len(files), BATCH_SIZE)]
+    workers = min(max_workers or os.cpu_count() or 1, len(batches))
+
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(_count_batch, batches))
+    else:
+        results = [_count_batch(batch) for batch in batches]
+
+    return {path: counts for result in results for path, counts in result}, max(workers, 1)
+
+def count_lines(paths: Iterable[Path], max_workers: Optional[int] = None,
+                known: Optional[Dict[str, FileCounts]] = None) -> Dict[str, Dict]:
+    """إحصاء الأسطر بصيغة `cloc --json`
+
+    known عدادات محسوبة مسبقاً لبعض المسارات (مثلاً لكائنات git نفسها في
+    فرع آخر) فلا تُقرأ هذه الملفات من جديد.
+    """
+    started = time.perf_counter()
+    known = known or {}
+    paths = [str(path) for path in paths]
+
+    counted, workers = count_files((path for path in paths if path not in known), max_workers)
+    counted.update((path, known[path]) for path in paths if path in known)
+
+    languages: Dict[str, List[int]] = {}
+    for name, *values in counted.values():
+        entry = languages.setdefault(name, [0, 0, 0, 0])
+        entry[0] += 1
+        for i, value in enumerate(values, start=1):
+            entry[i] += value
+
+    report: Dict[str, Dict] = {}
+    total = [0, 0, 0, 0]
+    for name in sorted(languages, key=lambda n: -languages[n][3]):
+        values = languages[name]
+        report[name] = {"nFiles": values[0], "blank": values[1], "comment": values[2], "code": values[3]}
+        total = [a + b for a, b in zip(total, values)]
+
+    elapsed = max(time.perf_counter() - started, 1e-6)
+    n_lines = sum(total[1:])
+    report["header"] = {
+        "counter": "line_counter.py",
+        "workers": workers,
+        "reused_files": len([path for path in paths if path in known]),
+        "elapsed_seconds": round(elapsed, 3),
+        "n_files": total[0],
+        "n_lines": n_lines,
+        "files_per_second": round(total[0] / elapsed, 2),
+        "lines_per_second": round(n_lines / elapsed, 2)
+    }
+    report["SUM"] = {"nFiles": total[0], "blank": total[1], "comment": total[2], "code": total[3]}
+    return report
@@ -0,0 +1,436 @@
+#!/usr/bin/env python3
+# script: lockfile_analyzer.py
+
+import os
+import re
+import gzip
+import json
+from array import array
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, TextIO, Tuple
+
+# المسار النسبي لجدول حزم ملف القفل ضمن مجلد التحليل
+LOCKFILE_ARTIFACT = "artifacts/build/lockfile_packages.json.gz"
+
+# ملفات القفل المدعومة بترتيب الأولوية (npm-shrinkwrap يتقدم عند وجوده)
+LOCKFILE_NAMES = ["npm-shrinkwrap.json", "package-lock.json"]
+
+# متوسط تقريبي لحجم حزمة npm بعد فك الضغط عند غياب node_modules
+AVERAGE_PACKAGE_BYTES = 512 * 1024
+
+# عدد الحزم المكررة في الملخص
+TOP_DUPLICATES = 20
+
+READ_CHUNK_SIZE = 64 * 1024
+
+# بتات عمود flags
+IS_DEV = 1
+IS_OPTIONAL = 2
+IS_PEER = 4
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+
+class JsonStream:
+    """قارئ JSON تزايدي بذاكرة محدودة
+
+    يمر على الكائنات والمصفوفات عنصراً عنصراً ويفك القيم الصغيرة فقط بـ
+    json.JSONDecoder.raw_decode، فلا يُحمّل الملف كاملاً في الذاكرة. القيم
+    غير المطلوبة تُتخطى دون بنائها.
+    """
+
+    def __init__(self, stream: TextIO):
+        self.stream = stream
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+        self._decoder = json.JSONDecoder()
+
+    def _fill(self) -> bool:
+        """قراءة الجزء التالي مع إسقاط ما استُهلك من المخزن"""
+        if self.eof:
+            return False
+        chunk = self.stream.read(READ_CHUNK_SIZE)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buffer = self.buffer[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def _peek(self) -> str:
+        """أول محرف غير فارغ دون استهلاكه"""
+        while True:
+            self.pos = _WHITESPACE.match(self.buffer, self.pos).end()
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._fill():
+                raise ValueError("نهاية غير متوقعة لملف JSON")
+
+    def _expect(self, char: str) -> None:
+        if self._peek() != char:
+            raise ValueError(f"متوقع '{char}' عند الموضع {self.pos}")
+        self.pos += 1
+
+    def value(self) -> Any:
+        """فك القيمة التالية كاملة (للقيم الصغيرة)"""
+        self._peek()
+        while True:
+            try:
+                result, end = self._decoder.raw_decode(self.buffer, self.pos)
+                # رقم أو ثابت في آخر المخزن قد يكون مقطوعاً
+                if end < len(self.buffer) or self.eof:
+                    self.pos = end
+                    return result
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            self._fill()
+
+    def members(self) -> Iterator[str]:
+        """مفاتيح الكائن التالي؛ يجب استهلاك قيمة كل مفتاح قبل طلب التالي"""
+        self._expect("{")
+        if self._peek() == "}":
+            self.pos += 1
+            return
+        while True:
+            key = self.value()
+            self._expect(":")
+            yield key
+            if self._peek() == ",":
+                self.pos += 1
+                continue
+            self._expect("}")
+            return
+
+    def items(self) -> Iterator[None]:
+        """عناصر المصفوفة التالية (يستهلك المستدعي كل عنصر)"""
+        self._expect("[")
+        if self._peek() == "]":
+            self.pos += 1
+            return
+        while True:
+            yield None
+            if self._peek() == ",":
+                self.pos += 1
+                continue
+            self._expect("]")
+            return
+
+    def skip(self) -> None:
+        """تخطي القيمة التالية دون بنائها"""
+        char = self._peek()
+        if char == "{":
+            for _ in self.members():
+                self.skip()
+        elif char == "[":
+            for _ in self.items():
+                self.skip()
+        else:
+            self.value()
+
+class LockfileAnalyzer:
+    """تحليل شجرة التبعيات الانتقالية من package-lock.json بقراءة متدفقة
+
+    يدعم lockfileVersion 2 و 3 (قسم packages بمسارات node_modules المسطحة)
+    و 1 (شجرة dependencies المتداخلة). تُحفظ الحزم كجدول أعمدة مع جداول
+    للأسماء والإصدارات، ويُحسب عمق التبعية بحل الأسماء كما يفعل Node
+    (node_modules الأقرب صعوداً نحو الجذر).
+    """
+
+    def __init__(self, lockfile_path: str):
+        self.lockfile_path = Path(lockfile_path)
+        self.lockfile_version: Optional[int] = None
+
+        # جدولا الأسماء والإصدارات
+        self.names: List[str] = []
+        self._name_ids: Dict[str, int] = {}
+        self.versions: List[str] = []
+        self._version_ids: Dict[str, int] = {}
+
+        # أعمدة الحزم
+        self.paths: List[str] = []
+        self.name_ids = array("I")
+        self.version_ids = array("I")
+        self.nesting = array("H")
+        self.flags = array("B")
+        self.sizes = array("q")
+        self.depths = array("i")
+
+        # التبعيات المعلنة لكل حزمة (معرفات أسماء) بصيغة إزاحات متجاورة
+        self._edge_offsets = array("I", [0])
+        self._edge_names = array("I")
+
+        self._index: Dict[str, int] = {}
+        self._links: Dict[str, str] = {}
+        self.root_dependencies: List[str] = []
+        self.root_dev_dependencies: List[str] = []
+
+    def _intern(self, table: List[str], ids: Dict[str, int], value: str) -> int:
+        value_id = ids.get(value)
+        if value_id is None:
+            value_id = ids[value] = len(table)
+            table.append(value)
+        return value_id
+
+    def analyze(self) -> "LockfileAnalyzer":
+        """قراءة ملف القفل مرة واحدة ثم حساب الأعماق"""
+        with open(self.lockfile_path, "r", encoding="utf-8") as f:
+            stream = JsonStream(f)
+            has_packages = False
+
+            for key in stream.members():
+                if key == "lockfileVersion":
+                    self.lockfile_version = stream.value()
+                elif key == "packages":
+                    has_packages = True
+                    for path in stream.members():
+                        self._add_package(path, stream.value())
+                elif key == "dependencies" and not has_packages and self.lockfile_version != 2:
+                    # الإصدار 1: شجرة متداخلة (الإصدار 2 يكررها بعد packages للتوافق)
+                    self._walk_v1_tree(stream, "")
+                else:
+                    stream.skip()
+
+        # الإصدار 1 لا يسجل الجذر؛ التبعيات المباشرة من package.json المجاور
+        if "" not in self._index:
+            try:
+                with open(self.lockfile_path.parent / "package.json", "r", encoding="utf-8") as f:
+                    self._add_package("", json.load(f))
+            except (OSError, json.JSONDecodeError):
+                pass
+
+        self._compute_depths()
+        return self
+
+    def _add_package(self, path: str, record: Dict[str, Any]) -> None:
+        """إضافة سجل من قسم packages (الإصدار 2 و 3)"""
+        if path == "":
+            self.root_dependencies = sorted({
+                *record.get("dependencies", {}),
+                *record.get("optionalDependencies", {}),
+                *record.get("peerDependencies", {})
+            })
+            self.root_dev_dependencies = sorted(record.get("devDependencies", {}))
+            self._add_edges(path, [*self.root_dependencies, *self.root_dev_dependencies])
+            return
+
+        # روابط مساحات العمل تشير إلى مجلد الحزمة الفعلي
+        if record.get("link"):
+            self._links[path] = record.get("resolved", "")
+            return
+
+        if "node_modules/" not in path:
+            # حزمة مساحة عمل: تُحل تبعياتها لكنها ليست حزمة مثبتة
+            self._add_edges(path, self._declared(record))
+            return
+
+        flags = 0
+        if record.get("dev"):
+            flags |= IS_DEV
+        if record.get("optional") or record.get("devOptional"):
+            flags |= IS_OPTIONAL
+        if record.get("peer"):
+            flags |= IS_PEER
+
+        name = record.get("name") or path.rpartition("node_modules/")[2]
+        self._add_installed(path, name, record.get("version", ""), flags, self._declared(record))
+
+    @staticmethod
+    def _declared(record: Dict[str, Any]) -> List[str]:
+        return [
+            *record.get("dependencies", {}),
+            *record.get("optionalDependencies", {}),
+            *record.get("peerDependencies", {})
+        ]
+
+    def _walk_v1_tree(self, stream: JsonStream, parent: str) -> None:
+        """قراءة شجرة dependencies في الإصدار 1 وتحويلها إلى مسارات node_modules"""
+        for name in stream.members():
+            path = f"{parent}/node_modules/{name}" if parent else f"node_modules/{name}"
+            version, flags, requires = "", 0, []
+
+            for field in stream.members():
+                if field == "dependencies":
+                    self._walk_v1_tree(stream, path)
+                elif field == "requires":
+                    requires = list(stream.value())
+                elif field == "version":
+                    version = stream.value()
+                elif field in ("dev", "optional", "peer"):
+                    if stream.value():
+                        flags |= {"dev": IS_DEV, "optional": IS_OPTIONAL, "peer": IS_PEER}[field]
+                else:
+                    stream.skip()
+
+            self._add_installed(path, name, version, flags, requires)
+
+    def _add_edges(self, path: str, dependencies: List[str]) -> None:
+        self._index[path] = len(self._edge_offsets) - 1
+        self._edge_names.extend(self._intern(self.names, self._name_ids, d) for d in dependencies)
+        self._edge_offsets.append(len(self._edge_names))
+        # صف فارغ للحزم غير المثبتة (الجذر ومساحات العمل) يحفظ تطابق الفهارس
+        self.paths.append(path)
+        self.name_ids.append(self._intern(self.names, self._name_ids, path))
+        self.version_ids.append(self._intern(self.versions, self._version_ids, ""))
+        self.nesting.append(0)
+        self.flags.append(0)
+        self.sizes.append(0)
+        self.depths.append(-1)
+
+    def _add_installed(self, path: str, name: str, version: str, flags: int,
+                       dependencies: List[str]) -> None:
+        self._add_edges(path, dependencies)
+        self.name_ids[-1] = self._intern(self.names, self._name_ids, name)
+        self.version_ids[-1] = self._intern(self.versions, self._version_ids, version)
+        self.nesting[-1] = path.count("node_modules/")
+        self.flags[-1] = flags
+        self.sizes[-1] = -1
+
+    def _resolve(self, from_path: str, name: str) -> Optional[int]:
+        """حل اسم تبعية من مجلد حزمة كما يفعل Node"""
+        base = from_path
+        while True:
+            candidate = f"{base}/node_modules/{name}" if base else f"node_modules/{name}"
+            if candidate in self._links:
+                candidate = self._links[candidate]
+            if candidate in self._index:
+                return self._index[candidate]
+            if not base:
+                return None
+            cut = base.rfind("/node_modules/")
+            base = base[:cut] if cut >= 0 else ""
+
+    def _compute_depths(self) -> None:
+        """أقصر سلسلة تبعيات من الجذر إلى كل حزمة (بحث بالعرض)"""
+        if "" not in self._index:
+            return
+
+        frontier = [self._index[""]]
+        self.depths[frontier[0]] = 0
+        while frontier:
+            next_frontier = []
+            for index in frontier:
+                depth = self.depths[index] + 1
+                for offset in range(self._edge_offsets[index], self._edge_offsets[index + 1]):
+                    target = self._resolve(self.paths[index], self.names[self._edge_names[offset]])
+                    if target is not None and self.depths[target] < 0:
+                        self.depths[target] = depth
+                        next_frontier.append(target)
+            frontier = next_frontier
+
+    def measure_installed(self, node_modules_root: Path) -> bool:
+        """أحجام الحزم المثبتة فعلاً (دون node_modules المتداخلة) إن وُجدت"""
+        if not (node_modules_root / "node_modules").is_dir():
+            return False
+
+        for index, path in enumerate(self.paths):
+            if not self.nesting[index]:
+                continue
+            total = 0
+            for root, dirs, files in os.walk(node_modules_root / path):
+                dirs[:] = [d for d in dirs if d != "node_modules"]
+                for name in files:
+                    try:
+                        total += os.lstat(os.path.join(root, name)).st_size
+                    except OSError:
+                        continue
+            # الحزم الاختيارية لمنصات أخرى لا تُثبت
+            self.sizes[index] = total if total else -1
+        return True
+
+    def _packages(self) -> List[int]:
+        return [i for i in range(len(self.paths)) if self.nesting[i]]
+
+    def summary(self, top_n: int = TOP_DUPLICATES) -> Dict[str, Any]:
+        """ملخص مضغوط لشجرة التبعيات لمرحلة GRADE"""
+        packages = self._packages()
+
+        versions_by_name: Dict[int, set] = {}
+        copies: Dict[int, int] = {}
+        for i in packages:
+            versions_by_name.setdefault(self.name_ids[i], set()).add(self.version_ids[i])
+            copies[self.name_ids[i]] = copies.get(self.name_ids[i], 0) + 1
+
+        duplicates = sorted(
+            (
+                {
+                    "name": self.names[name_id],
+                    "versions": sorted(self.versions[v] for v in version_ids),
+                    "copies": copies[name_id]
+                }
+                for name_id, version_ids in versions_by_name.items() if len(version_ids) > 1
+            ),
+            key=lambda d: (len(d["versions"]), d["copies"]), reverse=True
+        )
+
+        depths = [self.depths[i] for i in packages if self.depths[i] >= 0]
+        depth_histogram = {str(depth): depths.count(depth) for depth in sorted(set(depths))}
+
+        # الحجم المقاس للحزم المثبتة، وإلا متوسط تقريبي للحزم غير الاختيارية
+        measured = [self.sizes[i] for i in packages if self.sizes[i] > 0]
+        if measured:
+            install_bytes, size_basis = sum(measured), "node_modules"
+        else:
+            required = len([i for i in packages if not self.flags[i] & IS_OPTIONAL])
+            install_bytes, size_basis = required * AVERAGE_PACKAGE_BYTES, "estimate"
+
+        return {
+            "lockfile": self.lockfile_path.name,
+            "lockfile_version": self.lockfile_version,
+            "total_packages": len(packages),
+            "unique_packages": len(versions_by_name),
+            "direct_dependencies": len(self.root_dependencies),
+            "direct_dev_dependencies": len(self.root_dev_dependencies),
+            "dev_packages": len([i for i in packages if self.flags[i] & IS_DEV]),
+            "optional_packages": len([i for i in packages if self.flags[i] & IS_OPTIONAL]),
+            "unreachable_packages": len(packages) - len(depths),
+            "duplicated_packages": len(duplicates),
+            "duplicate_copies": sum(d["copies"] - 1 for d in duplicates),
+            "duplicates": duplicates[:top_n],
+            "max_depth": max(depths, default=0),
+            "average_depth": round(sum(depths) / len(depths), 2) if depths else 0.0,
+            "depth_histogram": depth_histogram,
+            "max_nesting": max((self.nesting[i] for i in packages), default=0),
+            "install_bytes": install_bytes,
+            "install_size_basis": size_basis
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        packages = self._packages()
+        return {
+            "version": 1,
+            "lockfile": self.lockfile_path.name,
+            "names": self.names,
+            "versions": self.versions,
+            "packages": {
+                "path": [self.paths[i] for i in packages],
+                "name": [self.name_ids[i] for i in packages],
+                "version": [self.version_ids[i] for i in packages],
+                "depth": [self.depths[i] for i in packages],
+                "nesting": [self.nesting[i] for i in packages],
+                "flags": [self.flags[i] for i in packages],
+                "size": [self.sizes[i] for i in packages]
+            }
+        }
+
+    def save(self, path: str) -> None:
+        """حفظ جدول الحزم بأعمدة JSON مضغوطة"""
+        with open(path, "wb") as raw, gzip.GzipFile(fileobj=raw, mode="wb", mtime=0) as f:
+            f.write(json.dumps(self.to_dict(), ensure_ascii=False, separators=(",", ":")).encode("utf-8"))
+
+def find_lockfile(project_dir: Path) -> Optional[Path]:
+    """ملف قفل npm في مجلد المشروع إن وُجد"""
+    for name in LOCKFILE_NAMES:
+        if (project_dir / name).is_file():
+            return project_dir / name
+    return None
+
+def analyze_lockfile(project_dir: Path) -> Optional[Tuple[LockfileAnalyzer, Dict[str, Any]]]:
+    """تحليل ملف قفل المشروع وقياس node_modules إن كانت مثبتة"""
+    lockfile = find_lockfile(project_dir)
+    if lockfile is None:
+        return None
+
+    analyzer = LockfileAnalyzer(str(lockfile)).analyze()
+    analyzer.measure_installed(project_dir)
+    return analyzer, analyzer.summary()
@@ -4,7 +4,7 @@
 import json
 import math
 from pathlib import Path
-from typing import Dict, List, Any, Tuple
+from typing import Dict, List, Any, Optional, Tuple
 from dataclasses import dataclass, asdict
 from enum import Enum
 import logging
@@ -56,14 +56,24 @@ class MarketOpportunity:
     strategic_fit_score: float  # 0-10
     overall_score: float  # 0-10
 
+    def to_dict(self) -> Dict[str, Any]:
+        """تحويل إلى قاموس قابل للتسلسل JSON"""
+        data = asdict(self)
+        data["category"] = self.category.value
+        return data
+
 class OpportunityGenerator:
     """مولد الفرص الاستراتيجية"""
 
-    def __init__(self, repo_path: str, output_dir: str):
+    def __init__(self, repo_path: str, output_dir: str,
+                 artifacts: Optional[Dict[str, Any]] = None):
         self.repo_path = Path(repo_path)
         self.output_dir = Path(output_dir)
         self.logger = logging.getLogger(__name__)
 
+        # نتائج المراحل السابقة في الذاكرة (مفتاحها المسار النسبي للملف)
+        self.artifacts = artifacts if artifacts is not None else {}
+
         # تحميل بيانات التحليل السابقة
         self.build_data = self._load_json("artifacts/build/codebase_analysis.json")
         self.assemble_data = self._load_json("artifacts/assemble/dependency_graph.json")
@@ -75,6 +85,9 @@ class OpportunityGenerator:
 
     def _load_json(self, file_path: str) -> Dict[str, Any]:
         """تحميل ملف JSON"""
+        if file_path in self.artifacts:
+            return self.artifacts[file_path]
+
         try:
             with open(self.output_dir / file_path, 'r', encoding='utf-8') as f:
                 return json.load(f)
@@ -620,6 +633,25 @@ class OpportunityGenerator:
 
         return diverse_shortlist[:top_n]
 
+    def save_opportunities(self, opportunities: List[MarketOpportunity],
+                           shortlist: List[MarketOpportunity]) -> Tuple[List[Dict], List[Dict]]:
+        """حفظ القائمتين الطويلة والقصيرة"""
+        output_path = self.output_dir / "artifacts/mix"
+        output_path.mkdir(parents=True, exist_ok=True)
+
+        longlist_data = [opp.to_dict() for opp in opportunities]
+        shortlist_data = [opp.to_dict() for opp in shortlist]
+
+        # حفظ القائمة الطويلة
+        with open(output_path / "opportunity_longlist.json", "w", encoding="utf-8") as f:
+            json.dump(longlist_data, f, indent=2, ensure_ascii=False)
+
+        # حفظ القائمة القصيرة
+        with open(output_path / "opportunity_shortlist.json", "w", encoding="utf-8") as f:
+            json.dump(shortlist_data, f, indent=2, ensure_ascii=False)
+
+        return longlist_data, shortlist_data
+
 def main():
     """الدالة الرئيسية"""
     import sys
@@ -638,16 +670,7 @@ def main():
     shortlist = generator.generate_shortlist(opportunities)
 
     # حفظ النتائج
-    output_path = Path(output_dir) / "artifacts/mix"
-    output_path.mkdir(parents=True, exist_ok=True)
-
-    # حفظ القائمة الطويلة
-    with open(output_path / "opportunity_longlist.json", "w", encoding="utf-8") as f:
-        json.dump([asdict(opp) for opp in opportunities], f, indent=2, ensure_ascii=False)
-
-    # حفظ القائمة القصيرة
-    with open(output_path / "opportunity_shortlist.json", "w", encoding="utf-8") as f:
-        json.dump([asdict(opp) for opp in shortlist], f, indent=2, ensure_ascii=False)
+    generator.save_opportunities(opportunities, shortlist)
 
     # طباعة ملخص
     print(f"✅ تم توليد {len(opportunities)} فرصة")
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+# script: module_graph.py
+
+from array import array
+from typing import Any, Dict, Iterable, List, Tuple
+
+class ModuleGraph:
+    """رسم تبعيات الوحدات بمعرفات صحيحة وجوار CSR
+
+    تُحوّل مسارات الوحدات (المسار الكامل، فلا تتصادم ملفات index المتعددة)
+    إلى معرفات، وتُخزن الحواف بعد finalize() كمصفوفتي إزاحات وأهداف للاتجاهين
+    الأمامي والعكسي. القواميس تُبنى فقط عند التحويل إلى JSON في to_dict().
+    الكائن نفسه تسلسل جوار (len و [i]) فيُمرر مباشرة إلى graph_cycles.
+    """
+
+    def __init__(self, module_type: str = "module"):
+        self.module_type = module_type
+
+        self.paths: List[str] = []
+        self._ids: Dict[str, int] = {}
+        # 1 للوحدات داخل المستودع، 0 للأهداف الخارجية (حزم ومكتبات)
+        self.internal = bytearray()
+        # حقول إضافية لوحدات بعينها في مخرج JSON (مثل الدوال والفئات)
+        self.attributes: Dict[int, Dict[str, Any]] = {}
+
+        self.kinds: List[str] = []
+        self._kind_ids: Dict[str, int] = {}
+
+        # الحواف قبل finalize()
+        self._edge_sources = array("i")
+        self._edge_targets = array("i")
+        self._edge_kinds = array("B")
+
+        # CSR: حواف العقدة i هي targets[offsets[i]:offsets[i + 1]]
+        self.offsets = array("i", [0])
+        self.targets = array("i")
+        self.edge_kinds = array("B")
+        self.reverse_offsets = array("i", [0])
+        self.sources = array("i")
+
+    def add_module(self, path: str, internal: bool = True, **attributes: Any) -> int:
+        """معرف الوحدة (يُنشأ عند أول ظهور؛ الظهور الداخلي يغلب الخارجي)"""
+        node = self._ids.get(path)
+        if node is None:
+            node = self._ids[path] = len(self.paths)
+            self.paths.append(path)
+            self.internal.append(0)
+        if internal:
+            self.internal[node] = 1
+        if attributes:
+            self.attributes.setdefault(node, {}).update(attributes)
+        return node
+
+    def node_id(self, path: str) -> int:
+        return self._ids[path]
+
+    def __contains__(self, path: str) -> bool:
+        return path in self._ids
+
+    def add_edge(self, source: int, target: int, kind: str = "import") -> None:
+        kind_id = self._kind_ids.get(kind)
+        if kind_id is None:
+            kind_id = self._kind_ids[kind] = len(self.kinds)
+            self.kinds.append(kind)
+        self._edge_sources.append(source)
+        self._edge_targets.append(target)
+        self._edge_kinds.append(kind_id)
+
+    @staticmethod
+    def _csr(count: int, keys: array, values: array, extra: array) -> Tuple[array, array, array]:
+        """ترتيب الحواف حسب keys بالعد (counting sort) في زمن خطي"""
+        offsets = array("i", [0]) * (count + 1)
+        for key in keys:
+            offsets[key + 1] += 1
+        for i in range(count):
+            offsets[i + 1] += offsets[i]
+
+        cursor = array("i", offsets[:-1])
+        ordered = array("i", [0]) * len(keys)
+        ordered_extra = array(extra.typecode, [0]) * len(keys)
+        for key, value, item in zip(keys, values, extra):
+            ordered[cursor[key]] = value
+            ordered_extra[cursor[key]] = item
+            cursor[key] += 1
+        return offsets, ordered, ordered_extra
+
+    def finalize(self) -> "ModuleGraph":
+        """بناء مصفوفات CSR للاتجاهين مع حذف الحواف المكررة (يبقى أول نوع)"""
+        count = len(self.paths)
+        offsets, targets, kinds = self._csr(count, self._edge_sources, self._edge_targets, self._edge_kinds)
+
+        self.offsets = array("i", [0])
+        self.targets = array("i")
+        self.edge_kinds = array("B")
+        for node in range(count):
+            seen = set()
+            for i in range(offsets[node], offsets[node + 1]):
+                if targets[i] not in seen:
+                    seen.add(targets[i])
+                    self.targets.append(targets[i])
+                    self.edge_kinds.append(kinds[i])
+            self.offsets.append(len(self.targets))
+
+        sources = array("i")
+        for node in range(count):
+            sources.extend([node] * (self.offsets[node + 1] - self.offsets[node]))
+        self.reverse_offsets, self.sources, _ = self._csr(count, self.targets, sources, self.edge_kinds)
+
+        self._edge_sources = array("i")
+        self._edge_targets = array("i")
+        self._edge_kinds = array("B")
+        return self
+
+    def __len__(self) -> int:
+        return len(self.paths)
+
+    def __getitem__(self, node: int) -> array:
+        return self.successors(node)
+
+    def successors(self, node: int) -> array:
+        return self.targets[self.offsets[node]:self.offsets[node + 1]]
+
+    def predecessors(self, node: int) -> array:
+        return self.sources[self.reverse_offsets[node]:self.reverse_offsets[node + 1]]
+
+    def out_degree(self, node: int) -> int:
+        return self.offsets[node + 1] - self.offsets[node]
+
+    def in_degree(self, node: int) -> int:
+        return self.reverse_offsets[node + 1] - self.reverse_offsets[node]
+
+    @property
+    def edge_count(self) -> int:
+        return len(self.targets)
+
+    def internal_nodes(self) -> Iterable[int]:
+        return (node for node in range(len(self.paths)) if self.internal[node])
+
+    def edges(self) -> Iterable[Tuple[int, int, str]]:
+        """الحواف (المصدر، الهدف، النوع) بترتيب المصدر"""
+        for node in range(len(self.paths)):
+            for i in range(self.offsets[node], self.offsets[node + 1]):
+                yield node, self.targets[i], self.kinds[self.edge_kinds[i]]
+
+    def to_dict(self) -> Dict[str, Any]:
+        """الوحدات الداخلية والحواف بصيغة dependency_graph.json"""
+        paths = self.paths
+        modules = {
+            paths[node]: {
+                "path": paths[node],
+                "type": self.module_type,
+                "dependencies": [paths[t] for t in self.successors(node)],
+                "dependents": [paths[s] for s in self.predecessors(node)],
+                **self.attributes.get(node, {})
+            }
+            for node in self.internal_nodes()
+        }
+        dependencies = [
+            {"from": paths[source], "to": paths[target], "type": kind}
+            for source, target, kind in self.edges()
+        ]
+        return {"modules": modules, "dependencies": dependencies}
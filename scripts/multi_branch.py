@@ -0,0 +1,363 @@
+#!/usr/bin/env python3
+# script: multi_branch.py
+
+import os
+import sys
+import json
+import argparse
+import logging
+import subprocess
+from pathlib import Path
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Dict, List, Optional
+
+from line_counter import count_files, language_for
+from run_batch_analysis import _job_slug, _run_job
+from run_full_analysis import (
+    DEFAULT_CACHE_DIR, DEFAULT_HISTORY_FILE, DEFAULT_INSTALL_CACHE_DIR, EXECUTION_MODES
+)
+
+class MultiBranchAnalyzer:
+    """تحليل عدة فروع من استنساخ واحد باستخدام git worktree
+
+    يُستنسخ المستودع مرة واحدة (دون شجرة عمل) ويُنشأ لكل فرع worktree
+    يتشارك مخزن الكائنات نفسه، ثم تُحلل الفروع بالتوازي. تُحسب أسطر كل
+    كائن (blob) مرة واحدة لجميع الفروع، فالملفات المتطابقة بين الفروع لا
+    تُقرأ من جديد. الناتج بطاقة نتائج لكل فرع وتقرير فروقات مقابل الفرع الأول.
+    """
+
+    def __init__(self, repo_url: str, branches: List[str], output_root: str,
+                 concurrency: int = 2, execution_mode: str = "inprocess",
+                 max_workers: Optional[int] = None, cache_dir: Optional[str] = None,
+                 history_file: Optional[str] = None, install_cache_dir: Optional[str] = None):
+        self.repo_url = repo_url
+        self.branches = branches
+        self.output_root = Path(output_root)
+        self.concurrency = max(1, min(concurrency, len(branches)))
+        self.execution_mode = execution_mode
+        self.max_workers = max_workers or max(1, (os.cpu_count() or 1) // self.concurrency)
+        self.cache_dir = cache_dir
+        self.history_file = history_file
+        self.install_cache_dir = install_cache_dir
+
+        # الاستنساخ المشترك (مخزن الكائنات) وعدادات الأسطر لكل كائن
+        self.shared_repo = self.output_root / "shared"
+        self.blob_counts_path = self.output_root / "blob_line_counts.json"
+        self.report_path = self.output_root / "branch_comparison.json"
+        self.run_id = f"BRANCHES-{datetime.now().strftime('%Y%m%d%H%M%S')}"
+
+        logging.basicConfig(
+            level=logging.INFO,
+            format='%(asctime)s - %(levelname)s - %(message)s'
+        )
+        self.logger = logging.getLogger(__name__)
+
+    def _git(self, *args: str) -> bytes:
+        return subprocess.run(
+            ["git", "-C", str(self.shared_repo), *args],
+            capture_output=True,
+            check=True
+        ).stdout
+
+    def prepare_shared_clone(self) -> None:
+        """استنساخ واحد دون شجرة عمل، أو تحديثه إن وجد"""
+        if self.shared_repo.exists():
+            self.logger.info("📦 تحديث الاستنساخ المشترك...")
+            self._git("fetch", "--prune", "origin")
+            self._git("worktree", "prune")
+        else:
+            self.logger.info(f"🔄 استنساخ المستودع مرة واحدة لكل الفروع: {self.repo_url}")
+            self.output_root.mkdir(parents=True, exist_ok=True)
+            subprocess.run(
+                ["git", "clone", "--no-checkout", self.repo_url, str(self.shared_repo)],
+                capture_output=True,
+                check=True
+            )
+
+        # فصل HEAD حتى يمكن إنشاء worktree للفرع الافتراضي أيضاً
+        head = self._git("rev-parse", "HEAD").decode().strip()
+        self._git("update-ref", "--no-deref", "HEAD", head)
+
+    def _branch_dir(self, branch: str) -> Path:
+        return self.output_root / _job_slug(self.repo_url, branch)
+
+    def add_worktree(self, branch: str) -> Path:
+        """worktree للفرع في <output_root>/<slug>/repository
+
+        worktree موجود من تشغيل سابق يُعاد إلى origin/<branch> بعد الجلب، حتى
+        تطابق ملفاته الكائنات التي يُحصيها compute_blob_counts.
+        """
+        worktree = self._branch_dir(branch) / "repository"
+        if worktree.exists():
+            subprocess.run(
+                ["git", "-C", str(worktree), "reset", "--hard", "--quiet", f"origin/{branch}"],
+                capture_output=True,
+                check=True
+            )
+        else:
+            worktree.parent.mkdir(parents=True, exist_ok=True)
+            # فرع محلي يتتبع origin/<branch>؛ التحديث في إعادة التشغيل بـ reset أعلاه لا بـ pull
+            self._git("worktree", "add", "-B", branch, str(worktree), f"origin/{branch}")
+        return worktree
+
+    def compute_blob_counts(self, worktrees: Dict[str, Path]) -> None:
+        """إحصاء أسطر كل كائن مرة واحدة عبر جميع الفروع"""
+        blobs: Dict[str, Path] = {}
+        source_files = 0
+        for branch, worktree in worktrees.items():
+            listing = self._git("ls-tree", "-r", "-z", f"origin/{branch}")
+            for record in listing.split(b"\0"):
+                if not record:
+                    continue
+                meta, _, path = record.partition(b"\t")
+                _, object_type, sha = meta.split(b" ")
+                relative = path.decode("utf-8", errors="surrogateescape")
+                if object_type == b"blob" and language_for(relative):
+                    source_files += 1
+                    blobs.setdefault(sha.decode("ascii"), worktree / relative)
+
+        counted, _ = count_files(blobs.values(), self.max_workers * self.concurrency)
+        blob_counts = {sha: counted[str(path)] for sha, path in blobs.items() if str(path) in counted}
+
+        with open(self.blob_counts_path, "w", encoding="utf-8") as f:
+            json.dump(blob_counts, f)
+
+        self.logger.info(
+            f"🔢 أسطر {len(blob_counts)} كائن فريد بدلاً من {source_files} ملف في {len(worktrees)} فروع"
+        )
+
+    def _build_jobs(self) -> List[Dict[str, Any]]:
+        return [
+            {
+                "repo_url": self.repo_url,
+                "branch": branch,
+                "output_dir": str(self._branch_dir(branch)),
+                "analysis_id": f"{self.run_id.replace('BRANCHES', 'RAMP')}-{i:02d}",
+                "execution_mode": self.execution_mode,
+                "max_workers": self.max_workers,
+                "cache_dir": self.cache_dir,
+                "clone_cache_dir": None,
+                "history_file": self.history_file,
+                "install_cache_dir": self.install_cache_dir,
+                "blob_counts_file": str(self.blob_counts_path),
+                # الاستنساخ المشترك جُلب وأُعيدت worktrees إليه في run()
+                "use_existing_checkout": True
+            }
+            for i, branch in enumerate(self.branches, 1)
+        ]
+
+    def run(self) -> bool:
+        """تحليل جميع الفروع وكتابة تقرير المقارنة"""
+        self.prepare_shared_clone()
+        worktrees = {branch: self.add_worktree(branch) for branch in self.branches}
+        self.compute_blob_counts(worktrees)
+
+        jobs = self._build_jobs()
+        self.logger.info(f"🚀 تحليل {len(jobs)} فروع، {self.concurrency} متزامنة")
+
+        results: Dict[str, Dict[str, Any]] = {}
+        with ProcessPoolExecutor(max_workers=self.concurrency) as executor:
+            futures = {executor.submit(_run_job, job): job for job in jobs}
+
+            for future in as_completed(futures):
+                job = futures[future]
+                try:
+                    result = future.result()
+                except Exception as e:
+                    result = {"branch": job["branch"], "output_dir": job["output_dir"],
+                              "status": "error", "error": str(e)}
+
+                results[job["branch"]] = result
+                icon = "✅" if result["status"] == "success" else "❌"
+                self.logger.info(f"{icon} {job['branch']} - {len(results)}/{len(jobs)}")
+
+        report = self.compare(results)
+        tmp_path = self.report_path.with_suffix(".json.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_path, self.report_path)
+
+        self.logger.info(f"📊 تقرير المقارنة: {self.report_path}")
+        return all(result["status"] == "success" for result in results.values())
+
+    @staticmethod
+    def _load(output_dir: Path, artifact: str) -> Dict[str, Any]:
+        try:
+            with open(output_dir / artifact, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return {}
+
+    def _changed_files(self, base: str, branch: str) -> Dict[str, int]:
+        """عدد الملفات المضافة والمعدلة والمحذوفة بين فرعين"""
+        output = self._git("diff", "--name-status", "-z", f"origin/{base}", f"origin/{branch}")
+        tokens = iter(output.split(b"\0"))
+        names = {"A": "added", "M": "modified", "D": "deleted", "R": "renamed", "C": "copied"}
+        changes: Dict[str, int] = {}
+
+        # كل سجل: الحالة ثم المسار (ومسار ثانٍ لإعادة التسمية والنسخ)
+        for status in tokens:
+            if not status:
+                continue
+            kind = status[:1].decode("ascii", errors="replace")
+            next(tokens, None)
+            if kind in ("R", "C"):
+                next(tokens, None)
+            name = names.get(kind, "other")
+            changes[name] = changes.get(name, 0) + 1
+        return changes
+
+    def compare(self, results: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+        """بطاقات نتائج الفروع والفروقات مقابل الفرع الأول"""
+        base = self.branches[0]
+        branches: Dict[str, Dict[str, Any]] = {}
+
+        for branch in self.branches:
+            output_dir = self._branch_dir(branch)
+            scorecard = self._load(output_dir, "artifacts/grade/scorecard.json")
+            codebase = self._load(output_dir, "artifacts/build/codebase_analysis.json")
+            branches[branch] = {
+                "status": results.get(branch, {}).get("status", "missing"),
+                "output_dir": str(output_dir),
+                "overall_score": scorecard.get("summary", {}).get("overall_score"),
+                "metrics": {card["metric"]: card["score"] for card in scorecard.get("detailed_scores", [])},
+                "risks": sorted(risk["id"] for risk in scorecard.get("risk_register", [])),
+                "lines_of_code": codebase.get("line_counts", {}).get("SUM", {}).get("code")
+            }
+
+        diffs: Dict[str, Dict[str, Any]] = {}
+        reference = branches[base]
+        for branch in self.branches[1:]:
+            current = branches[branch]
+
+            def delta(a: Optional[float], b: Optional[float]) -> Optional[float]:
+                return round(b - a, 2) if a is not None and b is not None else None
+
+            diffs[branch] = {
+                "overall_score": delta(reference["overall_score"], current["overall_score"]),
+                "metrics": {
+                    metric: delta(reference["metrics"].get(metric), score)
+                    for metric, score in current["metrics"].items()
+                },
+                "lines_of_code": delta(reference["lines_of_code"], current["lines_of_code"]),
+                "new_risks": sorted(set(current["risks"]) - set(reference["risks"])),
+                "resolved_risks": sorted(set(reference["risks"]) - set(current["risks"])),
+                "changed_files": self._changed_files(base, branch)
+            }
+
+        return {
+            "run_id": self.run_id,
+            "repo_url": self.repo_url,
+            "base_branch": base,
+            "generated_at": datetime.now().isoformat(),
+            "branches": branches,
+            "diff_vs_base": diffs
+        }
+
+def main():
+    """الدالة الرئيسية"""
+
+    parser = argparse.ArgumentParser(
+        description="تحليل عدة فروع لمستودع واحد ومقارنتها (git worktree على استنساخ واحد)"
+    )
+
+    parser.add_argument("--repo-url", required=True, help="رابط المستودع")
+
+    parser.add_argument(
+        "--branches",
+        required=True,
+        help="الفروع مفصولة بفواصل؛ الأول هو أساس المقارنة (مثال: main,release/1.2)"
+    )
+
+    parser.add_argument(
+        "--output-root",
+        default=f"./branches_{datetime.now().strftime('%Y%m%d%H%M%S')}",
+        help="المجلد الجذر للاستنساخ المشترك ونتائج الفروع"
+    )
+
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=2,
+        help="عدد الفروع المحللة بالتوازي (افتراضي: 2)"
+    )
+
+    parser.add_argument(
+        "--execution-mode",
+        choices=EXECUTION_MODES,
+        default="inprocess",
+        help="وضع تنفيذ المراحل داخل كل فرع"
+    )
+
+    parser.add_argument(
+        "--max-workers",
+        type=int,
+        help="الحد الأقصى للمراحل المتوازية لكل فرع (افتراضي: الأنوية مقسومة على --concurrency)"
+    )
+
+    parser.add_argument(
+        "--cache-dir",
+        default=str(DEFAULT_CACHE_DIR),
+        help=f"مجلد الذاكرة المؤقتة لنتائج المراحل (افتراضي: {DEFAULT_CACHE_DIR})"
+    )
+
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="تعطيل الذاكرة المؤقتة لنتائج المراحل"
+    )
+
+    parser.add_argument(
+        "--history-file",
+        default=str(DEFAULT_HISTORY_FILE),
+        help=f"سجل مدد المراحل المشترك لضبط المهل (افتراضي: {DEFAULT_HISTORY_FILE})"
+    )
+
+    parser.add_argument(
+        "--no-history",
+        action="store_true",
+        help="استخدام المهل الثابتة دون تاريخ التشغيلات"
+    )
+
+    parser.add_argument(
+        "--install-cache-dir",
+        default=str(DEFAULT_INSTALL_CACHE_DIR),
+        help=f"ذاكرة تثبيت التبعيات المشتركة بين الفروع (افتراضي: {DEFAULT_INSTALL_CACHE_DIR})"
+    )
+
+    parser.add_argument(
+        "--no-install-cache",
+        action="store_true",
+        help="تثبيت التبعيات من جديد لكل فرع"
+    )
+
+    args = parser.parse_args()
+
+    branches = [branch.strip() for branch in args.branches.split(",") if branch.strip()]
+    if len(branches) < 2:
+        parser.error("--branches يتطلب فرعين على الأقل")
+
+    analyzer = MultiBranchAnalyzer(
+        repo_url=args.repo_url,
+        branches=branches,
+        output_root=args.output_root,
+        concurrency=args.concurrency,
+        execution_mode=args.execution_mode,
+        max_workers=args.max_workers,
+        cache_dir=None if args.no_cache else args.cache_dir,
+        history_file=None if args.no_history else args.history_file,
+        install_cache_dir=None if args.no_install_cache else args.install_cache_dir
+    )
+
+    try:
+        success = analyzer.run()
+    except subprocess.CalledProcessError as e:
+        print(f"❌ فشل أمر git: {e.stderr.decode('utf-8', errors='replace') if e.stderr else e}")
+        sys.exit(1)
+
+    print(f"\n📋 تقرير المقارنة: {analyzer.report_path}")
+    sys.exit(0 if success else 1)
+
+if __name__ == "__main__":
+    main()
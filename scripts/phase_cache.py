@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+# script: phase_cache.py
+
+import os
+import ast
+import hashlib
+import json
+import logging
+import shutil
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set
+
+# يُرفع عند تغيير بنية مدخلات المفتاح أو تخزين النتائج
+CACHE_SCHEMA_VERSION = 2
+
+# الحد الافتراضي لحجم نتائج المراحل المخزنة قبل الإزالة (LRU)
+DEFAULT_MAX_BYTES = 5 * 1024 ** 3
+
+def _tree_size(path: Path) -> int:
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.lstat(os.path.join(root, name)).st_size
+            except OSError:
+                continue
+    return total
+
+def evict_files(directory: Path, max_bytes: int, pattern: str = "*.json") -> int:
+    """حذف الملفات الأقدم استخداماً (زمن التعديل) في مجلد حتى يعود حجمه تحت الحد
+
+    للذاكرات المؤقتة بملف لكل إدخال (python_ast، layouts) التي تلمس الملف عند
+    قراءته. يعيد عدد الملفات المحذوفة.
+    """
+    entries = []
+    for path in directory.rglob(pattern):
+        try:
+            stat = path.stat()
+        except OSError:
+            continue
+        entries.append((stat.st_mtime, stat.st_size, path))
+
+    total = sum(size for _, size, _ in entries)
+    removed = 0
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        try:
+            path.unlink()
+        except OSError:
+            continue
+        total -= size
+        removed += 1
+    return removed
+
+def local_imports(path: Path) -> Set[str]:
+    """أسماء الوحدات المستوردة في ملف Python (بما فيها الاستيراد داخل الدوال)"""
+    try:
+        tree = ast.parse(path.read_bytes())
+    except (OSError, SyntaxError, ValueError):
+        return set()
+
+    names = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            names.update(alias.name.split(".")[0] for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            names.add(node.module.split(".")[0])
+    return names
+
+class PhaseCache:
+    """ذاكرة مؤقتة لنتائج المراحل معنونة بمحتوى مدخلاتها
+
+    مفتاح كل مرحلة هو تجزئة لـ SHA الالتزام، وتجزئات المخرجات السابقة التي
+    تستهلكها، وإصدار السكربت، والتكوين؛ فأي تغيير في أي منها يُنتج مفتاحاً جديداً.
+    """
+
+    def __init__(self, cache_dir: str, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.logger = logging.getLogger(__name__)
+        self._script_versions: Dict[str, str] = {}
+
+    @staticmethod
+    def hash_path(path: Path) -> str:
+        """تجزئة محتوى ملف أو مجلد (مع المسارات النسبية لملفاته)"""
+        digest = hashlib.sha256()
+
+        if path.is_dir():
+            for file_path in sorted(p for p in path.rglob("*") if p.is_file()):
+                digest.update(str(file_path.relative_to(path)).encode("utf-8"))
+                digest.update(b"\0")
+                digest.update(PhaseCache.hash_path(file_path).encode("ascii"))
+        else:
+            with open(path, "rb") as f:
+                for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                    digest.update(chunk)
+
+        return digest.hexdigest()
+
+    def script_version(self, scripts_dir: Path, script: str) -> str:
+        """تجزئة السكربت وكل الوحدات المحلية التي يستوردها مباشرة أو بشكل غير مباشر
+
+        إصلاح خطأ في وحدة مساعدة (مثل line_counter.py) يبطل نتائج المراحل التي تستخدمها.
+        """
+        if script not in self._script_versions:
+            closure = []
+            pending = [Path(script).stem]
+            while pending:
+                name = pending.pop()
+                path = scripts_dir / f"{name}.py"
+                if name in closure or not path.is_file():
+                    continue
+                closure.append(name)
+                pending.extend(local_imports(path))
+
+            digest = hashlib.sha256()
+            for name in sorted(closure):
+                digest.update(f"{name}\0{self.hash_path(scripts_dir / f'{name}.py')}\0".encode("utf-8"))
+            self._script_versions[script] = digest.hexdigest()
+
+        return self._script_versions[script]
+
+    def compute_key(self, phase: str, commit_sha: str, inputs: Dict[str, str],
+                    script_version: str, config: Dict[str, Any]) -> str:
+        """حساب مفتاح المرحلة من مدخلاتها"""
+        payload = {
+            "schema": CACHE_SCHEMA_VERSION,
+            "phase": phase,
+            "commit": commit_sha,
+            "inputs": inputs,
+            "script": script_version,
+            "config": config
+        }
+        encoded = json.dumps(payload, sort_keys=True, ensure_ascii=False).encode("utf-8")
+        return hashlib.sha256(encoded).hexdigest()
+
+    def restore(self, key: str, output_dir: Path, produces: List[str]) -> bool:
+        """استعادة مخرجات مرحلة مخزنة إلى مجلد النتائج"""
+        entry_dir = self.cache_dir / key
+        manifest_path = entry_dir / "manifest.json"
+        if not manifest_path.exists():
+            return False
+
+        try:
+            with open(manifest_path, "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+
+            for artifact in manifest["artifacts"]:
+                if artifact not in produces:
+                    continue
+
+                src = entry_dir / "data" / artifact
+                dst = output_dir / artifact
+                dst.parent.mkdir(parents=True, exist_ok=True)
+
+                if src.is_dir():
+                    shutil.copytree(src, dst, symlinks=True, dirs_exist_ok=True)
+                else:
+                    shutil.copy2(src, dst, follow_symlinks=False)
+
+            # زمن التعديل يمثل آخر استخدام لسياسة LRU
+            os.utime(entry_dir)
+            return True
+
+        except (OSError, json.JSONDecodeError, KeyError) as e:
+            self.logger.warning(f"⚠️ تعذر استعادة النتيجة المخزنة {key[:12]}: {e}")
+            return False
+
+    def store(self, key: str, output_dir: Path, produces: List[str]) -> None:
+        """تخزين مخرجات مرحلة مكتملة"""
+        entry_dir = self.cache_dir / key
+        if entry_dir.exists():
+            return
+
+        # الكتابة في مجلد مؤقت ثم إعادة تسميته لتجنب إدخالات ناقصة
+        tmp_dir = self.cache_dir / f".tmp-{key}-{uuid.uuid4().hex}"
+        stored = []
+
+        try:
+            for artifact in produces:
+                src = output_dir / artifact
+                if not src.exists():
+                    continue
+
+                dst = tmp_dir / "data" / artifact
+                dst.parent.mkdir(parents=True, exist_ok=True)
+
+                if src.is_dir():
+                    shutil.copytree(src, dst, symlinks=True)
+                else:
+                    shutil.copy2(src, dst, follow_symlinks=False)
+                stored.append(artifact)
+
+            tmp_dir.mkdir(parents=True, exist_ok=True)
+            size = _tree_size(tmp_dir / "data")
+            with open(tmp_dir / "manifest.json", "w", encoding="utf-8") as f:
+                json.dump({"key": key, "artifacts": stored, "size": size, "stored_at": time.time()}, f, indent=2)
+
+            tmp_dir.rename(entry_dir)
+
+        except OSError as e:
+            self.logger.warning(f"⚠️ تعذر تخزين نتيجة المرحلة {key[:12]}: {e}")
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            return
+
+        self.evict()
+
+    def evict(self) -> None:
+        """إزالة الإدخالات الأقدم استخداماً حتى يعود الحجم تحت الحد
+
+        تُحسب الإدخالات ذات manifest.json فقط؛ المجلدات الأخرى المشتركة في
+        المجلد نفسه (python_ast، layouts، installs) لا تُمس.
+        """
+        entries = []
+        for entry_dir in self.cache_dir.iterdir():
+            manifest_path = entry_dir / "manifest.json"
+            try:
+                with open(manifest_path, "r", encoding="utf-8") as f:
+                    manifest = json.load(f)
+                # إدخالات الإصدارات السابقة لا تسجل حجمها
+                size: Optional[int] = manifest.get("size")
+                if size is None:
+                    size = _tree_size(entry_dir / "data")
+                entries.append((entry_dir.stat().st_mtime, size, entry_dir))
+            except (OSError, ValueError, AttributeError):
+                continue
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, entry_dir in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            self.logger.info(f"🗑️ إزالة نتيجة مرحلة مخزنة: {entry_dir.name[:12]}")
+            shutil.rmtree(entry_dir, ignore_errors=True)
+            total -= size
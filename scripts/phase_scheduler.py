@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+# script: phase_scheduler.py
+
+import os
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, List, Optional, Set
+
+@dataclass
+class Phase:
+    """مرحلة قابلة للجدولة مع المخرجات التي تستهلكها وتنتجها"""
+    name: str
+    run: Callable[[], bool]
+    consumes: List[str] = field(default_factory=list)
+    produces: List[str] = field(default_factory=list)
+
+    # السكربت المنفذ للمرحلة (يدخل في مفتاح الذاكرة المؤقتة) وقابلية تخزين نتيجتها
+    script: Optional[str] = None
+    cacheable: bool = True
+
+    # مخرجات تحدد ترتيب المراحل فقط (مثل المستودع المستنسخ) ولا تُخزن نتيجةً
+    markers: List[str] = field(default_factory=list)
+
+    # تحتاج التاريخ الكامل للمستودع (يُعمّق الاستنساخ السطحي قبل تشغيلها)
+    needs_history: bool = False
+
+    # أمر المرحلة في أوضاع العمليات الفرعية: وسائط السكربت ومهلته بالثواني
+    label: str = ""
+    args: List[str] = field(default_factory=list)
+    timeout: Optional[float] = None
+
+    @property
+    def cached_artifacts(self) -> List[str]:
+        """المخرجات التي تُخزن في الذاكرة المؤقتة وتُستعاد منها"""
+        return [artifact for artifact in self.produces if artifact not in self.markers]
+
+class PhaseScheduler:
+    """مجدول مراحل يبني رسماً موجهاً لا دورياً من تصريحات المخرجات
+
+    تُشغَّل كل مرحلة جاهزة (اكتملت جميع المراحل المنتجة لمدخلاتها) بالتوازي
+    حتى الحد الأقصى للعمال، فيقترب زمن التشغيل الكلي من المسار الحرج.
+    """
+
+    def __init__(self, phases: List[Phase], max_workers: Optional[int] = None,
+                 completed: Optional[Set[str]] = None):
+        self.phases = {phase.name: phase for phase in phases}
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.logger = logging.getLogger(__name__)
+
+        # مراحل مكتملة من تشغيل سابق (الاستئناف) لا يُعاد تشغيلها
+        self.completed = set(completed or ()) & set(self.phases)
+
+        # حالة كل مرحلة بعد التشغيل: completed / failed / skipped
+        self.results: Dict[str, str] = {name: "completed" for name in self.completed}
+
+        self.dependencies = self._build_graph(phases)
+
+    def _build_graph(self, phases: List[Phase]) -> Dict[str, Set[str]]:
+        """بناء التبعيات بين المراحل من المخرجات المستهلكة والمنتجة"""
+        producers = {}
+        for phase in phases:
+            for artifact in phase.produces:
+                if artifact in producers:
+                    raise ValueError(
+                        f"المخرج {artifact} تنتجه مرحلتان: {producers[artifact]} و {phase.name}"
+                    )
+                producers[artifact] = phase.name
+
+        # المخرجات التي لا تنتجها أي مرحلة تُعد مدخلات خارجية متوفرة مسبقاً
+        dependencies = {
+            phase.name: {
+                producers[artifact] for artifact in phase.consumes
+                if artifact in producers and producers[artifact] != phase.name
+            }
+            for phase in phases
+        }
+
+        self._check_acyclic(dependencies)
+        return dependencies
+
+    def _check_acyclic(self, dependencies: Dict[str, Set[str]]) -> None:
+        """التأكد من خلو الرسم من الدورات (خوارزمية Kahn)"""
+        remaining = {name: set(deps) for name, deps in dependencies.items()}
+
+        while remaining:
+            ready = [name for name, deps in remaining.items() if not deps]
+            if not ready:
+                raise ValueError(f"تبعية دورية بين المراحل: {', '.join(sorted(remaining))}")
+
+            for name in ready:
+                del remaining[name]
+            for deps in remaining.values():
+                deps.difference_update(ready)
+
+    def run(self) -> bool:
+        """تشغيل المراحل الجاهزة بالتوازي حتى اكتمالها أو فشل إحداها"""
+        pending = {
+            name: deps for name, deps in self.dependencies.items()
+            if name not in self.completed
+        }
+        completed: Set[str] = set(self.completed)
+        failed = False
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            running = {}
+
+            while pending or running:
+                # عدم إطلاق مراحل جديدة بعد أول فشل
+                if not failed:
+                    ready = [name for name, deps in pending.items() if deps <= completed]
+                    for name in ready:
+                        del pending[name]
+                        running[executor.submit(self.phases[name].run)] = name
+
+                if not running:
+                    break
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    try:
+                        success = future.result()
+                    except Exception as e:
+                        self.logger.error(f"❌ خطأ غير متوقع في المرحلة {name}: {e}")
+                        success = False
+
+                    if success:
+                        completed.add(name)
+                        self.results[name] = "completed"
+                    else:
+                        failed = True
+                        self.results[name] = "failed"
+
+        for name in pending:
+            self.results[name] = "skipped"
+
+        return not failed
+
+class AsyncPhaseScheduler(PhaseScheduler):
+    """نسخة asyncio من المجدول تُلغي المراحل الجارية عند أول فشل
+
+    دالة run لكل مرحلة هنا دالة غير متزامنة. يؤدي الإلغاء إلى إنهاء عمليات
+    المراحل الشقيقة فوراً بدلاً من انتظار اكتمالها، وتُطبق مهلة إجمالية
+    (deadline) على التشغيل كاملاً إضافةً إلى مهل المراحل.
+    """
+
+    def __init__(self, phases: List[Phase], max_workers: Optional[int] = None,
+                 completed: Optional[Set[str]] = None, deadline: Optional[float] = None):
+        super().__init__(phases, max_workers, completed)
+        self.deadline = deadline
+
+    async def run(self) -> bool:
+        """تشغيل المراحل حتى اكتمالها أو أول فشل أو انتهاء المهلة الإجمالية"""
+        pending = {
+            name: deps for name, deps in self.dependencies.items()
+            if name not in self.completed
+        }
+
+        try:
+            success = await asyncio.wait_for(self._run(pending), self.deadline)
+        except asyncio.TimeoutError:
+            self.logger.error(f"⏱️ انتهت المهلة الإجمالية للتحليل ({self.deadline}s)")
+            success = False
+
+        for name in pending:
+            self.results[name] = "skipped"
+
+        return success
+
+    async def _run(self, pending: Dict[str, Set[str]]) -> bool:
+        completed: Set[str] = set(self.completed)
+        running: Dict[asyncio.Task, str] = {}
+
+        try:
+            while pending or running:
+                ready = [name for name, deps in pending.items() if deps <= completed]
+                for name in ready[:self.max_workers - len(running)]:
+                    del pending[name]
+                    run: Callable[[], Awaitable[bool]] = self.phases[name].run
+                    running[asyncio.ensure_future(run())] = name
+
+                if not running:
+                    break
+
+                done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    name = running.pop(task)
+                    try:
+                        success = task.result()
+                    except Exception as e:
+                        self.logger.error(f"❌ خطأ غير متوقع في المرحلة {name}: {e}")
+                        success = False
+
+                    if success:
+                        completed.add(name)
+                        self.results[name] = "completed"
+                    else:
+                        self.results[name] = "failed"
+                        self.logger.error(f"🛑 فشل {name}، إلغاء المراحل الجارية")
+                        return False
+
+            return True
+
+        finally:
+            # الفشل أو المهلة الإجمالية: إلغاء المراحل الجارية وانتظار إنهاء عملياتها
+            for task in running:
+                task.cancel()
+            if running:
+                await asyncio.gather(*running, return_exceptions=True)
+            for name in running.values():
+                self.results[name] = "cancelled"
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+# script: phase_telemetry.py
+
+import sys
+import time
+import resource
+import threading
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+# استخدام موارد الخيط الحالي فقط حيث يتوفر (Linux) لأن المراحل تعمل بالتوازي
+_RUSAGE_SCOPE = getattr(resource, "RUSAGE_THREAD", resource.RUSAGE_SELF)
+
+# ru_maxrss بالكيلوبايت على Linux وبالبايت على macOS
+_MAXRSS_TO_MB = 1 / (1024 * 1024) if sys.platform == "darwin" else 1 / 1024
+
+# كتل ru_inblock/ru_oublock بحجم 512 بايت
+_BLOCK_SIZE = 512
+
+_local = threading.local()
+_hook_lock = threading.Lock()
+_hook_installed = False
+
+def _audit_hook(event: str, args: tuple) -> None:
+    """عدّ الملفات والمجلدات والعمليات الفرعية للمرحلة الجارية في هذا الخيط"""
+    counters = getattr(_local, "counters", None)
+    if counters is None:
+        return
+
+    if event == "open":
+        counters["files_scanned"] += 1
+    elif event in ("os.scandir", "os.listdir"):
+        counters["directories_scanned"] += 1
+    elif event == "subprocess.Popen":
+        counters["subprocess_count"] += 1
+
+def _install_audit_hook() -> None:
+    """تثبيت خطاف التدقيق مرة واحدة لكل عملية (لا يمكن إزالته لاحقاً)"""
+    global _hook_installed
+    with _hook_lock:
+        if not _hook_installed:
+            sys.addaudithook(_audit_hook)
+            _hook_installed = True
+
+def _read_thread_io() -> Dict[str, int]:
+    """قراءة عدادات الإدخال/الإخراج للخيط الحالي من /proc (Linux فقط)"""
+    for io_path in ("/proc/thread-self/io", "/proc/self/io"):
+        try:
+            values = {}
+            for line in Path(io_path).read_text().splitlines():
+                key, _, value = line.partition(":")
+                values[key.strip()] = int(value)
+            return {"read": values.get("rchar", 0), "written": values.get("wchar", 0)}
+        except (OSError, ValueError):
+            continue
+    return {"read": 0, "written": 0}
+
+class PhaseTelemetry:
+    """قياس موارد مرحلة واحدة (مدير سياق)
+
+    يُقاس المعالج والإدخال/الإخراج للخيط الذي ينفذ المرحلة، وتضاف إليهما
+    موارد العمليات الفرعية المنتهية خلال المرحلة (RUSAGE_CHILDREN). عند تشغيل
+    مراحل متوازية قد تتضمن أرقام العمليات الفرعية عمليات مراحل متزامنة.
+    """
+
+    def __init__(self):
+        _install_audit_hook()
+        self.metrics: Dict[str, Any] = {}
+
+        self._start_wall: Optional[float] = None
+        self._start_self = None
+        self._start_children = None
+        self._start_io: Dict[str, int] = {}
+
+    def __enter__(self) -> "PhaseTelemetry":
+        _local.counters = {"files_scanned": 0, "directories_scanned": 0, "subprocess_count": 0}
+
+        self._start_wall = time.perf_counter()
+        self._start_self = resource.getrusage(_RUSAGE_SCOPE)
+        self._start_children = resource.getrusage(resource.RUSAGE_CHILDREN)
+        self._start_io = _read_thread_io()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        wall = time.perf_counter() - self._start_wall
+        end_self = resource.getrusage(_RUSAGE_SCOPE)
+        end_children = resource.getrusage(resource.RUSAGE_CHILDREN)
+        end_io = _read_thread_io()
+        counters = _local.counters
+        _local.counters = None
+
+        def delta(field: str) -> float:
+            return (
+                getattr(end_self, field) - getattr(self._start_self, field) +
+                getattr(end_children, field) - getattr(self._start_children, field)
+            )
+
+        # ru_maxrss قيمة قصوى تراكمية وليست فرقاً: ذروة العملية أو أي عملية فرعية حتى الآن
+        peak_rss = max(
+            resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+            end_children.ru_maxrss
+        )
+
+        self.metrics = {
+            "wall_seconds": round(wall, 3),
+            "cpu_user_seconds": round(delta("ru_utime"), 3),
+            "cpu_system_seconds": round(delta("ru_stime"), 3),
+            "peak_rss_mb": round(peak_rss * _MAXRSS_TO_MB, 1),
+            "bytes_read": end_io["read"] - self._start_io["read"] +
+                (end_children.ru_inblock - self._start_children.ru_inblock) * _BLOCK_SIZE,
+            "bytes_written": end_io["written"] - self._start_io["written"] +
+                (end_children.ru_oublock - self._start_children.ru_oublock) * _BLOCK_SIZE,
+            **counters
+        }
+        return False
@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+# script: process_streaming.py
+
+import os
+import signal
+import asyncio
+import logging
+import subprocess
+import threading
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from logging.handlers import RotatingFileHandler
+from pathlib import Path
+from typing import IO, Deque, Dict, Iterator, List, Optional
+
+# حجم ملف السجل قبل التدوير وعدد النسخ المحفوظة
+LOG_MAX_BYTES = 10 * 1024 * 1024
+LOG_BACKUP_COUNT = 3
+
+# عدد الأسطر الأخيرة المحفوظة في الذاكرة لكل مجرى
+DEFAULT_TAIL_LINES = 200
+
+# حجم القراءة من الأنابيب في الوضع غير المتزامن والحد الأقصى لسطر واحد
+READ_CHUNK_SIZE = 64 * 1024
+MAX_LINE_LENGTH = 64 * 1024
+
+@dataclass
+class StreamResult:
+    """نتيجة عملية فرعية مع آخر أسطر مخرجاتها فقط"""
+    returncode: int
+    stdout_tail: List[str] = field(default_factory=list)
+    stderr_tail: List[str] = field(default_factory=list)
+    log_path: Optional[str] = None
+
+    @property
+    def stdout(self) -> str:
+        return "\n".join(self.stdout_tail)
+
+    @property
+    def stderr(self) -> str:
+        return "\n".join(self.stderr_tail)
+
+# ملفات سجلات المراحل المفتوحة: المسار -> [المسجل، المعالج، عدد المستخدمين]
+_log_lock = threading.Lock()
+_open_logs: Dict[Path, list] = {}
+
+# مجموعات العمليات الجارية لإنهائها عند إلغاء التحليل من الخارج
+_active_groups = set()
+_active_lock = threading.Lock()
+
+@contextmanager
+def open_phase_log(log_path: Path) -> Iterator[logging.Logger]:
+    """مسجل ملف سجل مرحلة مع تدوير الملفات، مفتوح طوال الاستدعاء فقط
+
+    الاستدعاءات المتزامنة على الملف نفسه تتشارك معالجاً واحداً (حتى لا يتعارض
+    تدويرها)، ويُغلق مع آخرها: لا تتراكم واصفات الملفات في العمليات العاملة
+    التي تشغل تحليلات متتالية، ويُفتح الملف من جديد إذا حُذف مجلد النتائج.
+    """
+    log_path = Path(log_path).resolve()
+
+    with _log_lock:
+        entry = _open_logs.get(log_path)
+        if entry is None:
+            log_path.parent.mkdir(parents=True, exist_ok=True)
+            handler = RotatingFileHandler(
+                log_path, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUP_COUNT, encoding="utf-8"
+            )
+            handler.setFormatter(logging.Formatter('%(asctime)s - %(message)s'))
+            # مسجل غير مسجل في logging حتى لا يبقى بعد الإغلاق؛ التمرير
+            # للمسجل الأب يتم صراحةً مع بادئة المرحلة
+            logger = logging.Logger(f"ramp.phase_log.{log_path}", logging.INFO)
+            logger.addHandler(handler)
+            logger.propagate = False
+            entry = _open_logs[log_path] = [logger, handler, 0]
+        entry[2] += 1
+
+    try:
+        yield entry[0]
+    finally:
+        with _log_lock:
+            entry[2] -= 1
+            if entry[2] == 0:
+                del _open_logs[log_path]
+                entry[0].removeHandler(entry[1])
+                entry[1].close()
+
+def terminate_active_processes(sig: int = signal.SIGKILL) -> None:
+    """إنهاء جميع مجموعات العمليات التي شغلها run_streaming ولم تنتهِ بعد"""
+    with _active_lock:
+        groups = list(_active_groups)
+
+    for pgid in groups:
+        try:
+            os.killpg(pgid, sig)
+        except ProcessLookupError:
+            pass
+
+def _pump(stream: IO[str], name: str, label: str, tail: Deque[str],
+          phase_log: logging.Logger, parent_logger: Optional[logging.Logger]) -> None:
+    """قراءة مجرى سطراً بسطر وكتابته في السجل وتمريره للمسجل الأب"""
+    for line in stream:
+        line = line.rstrip("\n")
+        tail.append(line)
+        phase_log.info(f"[{name}] {line}")
+        if parent_logger:
+            parent_logger.info(f"  │ {label}: {line}")
+    stream.close()
+
+def run_streaming(cmd: List[str], log_path: Path, label: str,
+                  parent_logger: Optional[logging.Logger] = None,
+                  cwd: Optional[Path] = None, timeout: Optional[float] = None,
+                  tail_lines: int = DEFAULT_TAIL_LINES) -> StreamResult:
+    """تشغيل عملية فرعية وبث مخرجاتها إلى ملف سجل دون تخزينها كاملة في الذاكرة
+
+    يرفع subprocess.TimeoutExpired بعد إنهاء العملية إذا تجاوزت المهلة.
+    """
+    with open_phase_log(log_path) as phase_log:
+        return _run_streaming(cmd, log_path, label, phase_log, parent_logger, cwd, timeout, tail_lines)
+
+def _run_streaming(cmd: List[str], log_path: Path, label: str, phase_log: logging.Logger,
+                   parent_logger: Optional[logging.Logger], cwd: Optional[Path],
+                   timeout: Optional[float], tail_lines: int) -> StreamResult:
+    phase_log.info(f"$ {' '.join(str(part) for part in cmd)}")
+
+    process = subprocess.Popen(
+        [str(part) for part in cmd],
+        cwd=cwd,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True,
+        errors="replace",
+        bufsize=1,
+        # مجموعة عمليات مستقلة لإنهاء العمليات الحفيدة (مثل npm) مع العملية
+        start_new_session=True
+    )
+
+    with _active_lock:
+        _active_groups.add(process.pid)
+
+    stdout_tail: Deque[str] = deque(maxlen=tail_lines)
+    stderr_tail: Deque[str] = deque(maxlen=tail_lines)
+
+    # خيط لكل مجرى حتى لا يمتلئ أحد الأنبوبين فتتوقف العملية
+    readers = [
+        threading.Thread(
+            target=_pump,
+            args=(process.stdout, "stdout", label, stdout_tail, phase_log, parent_logger),
+            daemon=True
+        ),
+        threading.Thread(
+            target=_pump,
+            args=(process.stderr, "stderr", label, stderr_tail, phase_log, parent_logger),
+            daemon=True
+        )
+    ]
+    for reader in readers:
+        reader.start()
+
+    try:
+        returncode = process.wait(timeout=timeout)
+    except BaseException as e:
+        # انتهاء المهلة أو مقاطعة: إنهاء المجموعة كاملة حتى تُغلق الأنابيب
+        try:
+            os.killpg(process.pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+        process.wait()
+        if isinstance(e, subprocess.TimeoutExpired):
+            phase_log.info(f"⏱️ انتهت المهلة ({timeout}s) وأُنهيت العملية")
+        raise
+    finally:
+        for reader in readers:
+            reader.join()
+        with _active_lock:
+            _active_groups.discard(process.pid)
+
+    phase_log.info(f"↳ رمز الخروج: {returncode}")
+
+    return StreamResult(
+        returncode=returncode,
+        stdout_tail=list(stdout_tail),
+        stderr_tail=list(stderr_tail),
+        log_path=str(log_path)
+    )
+
+async def _pump_async(stream: asyncio.StreamReader, name: str, label: str, tail: Deque[str],
+                      phase_log: logging.Logger, parent_logger: Optional[logging.Logger]) -> None:
+    """قراءة مجرى بأجزاء وتقسيمه إلى أسطر (دون حد StreamReader لطول السطر)"""
+
+    def emit(raw: bytes) -> None:
+        line = raw.decode("utf-8", errors="replace").rstrip("\r")
+        tail.append(line)
+        phase_log.info(f"[{name}] {line}")
+        if parent_logger:
+            parent_logger.info(f"  │ {label}: {line}")
+
+    partial = b""
+    while True:
+        chunk = await stream.read(READ_CHUNK_SIZE)
+        if not chunk:
+            break
+
+        *lines, partial = (partial + chunk).split(b"\n")
+        for raw in lines:
+            emit(raw)
+
+        # سطر طويل جداً بلا فاصل يُكتب مجزأً بدلاً من تجميعه في الذاكرة
+        if len(partial) > MAX_LINE_LENGTH:
+            emit(partial)
+            partial = b""
+
+    if partial:
+        emit(partial)
+
+async def run_streaming_async(cmd: List[str], log_path: Path, label: str,
+                              parent_logger: Optional[logging.Logger] = None,
+                              cwd: Optional[Path] = None, timeout: Optional[float] = None,
+                              tail_lines: int = DEFAULT_TAIL_LINES) -> StreamResult:
+    """نسخة asyncio من run_streaming
+
+    تُقرأ المخرجات باستمرار أثناء الانتظار فلا تمتلئ الأنابيب. عند انتهاء
+    المهلة (asyncio.TimeoutError) أو إلغاء المهمة تُنهى مجموعة العمليات
+    كاملة قبل إعادة رفع الاستثناء.
+    """
+    with open_phase_log(log_path) as phase_log:
+        return await _run_streaming_async(cmd, log_path, label, phase_log, parent_logger, cwd, timeout, tail_lines)
+
+async def _run_streaming_async(cmd: List[str], log_path: Path, label: str, phase_log: logging.Logger,
+                               parent_logger: Optional[logging.Logger], cwd: Optional[Path],
+                               timeout: Optional[float], tail_lines: int) -> StreamResult:
+    phase_log.info(f"$ {' '.join(str(part) for part in cmd)}")
+
+    process = await asyncio.create_subprocess_exec(
+        *[str(part) for part in cmd],
+        cwd=cwd,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+        start_new_session=True
+    )
+
+    with _active_lock:
+        _active_groups.add(process.pid)
+
+    stdout_tail: Deque[str] = deque(maxlen=tail_lines)
+    stderr_tail: Deque[str] = deque(maxlen=tail_lines)
+
+    readers = asyncio.gather(
+        _pump_async(process.stdout, "stdout", label, stdout_tail, phase_log, parent_logger),
+        _pump_async(process.stderr, "stderr", label, stderr_tail, phase_log, parent_logger)
+    )
+
+    try:
+        returncode = await asyncio.wait_for(process.wait(), timeout)
+        await readers
+    except BaseException as e:
+        try:
+            os.killpg(process.pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+        await asyncio.shield(process.wait())
+        readers.cancel()
+        if isinstance(e, asyncio.TimeoutError):
+            phase_log.info(f"⏱️ انتهت المهلة ({timeout}s) وأُنهيت العملية")
+        elif isinstance(e, asyncio.CancelledError):
+            phase_log.info("🛑 أُلغيت المرحلة وأُنهيت العملية")
+        raise
+    finally:
+        with _active_lock:
+            _active_groups.discard(process.pid)
+
+    phase_log.info(f"↳ رمز الخروج: {returncode}")
+
+    return StreamResult(
+        returncode=returncode,
+        stdout_tail=list(stdout_tail),
+        stderr_tail=list(stderr_tail),
+        log_path=str(log_path)
+    )
@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+# script: python_parser.py
+
+import os
+import ast
+import sys
+import json
+import uuid
+import hashlib
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+from phase_cache import evict_files
+
+# يُرفع عند تغيير بنية نتيجة الملف (يبطل الإدخالات المخزنة)
+PARSER_VERSION = 1
+
+# عدد الملفات في كل دفعة ترسل إلى عملية عاملة
+BATCH_SIZE = 32
+
+# الحد الأقصى لحجم نتائج التحليل المخزنة قبل إزالة الأقدم استخداماً (LRU)
+PARSE_CACHE_MAX_BYTES = 1024 ** 3
+
+class ModuleVisitor(ast.NodeVisitor):
+    """مرور واحد على شجرة AST يجمع الاستيرادات والدوال والفئات وطرقها"""
+
+    def __init__(self):
+        self.imports = set()
+        self.functions: List[str] = []
+        self.classes: List[str] = []
+        self.methods: Dict[str, List[str]] = {}
+        self._class_stack: List[str] = []
+        self._function_depth = 0
+
+    def visit_Import(self, node: ast.Import) -> None:
+        for alias in node.names:
+            self.imports.add(alias.name.split('.')[0])
+
+    def visit_ImportFrom(self, node: ast.ImportFrom) -> None:
+        if node.module:
+            self.imports.add(node.module.split('.')[0])
+
+    def visit_ClassDef(self, node: ast.ClassDef) -> None:
+        name = ".".join(self._class_stack + [node.name])
+        self.classes.append(name)
+        self._class_stack.append(node.name)
+        # الدوال داخل الفئة طرق لها حتى لو كانت الفئة داخل دالة
+        depth, self._function_depth = self._function_depth, 0
+        self.generic_visit(node)
+        self._function_depth = depth
+        self._class_stack.pop()
+
+    def _visit_function(self, node: ast.AST) -> None:
+        if self._class_stack and not self._function_depth:
+            self.methods.setdefault(".".join(self._class_stack), []).append(node.name)
+        else:
+            self.functions.append(node.name)
+        self._function_depth += 1
+        self.generic_visit(node)
+        self._function_depth -= 1
+
+    visit_FunctionDef = _visit_function
+    visit_AsyncFunctionDef = _visit_function
+
+    def result(self) -> Dict[str, Any]:
+        return {
+            "imports": sorted(self.imports),
+            "functions": self.functions,
+            "classes": self.classes,
+            "methods": self.methods
+        }
+
+def parse_source(source: bytes) -> Dict[str, Any]:
+    """تحليل ملف Python واحد (يحترم تصريح الترميز في رأس الملف)"""
+    visitor = ModuleVisitor()
+    visitor.visit(ast.parse(source))
+    return visitor.result()
+
+class ParseCache:
+    """نتائج التحليل على القرص معنونة بتجزئة blake2b لمحتوى الملف
+
+    المفتاح يشمل إصدار المحلل وإصدار Python (تتغير قواعد اللغة بينها)،
+    فيُحلل الملف من جديد فقط إذا تغير محتواه. القراءة تحدّث زمن تعديل
+    الإدخال فتُزال الإدخالات الأقدم استخداماً عند تجاوز الحد الأقصى للحجم.
+    """
+
+    def __init__(self, cache_dir: str, max_bytes: int = PARSE_CACHE_MAX_BYTES):
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self._salt = f"{PARSER_VERSION}\0{sys.version_info[0]}.{sys.version_info[1]}\0".encode("utf-8")
+
+    def key(self, content: bytes) -> str:
+        return hashlib.blake2b(self._salt + content, digest_size=20).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}.json"
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                result = json.load(f)
+            os.utime(path)
+            return result
+        except (OSError, ValueError):
+            return None
+
+    def put(self, key: str, result: Dict[str, Any]) -> None:
+        path = self._path(key)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # كتابة ذرية: عمليات متعددة قد تخزن الملف نفسه
+            tmp_path = path.with_name(f".{key}.{uuid.uuid4().hex}.tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(result, f, separators=(",", ":"))
+            os.replace(tmp_path, path)
+        except OSError:
+            pass
+
+    def evict(self) -> None:
+        """إزالة الإدخالات الأقدم استخداماً حتى يعود الحجم تحت الحد"""
+        if self.cache_dir.is_dir():
+            evict_files(self.cache_dir, self.max_bytes)
+
+# النتيجة لكل ملف: (المسار، النتيجة أو None، رسالة الخطأ، هل جاءت من الذاكرة المؤقتة)
+FileResult = Tuple[str, Optional[Dict[str, Any]], Optional[str], bool]
+
+def _parse_batch(paths: List[str], cache_dir: Optional[str]) -> List[FileResult]:
+    """تحليل دفعة من الملفات مع الذاكرة المؤقتة (داخل عملية عاملة)"""
+    cache = ParseCache(cache_dir) if cache_dir else None
+    results = []
+
+    for path in paths:
+        try:
+            with open(path, "rb") as f:
+                content = f.read()
+        except OSError as e:
+            results.append((path, None, str(e), False))
+            continue
+
+        key = cache.key(content) if cache else None
+        cached = cache.get(key) if cache else None
+        if cached is not None:
+            results.append((path, cached, None, True))
+            continue
+
+        try:
+            result = parse_source(content)
+        except (SyntaxError, ValueError) as e:
+            results.append((path, None, str(e), False))
+            continue
+
+        if cache:
+            cache.put(key, result)
+        results.append((path, result, None, False))
+
+    return results
+
+def parse_files(paths: List[Path], max_workers: Optional[int] = None,
+                cache_dir: Optional[str] = None) -> Tuple[List[FileResult], int]:
+    """تحليل ملفات Python بعمليات متوازية: (نتيجة كل ملف، عدد العمليات)
+
+    الدفعات الصغيرة تُحلل في العملية نفسها لأن كلفة إنشاء العمليات تفوق الفائدة.
+    """
+    files = [str(path) for path in paths]
+    batches = [files[i:i + BATCH_SIZE] for i in range(0, len(files), BATCH_SIZE)]
+    workers = min(max_workers or os.cpu_count() or 1, len(batches))
+
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(_parse_batch, batches, [cache_dir] * len(batches)))
+    else:
+        results = [_parse_batch(batch, cache_dir) for batch in batches]
+
+    # الإزالة مرة واحدة بعد كل الدفعات (العمليات العاملة تكتب بالتوازي)
+    if cache_dir:
+        ParseCache(cache_dir).evict()
+
+    return [item for result in results for item in result], max(workers, 1)
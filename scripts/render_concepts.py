@@ -3,7 +3,7 @@
 
 import json
 from pathlib import Path
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional
 from dataclasses import dataclass
 import logging
 from datetime import datetime
@@ -52,11 +52,15 @@ class ProductConcept:
 class ConceptRenderer:
     """صائغ موجزات المفاهيم"""
 
-    def __init__(self, repo_path: str, output_dir: str):
+    def __init__(self, repo_path: str, output_dir: str,
+                 artifacts: Optional[Dict[str, Any]] = None):
         self.repo_path = Path(repo_path)
         self.output_dir = Path(output_dir)
         self.logger = logging.getLogger(__name__)
 
+        # نتائج المراحل السابقة في الذاكرة (مفتاحها المسار النسبي للملف)
+        self.artifacts = artifacts if artifacts is not None else {}
+
         # تحميل البيانات السابقة
         self.shortlist = self._load_json("artifacts/mix/opportunity_shortlist.json")
         self.build_data = self._load_json("artifacts/build/codebase_analysis.json")
@@ -64,6 +68,9 @@ class ConceptRenderer:
 
     def _load_json(self, file_path: str) -> List[Dict[str, Any]]:
         """تحميل ملف JSON"""
+        if file_path in self.artifacts:
+            return self.artifacts[file_path]
+
         try:
             with open(self.output_dir / file_path, 'r', encoding='utf-8') as f:
                 return json.load(f)
@@ -0,0 +1,302 @@
+#!/usr/bin/env python3
+# script: run_batch_analysis.py
+
+import os
+import re
+import sys
+import json
+import time
+import hashlib
+import argparse
+import logging
+from pathlib import Path
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Dict, List, Optional
+
+from run_full_analysis import (
+    DEFAULT_CACHE_DIR, DEFAULT_HISTORY_FILE, DEFAULT_INSTALL_CACHE_DIR, EXECUTION_MODES, FullAnalysisRunner
+)
+
+def load_manifest(manifest_path: str) -> List[Dict[str, str]]:
+    """تحميل قائمة المستودعات
+
+    يدعم ملف JSON (قائمة كائنات فيها repo_url و branch) أو ملفاً نصياً
+    يحتوي سطراً لكل مستودع: <repo_url> [branch]، مع تجاهل الأسطر الفارغة و #.
+    """
+    path = Path(manifest_path)
+
+    if path.suffix == ".json":
+        with open(path, "r", encoding="utf-8") as f:
+            entries = json.load(f)
+        return [
+            {"repo_url": entry["repo_url"], "branch": entry.get("branch", "main")}
+            for entry in entries
+        ]
+
+    entries = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            parts = line.split()
+            entries.append({
+                "repo_url": parts[0],
+                "branch": parts[1] if len(parts) > 1 else "main"
+            })
+    return entries
+
+def _job_slug(repo_url: str, branch: str) -> str:
+    """اسم مجلد فريد وقابل للقراءة لكل مستودع وفرع"""
+    name = re.sub(r"\.git$", "", repo_url.rstrip("/").split("/")[-1]) or "repo"
+    digest = hashlib.sha256(f"{repo_url}@{branch}".encode("utf-8")).hexdigest()[:8]
+    return re.sub(r"[^A-Za-z0-9._-]", "_", f"{name}_{branch}_{digest}")
+
+def _run_job(job: Dict[str, Any]) -> Dict[str, Any]:
+    """تشغيل خط تحليل كامل لمستودع واحد (داخل عملية عاملة)"""
+    started = time.time()
+
+    runner = FullAnalysisRunner(
+        repo_url=job["repo_url"],
+        branch=job["branch"],
+        output_dir=job["output_dir"],
+        execution_mode=job["execution_mode"],
+        max_workers=job["max_workers"],
+        cache_dir=job["cache_dir"],
+        clone_cache_dir=job["clone_cache_dir"],
+        analysis_id=job["analysis_id"],
+        history_file=job.get("history_file"),
+        install_cache_dir=job.get("install_cache_dir"),
+        blob_counts_file=job.get("blob_counts_file"),
+        use_existing_checkout=job.get("use_existing_checkout", False)
+    )
+
+    try:
+        success = runner.run_complete_analysis()
+        error = None
+    except Exception as e:
+        success = False
+        error = str(e)
+
+    return {
+        **{key: job[key] for key in ("repo_url", "branch", "analysis_id", "output_dir")},
+        "status": "success" if success else "failed",
+        "error": error,
+        "duration_seconds": round(time.time() - started, 2),
+        "overall_score": _read_overall_score(Path(job["output_dir"])),
+        "log_file": f"analysis_{job['analysis_id']}.log"
+    }
+
+def _read_overall_score(output_dir: Path) -> Optional[float]:
+    """قراءة الدرجة الإجمالية من بطاقة النتائج إن وجدت"""
+    try:
+        with open(output_dir / "artifacts/grade/scorecard.json", "r", encoding="utf-8") as f:
+            return json.load(f)["summary"]["overall_score"]
+    except (OSError, json.JSONDecodeError, KeyError):
+        return None
+
+class BatchAnalysisRunner:
+    """منسق تحليل دفعة من المستودعات بمجمع عمليات محدود"""
+
+    def __init__(self, entries: List[Dict[str, str]], output_root: str,
+                 concurrency: int = 2, execution_mode: str = "inprocess",
+                 max_workers: Optional[int] = None, cache_dir: Optional[str] = None,
+                 clone_cache_dir: Optional[str] = None, history_file: Optional[str] = None,
+                 install_cache_dir: Optional[str] = None):
+        self.entries = entries
+        self.output_root = Path(output_root)
+        self.concurrency = max(1, concurrency)
+        self.execution_mode = execution_mode
+
+        # تقسيم الأنوية بين خطوط التحليل المتزامنة لتجنب الإفراط في الاشتراك
+        self.max_workers = max_workers or max(1, (os.cpu_count() or 1) // self.concurrency)
+
+        self.cache_dir = cache_dir
+        self.clone_cache_dir = clone_cache_dir or str(self.output_root / "clone_cache")
+        self.history_file = history_file
+        self.install_cache_dir = install_cache_dir
+        self.batch_id = f"BATCH-{datetime.now().strftime('%Y%m%d%H%M%S')}"
+        self.index_path = self.output_root / "batch_index.json"
+
+        logging.basicConfig(
+            level=logging.INFO,
+            format='%(asctime)s - %(levelname)s - %(message)s'
+        )
+        self.logger = logging.getLogger(__name__)
+
+    def _build_jobs(self) -> List[Dict[str, Any]]:
+        """تحويل عناصر القائمة إلى مهام مستقلة"""
+        jobs = []
+        for i, entry in enumerate(self.entries, 1):
+            slug = _job_slug(entry["repo_url"], entry["branch"])
+            jobs.append({
+                "repo_url": entry["repo_url"],
+                "branch": entry["branch"],
+                "output_dir": str(self.output_root / slug),
+                # معرف فريد لكل مهمة حتى لا تتصادم السجلات والأرشيفات
+                "analysis_id": f"{self.batch_id.replace('BATCH', 'RAMP')}-{i:04d}",
+                "execution_mode": self.execution_mode,
+                "max_workers": self.max_workers,
+                "cache_dir": self.cache_dir,
+                "clone_cache_dir": self.clone_cache_dir,
+                "history_file": self.history_file,
+                "install_cache_dir": self.install_cache_dir
+            })
+        return jobs
+
+    def run(self) -> bool:
+        """تشغيل جميع المهام وكتابة الفهرس الموحد"""
+        self.output_root.mkdir(parents=True, exist_ok=True)
+        jobs = self._build_jobs()
+
+        self.logger.info(f"🚀 بدء تحليل دفعة {self.batch_id}: {len(jobs)} مستودع، {self.concurrency} متزامنة")
+
+        results = []
+        with ProcessPoolExecutor(max_workers=self.concurrency) as executor:
+            futures = {executor.submit(_run_job, job): job for job in jobs}
+
+            for future in as_completed(futures):
+                job = futures[future]
+                try:
+                    result = future.result()
+                except Exception as e:
+                    # فشل العملية العاملة نفسها (مثلاً انهيارها)
+                    result = {
+                        **{key: job[key] for key in ("repo_url", "branch", "analysis_id", "output_dir")},
+                        "status": "error",
+                        "error": str(e)
+                    }
+
+                results.append(result)
+                icon = "✅" if result["status"] == "success" else "❌"
+                self.logger.info(f"{icon} {result['repo_url']} ({result['branch']}) - {len(results)}/{len(jobs)}")
+
+                # تحديث الفهرس بعد كل مهمة ليبقى مفيداً إذا توقفت الدفعة
+                self._write_index(results, len(jobs))
+
+        succeeded = len([r for r in results if r["status"] == "success"])
+        self.logger.info(f"🎉 اكتملت الدفعة: {succeeded}/{len(jobs)} ناجحة - الفهرس: {self.index_path}")
+        return succeeded == len(jobs)
+
+    def _write_index(self, results: List[Dict[str, Any]], total: int) -> None:
+        """كتابة الفهرس الموحد للنتائج"""
+        index = {
+            "batch_id": self.batch_id,
+            "updated_at": datetime.now().isoformat(),
+            "summary": {
+                "total": total,
+                "finished": len(results),
+                "succeeded": len([r for r in results if r["status"] == "success"]),
+                "failed": len([r for r in results if r["status"] != "success"])
+            },
+            "results": sorted(results, key=lambda r: r["analysis_id"])
+        }
+
+        # كتابة ذرية حتى لا يُقرأ فهرس ناقص
+        tmp_path = self.index_path.with_suffix(".json.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(index, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_path, self.index_path)
+
+def main():
+    """الدالة الرئيسية"""
+
+    parser = argparse.ArgumentParser(
+        description="تحليل دفعة من المستودعات بالتوازي"
+    )
+
+    parser.add_argument(
+        "--manifest",
+        required=True,
+        help="قائمة المستودعات: ملف JSON أو ملف نصي بسطر '<repo_url> [branch]' لكل مستودع"
+    )
+
+    parser.add_argument(
+        "--output-root",
+        default=f"./batch_{datetime.now().strftime('%Y%m%d%H%M%S')}",
+        help="المجلد الجذر لنتائج الدفعة"
+    )
+
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=2,
+        help="عدد خطوط التحليل المتزامنة (افتراضي: 2)"
+    )
+
+    parser.add_argument(
+        "--execution-mode",
+        choices=EXECUTION_MODES,
+        default="inprocess",
+        help="وضع تنفيذ المراحل داخل كل خط تحليل"
+    )
+
+    parser.add_argument(
+        "--max-workers",
+        type=int,
+        help="المراحل المتوازية لكل خط تحليل (افتراضي: الأنوية ÷ التزامن)"
+    )
+
+    parser.add_argument(
+        "--cache-dir",
+        default=str(DEFAULT_CACHE_DIR),
+        help=f"مجلد الذاكرة المؤقتة لنتائج المراحل (افتراضي: {DEFAULT_CACHE_DIR})"
+    )
+
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="تعطيل الذاكرة المؤقتة لنتائج المراحل"
+    )
+
+    parser.add_argument(
+        "--clone-cache-dir",
+        help="مجلد مرايا Git المشتركة (افتراضي: <output-root>/clone_cache)"
+    )
+
+    parser.add_argument(
+        "--history-file",
+        default=str(DEFAULT_HISTORY_FILE),
+        help=f"سجل مدد المراحل المشترك لضبط المهل (افتراضي: {DEFAULT_HISTORY_FILE})"
+    )
+
+    parser.add_argument(
+        "--no-history",
+        action="store_true",
+        help="استخدام المهل الثابتة دون تاريخ التشغيلات"
+    )
+
+    parser.add_argument(
+        "--install-cache-dir",
+        default=str(DEFAULT_INSTALL_CACHE_DIR),
+        help=f"ذاكرة تثبيت التبعيات المشتركة بين المستودعات (افتراضي: {DEFAULT_INSTALL_CACHE_DIR})"
+    )
+
+    parser.add_argument(
+        "--no-install-cache",
+        action="store_true",
+        help="تثبيت التبعيات من جديد في كل مهمة"
+    )
+
+    args = parser.parse_args()
+
+    batch = BatchAnalysisRunner(
+        entries=load_manifest(args.manifest),
+        output_root=args.output_root,
+        concurrency=args.concurrency,
+        execution_mode=args.execution_mode,
+        max_workers=args.max_workers,
+        cache_dir=None if args.no_cache else args.cache_dir,
+        clone_cache_dir=args.clone_cache_dir,
+        history_file=None if args.no_history else args.history_file,
+        install_cache_dir=None if args.no_install_cache else args.install_cache_dir
+    )
+
+    success = batch.run()
+
+    print(f"\n📋 فهرس النتائج: {batch.index_path}")
+    sys.exit(0 if success else 1)
+
+if __name__ == "__main__":
+    main()
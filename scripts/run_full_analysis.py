@@ -8,25 +8,102 @@ import argparse
 import logging
 from pathlib import Path
 from datetime import datetime
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Set
 import json
+import time
+import asyncio
+import threading
+
+import event_journal
+from event_journal import EventJournal
+from file_inventory import INVENTORY_ARTIFACT, INVENTORY_MODES
+from git_history import HISTORY_ARTIFACT
+from lockfile_analyzer import LOCKFILE_ARTIFACT
+from phase_cache import PhaseCache
+from phase_scheduler import AsyncPhaseScheduler, Phase, PhaseScheduler
+from phase_telemetry import PhaseTelemetry
+from process_streaming import run_streaming, run_streaming_async
+from runtime_history import RuntimeHistory, critical_path_seconds, extract_features
+
+if TYPE_CHECKING:
+    # يُستورد عند الحاجة فقط (يحمّل GitPython ومكتبات التحليل)
+    from build_analysis import RepositoryAnalyzer
+
+# أوضاع تنفيذ المراحل
+EXECUTION_MODES = ["inprocess", "subprocess", "asyncio"]
+
+# المجلد الافتراضي للذاكرة المؤقتة لنتائج المراحل (مشترك بين التشغيلات)
+DEFAULT_CACHE_DIR = Path.home() / ".cache" / "ramp-analysis"
+
+# سجل مدد المراحل السابقة لتقدير الزمن وضبط المهل
+DEFAULT_HISTORY_FILE = DEFAULT_CACHE_DIR / "phase_history.jsonl"
+
+# ذاكرة تثبيت التبعيات المشتركة (node_modules وحزم البيئات الافتراضية)
+DEFAULT_INSTALL_CACHE_DIR = DEFAULT_CACHE_DIR / "installs"
+
+# نتيجة BUILD التي تحدد حجم المستودع
+CODEBASE_ARTIFACT = "artifacts/build/codebase_analysis.json"
+
+# حالات المراحل التي لا يُعاد تشغيلها عند الاستئناف
+DONE_STATUSES = {"completed", "cached"}
 
 class FullAnalysisRunner:
     """منسق تشغيل التحليل الكامل"""
 
-    def __init__(self, repo_url: str, branch: str = "main", output_dir: str = None):
+    def __init__(self, repo_url: str = None, branch: str = "main", output_dir: str = None,
+                 execution_mode: str = "inprocess", max_workers: Optional[int] = None,
+                 cache_dir: Optional[str] = None, resume: bool = False,
+                 clone_cache_dir: Optional[str] = None, analysis_id: Optional[str] = None,
+                 deadline: Optional[float] = None, history_file: Optional[str] = None,
+                 clone_depth: Optional[int] = None, clone_filter: Optional[str] = None,
+                 sparse_paths: Optional[List[str]] = None, inventory_mode: str = "auto",
+                 install_cache_dir: Optional[str] = None, blob_counts_file: Optional[str] = None,
+                 use_existing_checkout: bool = False):
         self.repo_url = repo_url
         self.branch = branch
-        self.analysis_id = f"RAMP-{datetime.now().strftime('%Y%m%d%H%M%S')}"
+        self.execution_mode = execution_mode
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.clone_cache_dir = clone_cache_dir
+        self.install_cache_dir = install_cache_dir
+        # عدادات أسطر مشتركة بين الفروع (يمررها MultiBranchAnalyzer)
+        self.blob_counts_file = blob_counts_file
+        # worktree محدّث مسبقاً من الاستنساخ المشترك (لا تحديث في مرحلة BUILD)
+        self.use_existing_checkout = use_existing_checkout
+
+        # خيارات الاستنساخ السطحي والجزئي والمسارات المحددة
+        self.clone_depth = clone_depth
+        self.clone_filter = clone_filter
+        self.sparse_paths = sparse_paths or []
+        self._history_deepened = False
+        # مصدر جرد الملفات: فهرس git أو المرور على القرص
+        self.inventory_mode = inventory_mode
+        # المهلة الإجمالية للتحليل بالثواني (وضع asyncio)
+        self.deadline = deadline
+        self.analysis_id = analysis_id or f"RAMP-{datetime.now().strftime('%Y%m%d%H%M%S')}"
         self.output_dir = Path(output_dir or f"./analysis_{self.analysis_id}")
 
-        # إعداد التسجيل
+        # سجل الأحداث الإلحاقي (مصدر الحالة) و config.json لقطة مشتقة منه
+        self.journal_path = self.output_dir / "events.jsonl"
+        self.journal: Optional[EventJournal] = None
+
+        # الاستئناف يعيد استخدام معرف التحليل ومعلومات المستودع من التشغيل السابق
+        self.resume = resume
+        self.previous_config: Dict[str, Any] = {}
+        if resume:
+            self.previous_config = self._load_state()
+            self.analysis_id = self.previous_config["analysis_id"]
+            self.repo_url = self.repo_url or self.previous_config["repository"]["url"]
+            self.branch = self.previous_config["repository"].get("branch", self.branch)
+
+        # إعداد التسجيل (force لأن عملية العامل قد تشغل عدة تحليلات متتالية)
         logging.basicConfig(
             level=logging.INFO,
             format='%(asctime)s - %(levelname)s - %(message)s',
             handlers=[
                 logging.FileHandler(f"analysis_{self.analysis_id}.log"),
                 logging.StreamHandler()
-            ]
+            ],
+            force=True
         )
         self.logger = logging.getLogger(__name__)
 
@@ -34,6 +111,151 @@ class FullAnalysisRunner:
         self.scripts_dir = Path(__file__).parent
         self.repo_path = self.output_dir / "repository"
 
+        # نتائج المراحل في الذاكرة لتمريرها مباشرة بين المراحل (مفتاحها مسار الملف النسبي)
+        self.artifacts: Dict[str, Any] = {}
+
+        # المراحل قد تعمل بالتوازي، لذا يُسلسل الاستنساخ عند الطلب
+        self._clone_lock = threading.Lock()
+        self._async_clone_lock: Optional[asyncio.Lock] = None
+
+        # الذاكرة المؤقتة لنتائج المراحل (None لتعطيلها)
+        self.cache = PhaseCache(cache_dir) if cache_dir else None
+        # نتائج تحليل ملفات Python حسب محتواها، مشتركة بين التشغيلات والمستودعات
+        self.parse_cache_dir = str(Path(cache_dir) / "python_ast") if cache_dir else None
+        self.layout_cache_dir = str(Path(cache_dir) / "layouts") if cache_dir else None
+        self.commit_sha: Optional[str] = None
+
+        # قياسات موارد كل مرحلة (تُكتب في config.json و timings.json)
+        self.phase_metrics: Dict[str, Dict[str, Any]] = {}
+
+        self.phases: Dict[str, Phase] = {phase.name: phase for phase in self._define_phases()}
+
+        # تاريخ المدد (None لتعطيله) والمهل الافتراضية عند غياب التاريخ
+        self.history = RuntimeHistory(history_file) if history_file else None
+        self.default_timeouts = {name: phase.timeout for name, phase in self.phases.items()}
+        self.features: Optional[Dict[str, float]] = None
+        self.phase_statuses: Dict[str, str] = {}
+
+    def _define_phases(self) -> List[Phase]:
+        """تعريف المراحل مع المخرجات التي تستهلكها وتنتجها"""
+        codebase = CODEBASE_ARTIFACT
+        dependency_graph = "artifacts/assemble/dependency_graph.json"
+        api_analysis = "artifacts/assemble/api_analysis.json"
+        scorecard = "artifacts/grade/scorecard.json"
+        shortlist = "artifacts/mix/opportunity_shortlist.json"
+
+        repo_path, output_dir = str(self.repo_path), str(self.output_dir)
+
+        return [
+            Phase(
+                name="build",
+                label="BUILD",
+                script="build_analysis.py",
+                args=self._build_args("analyze"),
+                timeout=300,
+                run=self._run_build_phase,
+                produces=[
+                    "repository", "artifacts/build/repo_info.json", codebase, INVENTORY_ARTIFACT, LOCKFILE_ARTIFACT
+                ],
+                markers=["repository"]
+            ),
+            Phase(
+                name="build_tests",
+                label="BUILD TESTS",
+                script="build_analysis.py",
+                args=self._build_args("tests"),
+                timeout=600,
+                run=self._run_build_tests_phase,
+                consumes=["repository"],
+                produces=["artifacts/build/test_results.json"]
+            ),
+            Phase(
+                name="build_history",
+                label="BUILD HISTORY",
+                script="build_analysis.py",
+                args=self._build_args("history"),
+                timeout=600,
+                run=self._run_build_history_phase,
+                consumes=["repository"],
+                produces=[HISTORY_ARTIFACT],
+                needs_history=True
+            ),
+            Phase(
+                name="assemble_graph",
+                label="ASSEMBLE GRAPH",
+                script="assemble_architecture.py",
+                args=[repo_path, output_dir, "graph", "--workers", str(self.max_workers)] + (
+                    ["--parse-cache-dir", self.parse_cache_dir] if self.parse_cache_dir else []
+                ) + (
+                    ["--layout-cache-dir", self.layout_cache_dir] if self.layout_cache_dir else []
+                ),
+                timeout=300,
+                run=self._run_assemble_graph_phase,
+                consumes=["repository", INVENTORY_ARTIFACT],
+                produces=[
+                    dependency_graph, "artifacts/assemble/dependency_graph.png",
+                    "artifacts/assemble/dependency_graph.svg", "artifacts/assemble/dependency_graph.dot"
+                ]
+            ),
+            Phase(
+                name="assemble_api",
+                label="ASSEMBLE API",
+                script="assemble_architecture.py",
+                args=[repo_path, output_dir, "api"],
+                timeout=300,
+                run=self._run_assemble_api_phase,
+                consumes=["repository", INVENTORY_ARTIFACT],
+                produces=[api_analysis]
+            ),
+            Phase(
+                name="grade",
+                label="GRADE",
+                script="grade_assessment.py",
+                args=[repo_path, output_dir],
+                timeout=300,
+                run=self._run_grade_phase,
+                consumes=[codebase, INVENTORY_ARTIFACT, HISTORY_ARTIFACT, dependency_graph, api_analysis],
+                produces=[scorecard]
+            ),
+            Phase(
+                name="mix",
+                label="MIX",
+                script="mix_opportunities.py",
+                args=[repo_path, output_dir],
+                timeout=300,
+                run=self._run_mix_phase,
+                consumes=[codebase, dependency_graph, api_analysis, scorecard],
+                produces=["artifacts/mix/opportunity_longlist.json", shortlist]
+            ),
+            Phase(
+                name="render",
+                label="RENDER",
+                script="render_concepts.py",
+                args=[repo_path, output_dir],
+                timeout=300,
+                run=self._run_render_phase,
+                consumes=[shortlist, codebase, scorecard],
+                produces=["artifacts/render"]
+            ),
+            Phase(
+                name="export",
+                label="EXPORT",
+                script="export_deliverables.py",
+                args=[output_dir, self.analysis_id],
+                timeout=300,
+                cacheable=False,
+                run=self._run_export_phase,
+                consumes=[
+                    codebase, dependency_graph, api_analysis, scorecard, shortlist,
+                    "artifacts/mix/opportunity_longlist.json",
+                    "artifacts/assemble/dependency_graph.png",
+                    "artifacts/build/test_results.json",
+                    "artifacts/render"
+                ],
+                produces=["deliverables"]
+            )
+        ]
+
     def run_complete_analysis(self) -> bool:
         """تشغيل التحليل الكامل"""
 
@@ -42,6 +264,7 @@ class FullAnalysisRunner:
             self.logger.info(f"📁 المستودع: {self.repo_url}")
             self.logger.info(f"🌿 الفرع: {self.branch}")
             self.logger.info(f"📂 مجلد النتائج: {self.output_dir}")
+            self.logger.info(f"⚙️ وضع التنفيذ: {self.execution_mode} (حتى {self.max_workers} مراحل متوازية)")
 
             # المرحلة 0: التحقق من المتطلبات
             if not self._verify_requirements():
@@ -51,28 +274,49 @@ class FullAnalysisRunner:
             if not self._initialize_environment():
                 return False
 
-            # المرحلة 2: BUILD - التحليل الأولي
-            if not self._run_build_phase():
-                return False
+            if self.cache:
+                self.commit_sha = self._resolve_commit_sha()
 
-            # المرحلة 3: ASSEMBLE - تحليل المعمارية
-            if not self._run_assemble_phase():
-                return False
+            # المراحل 2-7: BUILD → EXPORT وفق رسم التبعيات بين المخرجات
+            completed = {
+                name for name, data in self.previous_config.get("phases", {}).items()
+                if data.get("status") in DONE_STATUSES
+            }
+            if completed:
+                self.logger.info(f"⏭️ استئناف التحليل، تخطي المراحل المكتملة: {', '.join(sorted(completed))}")
 
-            # المرحلة 4: GRADE - التقييم والتحكيم
-            if not self._run_grade_phase():
-                return False
+            phases = list(self.phases.values())
 
-            # المرحلة 5: MIX - توليد الفرص
-            if not self._run_mix_phase():
-                return False
+            if self.execution_mode == "asyncio":
+                for phase in phases:
+                    phase.run = self._async_phase_runner(phase)
 
-            # المرحلة 6: RENDER - صياغة المفاهيم
-            if not self._run_render_phase():
-                return False
+                scheduler = AsyncPhaseScheduler(
+                    phases, self.max_workers, completed=completed, deadline=self.deadline
+                )
+            else:
+                for phase in phases:
+                    phase.run = self._with_telemetry(phase.name, self._with_cache(phase))
+
+                scheduler = PhaseScheduler(phases, self.max_workers, completed=completed)
 
-            # المرحلة 7: EXPORT - تصدير التسليمات
-            if not self._run_export_phase():
+            if self.history:
+                self._apply_runtime_model(self._load_features() or self.history.features_for(self.repo_url))
+                self._log_runtime_estimate(scheduler.dependencies, completed)
+
+            started = time.perf_counter()
+            if self.execution_mode == "asyncio":
+                success = asyncio.run(scheduler.run())
+            else:
+                success = scheduler.run()
+
+            self._write_timings(time.perf_counter() - started)
+            self._record_history()
+
+            if not success:
+                for phase, status in scheduler.results.items():
+                    if status == "skipped":
+                        self._update_phase_status(phase, "skipped")
                 return False
 
             self.logger.info("🎉 تم إكمال التحليل الشامل بنجاح!")
@@ -82,23 +326,36 @@ class FullAnalysisRunner:
             self.logger.error(f"❌ خطأ في التحليل الشامل: {e}")
             return False
 
+        finally:
+            if self.journal:
+                self.journal.close()
+                self.write_config_snapshot()
+
     def _verify_requirements(self) -> bool:
         """التحقق من المتطلبات"""
         self.logger.info("🔍 التحقق من المتطلبات...")
 
         try:
-            result = subprocess.run(
-                [sys.executable, self.scripts_dir / "verify_requirements.py"],
-                capture_output=True,
-                text=True,
-                timeout=60
-            )
+            if self.execution_mode == "inprocess":
+                from verify_requirements import RequirementsVerifier
 
-            if result.returncode == 0:
+                success = RequirementsVerifier().run()
+                error = "راجع verification_report.json"
+            else:
+                result = subprocess.run(
+                    [sys.executable, self.scripts_dir / "verify_requirements.py"],
+                    capture_output=True,
+                    text=True,
+                    timeout=60
+                )
+                success = result.returncode == 0
+                error = result.stderr
+
+            if success:
                 self.logger.info("✅ جميع المتطلبات متوفرة")
                 return True
             else:
-                self.logger.error(f"❌ متطلبات ناقصة: {result.stderr}")
+                self.logger.error(f"❌ متطلبات ناقصة: {error}")
                 return False
 
         except Exception as e:
@@ -112,27 +369,32 @@ class FullAnalysisRunner:
         try:
             # إنشاء مجلدات
             self.output_dir.mkdir(parents=True, exist_ok=True)
+            for phase in ["build", "assemble", "grade", "mix", "render"]:
+                (self.output_dir / "artifacts" / phase).mkdir(parents=True, exist_ok=True)
+
+            self.journal = EventJournal(str(self.journal_path))
+
+            # الإبقاء على حالات المراحل السابقة عند الاستئناف
+            if self.resume:
+                self.journal.append(event_journal.ANALYSIS_RESUMED, durable=True)
+                self.write_config_snapshot()
+                self.logger.info("✅ تم تهيئة البيئة (استئناف)")
+                return True
 
             # إنشاء ملف التكوين
             config = {
                 "analysis_id": self.analysis_id,
+                "execution_mode": self.execution_mode,
                 "repository": {
                     "url": self.repo_url,
                     "branch": self.branch,
                     "timestamp": datetime.now().isoformat()
                 },
-                "phases": {
-                    "build": {"status": "pending"},
-                    "assemble": {"status": "pending"},
-                    "grade": {"status": "pending"},
-                    "mix": {"status": "pending"},
-                    "render": {"status": "pending"},
-                    "export": {"status": "pending"}
-                }
+                "phases": {name: {"status": "pending"} for name in self.phases}
             }
 
-            with open(self.output_dir / "config.json", "w") as f:
-                json.dump(config, f, indent=2)
+            self.journal.append(event_journal.ANALYSIS_INITIALIZED, durable=True, config=config)
+            self.write_config_snapshot()
 
             self.logger.info("✅ تم تهيئة البيئة")
             return True
@@ -141,212 +403,580 @@ class FullAnalysisRunner:
             self.logger.error(f"❌ خطأ في تهيئة البيئة: {e}")
             return False
 
-    def _run_build_phase(self) -> bool:
-        """تشغيل مرحلة BUILD"""
-        self.logger.info("🔨 المرحلة 1: BUILD - التحليل الأولي...")
+    def _resolve_commit_sha(self) -> Optional[str]:
+        """تحديد SHA الالتزام المراد تحليله دون استنساخ المستودع"""
+        repo_info_path = self.output_dir / "artifacts/build/repo_info.json"
 
         try:
+            # عند الاستئناف يكون المستودع المستنسخ هو المرجع
+            if repo_info_path.exists():
+                with open(repo_info_path, "r", encoding="utf-8") as f:
+                    return json.load(f)["last_commit"]["sha"]
+
             result = subprocess.run(
-                [
-                    sys.executable,
-                    self.scripts_dir / "build_analysis.py",
-                    self.repo_url,
-                    str(self.output_dir),
-                    self.branch
-                ],
+                ["git", "ls-remote", self.repo_url, f"refs/heads/{self.branch}"],
                 capture_output=True,
                 text=True,
-                timeout=600
+                timeout=60
             )
+            if result.returncode == 0 and result.stdout.strip():
+                return result.stdout.split()[0]
 
-            if result.returncode == 0:
-                self._update_phase_status("build", "completed")
-                self.logger.info("✅ مرحلة BUILD مكتملة")
+        except Exception as e:
+            self.logger.warning(f"⚠️ تعذر تحديد SHA الالتزام: {e}")
+
+        self.logger.warning("⚠️ لم يُحدد SHA الالتزام، تعطيل الذاكرة المؤقتة لهذا التشغيل")
+        return None
+
+    def _phase_cache_key(self, phase: Phase) -> Optional[str]:
+        """حساب مفتاح المرحلة من SHA الالتزام والمخرجات السابقة والسكربت والتكوين"""
+        if not self.cache or not self.commit_sha or not phase.cacheable:
+            return None
+
+        # المستودع وجرد ملفاته (تتغير أزمنة تعديله مع كل استنساخ) ممثلان بـ SHA الالتزام
+        inputs = {}
+        for artifact in phase.consumes:
+            path = self.output_dir / artifact
+            if artifact not in ("repository", INVENTORY_ARTIFACT) and path.exists():
+                inputs[artifact] = PhaseCache.hash_path(path)
+
+        # السكربت مع الوحدات المحلية التي يستوردها (line_counter، module_graph...)
+        script_version = self.cache.script_version(self.scripts_dir, phase.script) if phase.script else ""
+        # المسارات المحددة تغير محتوى التحليل، والعمق يغير معلومات التاريخ
+        config = {
+            "repo_url": self.repo_url,
+            "branch": self.branch,
+            "clone_depth": self.clone_depth,
+            "sparse_paths": self.sparse_paths,
+            "inventory_mode": self.inventory_mode
+        }
+
+        return self.cache.compute_key(phase.name, self.commit_sha, inputs, script_version, config)
+
+    def _with_telemetry(self, phase: str, run: Callable[[], bool]) -> Callable[[], bool]:
+        """تغليف تشغيل المرحلة بقياس الزمن والمعالج والذاكرة والإدخال/الإخراج"""
+
+        def measured_run() -> bool:
+            self._emit(event_journal.PHASE_STARTED, phase=phase)
+            telemetry = PhaseTelemetry()
+            try:
+                with telemetry:
+                    return run()
+            finally:
+                self.phase_metrics[phase] = telemetry.metrics
+                self._record_phase_metrics(phase, telemetry.metrics)
+
+        return measured_run
+
+    def _record_phase_metrics(self, phase: str, metrics: Dict[str, Any]) -> None:
+        """تسجيل قياسات المرحلة في سجل الأحداث"""
+        self._emit(event_journal.PHASE_METRICS, phase=phase, metrics=metrics)
+
+    def _write_timings(self, elapsed_seconds: float) -> None:
+        """كتابة ملخص timings.json في مجلد التسليمات"""
+        try:
+            deliverables_dir = self.output_dir / "deliverables"
+            deliverables_dir.mkdir(parents=True, exist_ok=True)
+
+            # ترتيب المراحل من الأبطأ إلى الأسرع لإظهار المرحلة المهيمنة
+            phases = dict(sorted(
+                self.phase_metrics.items(),
+                key=lambda item: item[1].get("wall_seconds", 0),
+                reverse=True
+            ))
+
+            timings = {
+                "analysis_id": self.analysis_id,
+                "execution_mode": self.execution_mode,
+                "max_workers": self.max_workers,
+                # الزمن الفعلي من أول مرحلة لآخرها (أقل من مجموع المراحل عند التوازي)
+                "elapsed_seconds": round(elapsed_seconds, 3),
+                "totals": {
+                    field: round(sum(m.get(field, 0) for m in phases.values()), 3)
+                    for field in ["wall_seconds", "cpu_user_seconds", "cpu_system_seconds"]
+                },
+                "phases": phases
+            }
+
+            with open(deliverables_dir / "timings.json", "w", encoding="utf-8") as f:
+                json.dump(timings, f, indent=2, ensure_ascii=False)
+
+            self.logger.info("⏱️ " + ", ".join(
+                f"{name}: {m.get('wall_seconds', 0)}s" for name, m in phases.items()
+            ))
+
+        except Exception as e:
+            self.logger.warning(f"⚠️ تعذر كتابة timings.json: {e}")
+
+    def _with_cache(self, phase: Phase) -> Callable[[], bool]:
+        """تغليف تشغيل المرحلة بالبحث في الذاكرة المؤقتة والتخزين بعد النجاح"""
+        run = phase.run
+
+        def cached_run() -> bool:
+            key = self._phase_cache_key(phase)
+            if key and self.cache.restore(key, self.output_dir, phase.cached_artifacts):
+                self.logger.info(f"♻️ المرحلة {phase.name}: استخدام نتيجة مخزنة ({key[:12]})")
+                self._phase_succeeded(phase)
+                self._update_phase_status(phase.name, "cached")
                 return True
-            else:
-                self.logger.error(f"❌ فشل في مرحلة BUILD: {result.stderr}")
-                self._update_phase_status("build", "failed")
+
+            # إذا استُعيدت مرحلة BUILD من الذاكرة فقد لا يكون المستودع مستنسخاً
+            if "repository" in phase.consumes and not self._ensure_repository(phase.needs_history):
+                self._update_phase_status(phase.name, "failed")
                 return False
 
-        except subprocess.TimeoutExpired:
-            self.logger.error("❌ انتهت مهلة مرحلة BUILD")
-            self._update_phase_status("build", "timeout")
-            return False
-        except Exception as e:
-            self.logger.error(f"❌ خطأ في مرحلة BUILD: {e}")
-            self._update_phase_status("build", "error")
-            return False
+            if not run():
+                return False
 
-    def _run_assemble_phase(self) -> bool:
-        """تشغيل مرحلة ASSEMBLE"""
-        self.logger.info("🗺️ المرحلة 2: ASSEMBLE - تحليل المعمارية...")
+            self._phase_succeeded(phase)
+            if key:
+                self._emit(event_journal.PHASE_PROGRESS, phase=phase.name, message="تخزين النتيجة")
+                self.cache.store(key, self.output_dir, phase.cached_artifacts)
+            return True
 
+        return cached_run
+
+    def _phase_succeeded(self, phase: Phase) -> None:
+        """تسجيل مخرجات المرحلة، وتحديث مهل المراحل التالية بعد معرفة حجم المستودع"""
+        for artifact in phase.produces:
+            if (self.output_dir / artifact).exists():
+                self._emit(event_journal.ARTIFACT_PRODUCED, phase=phase.name, artifact=artifact)
+
+        if self.history and CODEBASE_ARTIFACT in phase.produces:
+            features = self._load_features()
+            if features:
+                self._apply_runtime_model(features)
+
+    def _load_features(self) -> Optional[Dict[str, float]]:
+        """خصائص المستودع من نتيجة BUILD إن وجدت"""
+        codebase = self.artifacts.get(CODEBASE_ARTIFACT)
+        if codebase is None:
+            try:
+                with open(self.output_dir / CODEBASE_ARTIFACT, "r", encoding="utf-8") as f:
+                    codebase = json.load(f)
+            except (OSError, json.JSONDecodeError):
+                return None
+
+        self.features = extract_features(codebase)
+        return self.features
+
+    def _apply_runtime_model(self, features: Optional[Dict[str, float]]) -> None:
+        """ضبط مهل المراحل من نموذج المدد السابقة"""
+        for name, phase in self.phases.items():
+            timeout = self.history.timeout_for(name, features, self.default_timeouts[name])
+            if timeout != phase.timeout:
+                self.logger.debug(f"⏱️ مهلة {name}: {phase.timeout}s → {timeout}s")
+                phase.timeout = timeout
+
+    def _log_runtime_estimate(self, dependencies: Dict[str, Set[str]], completed: Set[str]) -> None:
+        """طباعة الزمن المتوقع قبل البدء (المسار الحرج للمراحل المتبقية)"""
+        features = self.features or self.history.features_for(self.repo_url)
+        durations = {}
+        for name in self.phases:
+            prediction = self.history.predict(name, features)
+            if prediction:
+                durations[name] = prediction["seconds"]
+
+        if not durations:
+            self.logger.info("⏳ لا يوجد تاريخ تشغيل سابق لتقدير الزمن")
+            return
+
+        total = critical_path_seconds(dependencies, durations, skip=completed)
+        self.logger.info(f"⏳ الزمن المتوقع: ~{round(total)}s (" + ", ".join(
+            f"{name}: {round(seconds)}s" for name, seconds in durations.items() if name not in completed
+        ) + ")")
+
+    def _record_history(self) -> None:
+        """إضافة مدد المراحل المكتملة فعلاً (دون المستعادة من الذاكرة) ومهل الموقوفة إلى التاريخ"""
+        if not self.history:
+            return
+
+        features = self.features or self._load_features() or self.history.features_for(self.repo_url)
+
+        durations = {
+            name: metrics["wall_seconds"] for name, metrics in self.phase_metrics.items()
+            if self.phase_statuses.get(name) == "completed" and "wall_seconds" in metrics
+        }
+        # المراحل الموقوفة بالمهلة حد أدنى لمدتها، فتُرفع مهلتها في التشغيلات التالية
+        timed_out = {
+            name: self.phases[name].timeout for name, status in self.phase_statuses.items()
+            if status == "timeout" and name in self.phases and self.phases[name].timeout
+        }
+        # مدد المراحل بلا خصائص المستودع لا تفيد النموذج؛ المهل الموقوفة تبقى حدوداً دنيا
+        if not features:
+            durations, features = {}, {}
         try:
-            result = subprocess.run(
-                [
-                    sys.executable,
-                    self.scripts_dir / "assemble_architecture.py",
-                    str(self.repo_path),
-                    str(self.output_dir)
-                ],
-                capture_output=True,
-                text=True,
-                timeout=300
-            )
+            self.history.record(self.analysis_id, self.repo_url, features, durations, timed_out)
+        except OSError as e:
+            self.logger.warning(f"⚠️ تعذر تحديث تاريخ المدد: {e}")
+
+    def _ensure_repository(self, full_history: bool = False) -> bool:
+        """استنساخ المستودع إذا لم يكن موجوداً، وتعميقه إذا احتاجت المرحلة التاريخ كاملاً"""
+        with self._clone_lock:
+            if not self.repo_path.exists():
+                self.logger.info("🔄 استنساخ المستودع للمراحل غير المخزنة...")
+                self._emit(event_journal.PHASE_PROGRESS, phase="build", message="استنساخ عند الطلب")
+                if not self._run_build_step("clone"):
+                    return False
+
+            if full_history and self.clone_depth and not self._history_deepened:
+                self._emit(event_journal.PHASE_PROGRESS, phase="build", message="تعميق التاريخ")
+                if not self._run_build_step("deepen"):
+                    return False
+                self._history_deepened = True
 
-            if result.returncode == 0:
-                self._update_phase_status("assemble", "completed")
-                self.logger.info("✅ مرحلة ASSEMBLE مكتملة")
+            return True
+
+    def _run_build_step(self, step: str) -> bool:
+        """تشغيل خطوة clone أو deepen من build_analysis.py حسب وضع التنفيذ"""
+        if self.execution_mode == "inprocess":
+            analyzer = self._repository_analyzer()
+            return analyzer.clone_repository() if step == "clone" else analyzer.deepen_history()
+
+        result = run_streaming(
+            [sys.executable, self.scripts_dir / "build_analysis.py", *self._build_args(step)],
+            self.output_dir / "logs" / f"{step}.log",
+            step,
+            self.logger,
+            timeout=600
+        )
+        return result.returncode == 0
+
+    def _async_phase_runner(self, phase: Phase) -> Callable[[], Any]:
+        """دالة غير متزامنة تشغل المرحلة كعملية فرعية يشرف عليها asyncio
+
+        تُقاس هنا المدة فقط: المراحل تتشارك خيط الحلقة نفسه فلا يمكن
+        فصل استهلاك المعالج والإدخال/الإخراج لكل مرحلة.
+        """
+
+        async def run() -> bool:
+            key = self._phase_cache_key(phase)
+            if key and self.cache.restore(key, self.output_dir, phase.cached_artifacts):
+                self.logger.info(f"♻️ المرحلة {phase.name}: استخدام نتيجة مخزنة ({key[:12]})")
+                self._phase_succeeded(phase)
+                self._update_phase_status(phase.name, "cached")
+                return True
+
+            if "repository" in phase.consumes and not await self._ensure_repository_async(phase.needs_history):
+                self._update_phase_status(phase.name, "failed")
+                return False
+
+            self._emit(event_journal.PHASE_STARTED, phase=phase.name)
+            self.logger.info(f"▶️ مرحلة {phase.label}...")
+            started = time.perf_counter()
+
+            try:
+                result = await run_streaming_async(
+                    [sys.executable, self.scripts_dir / phase.script, *phase.args],
+                    self.output_dir / "logs" / f"{phase.name}.log",
+                    phase.name,
+                    self.logger,
+                    timeout=phase.timeout
+                )
+            except asyncio.TimeoutError:
+                self.logger.error(f"❌ انتهت مهلة مرحلة {phase.label}")
+                self._update_phase_status(phase.name, "timeout")
+                return False
+            except asyncio.CancelledError:
+                self._update_phase_status(phase.name, "cancelled")
+                raise
+            finally:
+                metrics = {"wall_seconds": round(time.perf_counter() - started, 3)}
+                self.phase_metrics[phase.name] = metrics
+                self._record_phase_metrics(phase.name, metrics)
+
+            if result.returncode != 0:
+                self.logger.error(f"❌ فشل في مرحلة {phase.label}: " + "\n".join(result.stderr_tail[-20:]))
+                self._update_phase_status(phase.name, "failed")
+                return False
+
+            self._update_phase_status(phase.name, "completed")
+            self.logger.info(f"✅ مرحلة {phase.label} مكتملة")
+
+            self._phase_succeeded(phase)
+            if key:
+                self.cache.store(key, self.output_dir, phase.cached_artifacts)
+            return True
+
+        return run
+
+    async def _ensure_repository_async(self, full_history: bool = False) -> bool:
+        """استنساخ المستودع وتعميقه عند الحاجة (وضع asyncio)"""
+        # المراحل في وضع asyncio تعمل في خيط واحد، فيكفي قفل asyncio
+        if self._async_clone_lock is None:
+            self._async_clone_lock = asyncio.Lock()
+
+        async with self._async_clone_lock:
+            steps = []
+            if not self.repo_path.exists():
+                self.logger.info("🔄 استنساخ المستودع للمراحل غير المخزنة...")
+                steps.append("clone")
+            if full_history and self.clone_depth and not self._history_deepened:
+                steps.append("deepen")
+
+            for step in steps:
+                self._emit(event_journal.PHASE_PROGRESS, phase="build", message=f"{step} عند الطلب")
+                result = await run_streaming_async(
+                    [sys.executable, self.scripts_dir / "build_analysis.py", *self._build_args(step)],
+                    self.output_dir / "logs" / f"{step}.log",
+                    step,
+                    self.logger,
+                    timeout=600
+                )
+                if result.returncode != 0:
+                    return False
+
+            self._history_deepened = self._history_deepened or "deepen" in steps
+            return True
+
+    def _run_phase(self, phase: str, in_process: Callable[[], bool]) -> bool:
+        """تشغيل مرحلة داخل العملية أو كعملية فرعية حسب وضع التنفيذ
+
+        في وضع التشغيل داخل العملية لا تُطبق مهلة المرحلة، لذا يبقى
+        وضع العمليات الفرعية خياراً للعزل عند الحاجة.
+        """
+        spec = self.phases[phase]
+        label = spec.label
+
+        try:
+            if self.execution_mode == "inprocess":
+                success = in_process()
+                error = "راجع السجل"
+            else:
+                # بث مخرجات العملية إلى logs/<phase>.log مع تمريرها مباشرة للسجل
+                result = run_streaming(
+                    [sys.executable, self.scripts_dir / spec.script, *spec.args],
+                    self.output_dir / "logs" / f"{phase}.log",
+                    phase,
+                    self.logger,
+                    timeout=spec.timeout
+                )
+                success = result.returncode == 0
+                error = "\n".join(result.stderr_tail[-20:])
+
+            if success:
+                self._update_phase_status(phase, "completed")
+                self.logger.info(f"✅ مرحلة {label} مكتملة")
                 return True
             else:
-                self.logger.error(f"❌ فشل في مرحلة ASSEMBLE: {result.stderr}")
-                self._update_phase_status("assemble", "failed")
+                self.logger.error(f"❌ فشل في مرحلة {label}: {error}")
+                self._update_phase_status(phase, "failed")
                 return False
 
+        except subprocess.TimeoutExpired:
+            self.logger.error(f"❌ انتهت مهلة مرحلة {label}")
+            self._update_phase_status(phase, "timeout")
+            return False
         except Exception as e:
-            self.logger.error(f"❌ خطأ في مرحلة ASSEMBLE: {e}")
-            self._update_phase_status("assemble", "error")
+            self.logger.error(f"❌ خطأ في مرحلة {label}: {e}")
+            self._update_phase_status(phase, "error")
             return False
 
+    def _run_build_phase(self) -> bool:
+        """تشغيل مرحلة BUILD"""
+        self.logger.info("🔨 المرحلة 1: BUILD - التحليل الأولي...")
+
+        return self._run_phase("build", in_process=self._build_in_process)
+
+    def _build_args(self, step: str) -> List[str]:
+        """وسائط سطر الأوامر لـ build_analysis.py"""
+        args = [self.repo_url, str(self.output_dir), self.branch, step]
+        if self.clone_cache_dir:
+            args.append(str(self.clone_cache_dir))
+        if self.clone_depth:
+            args += ["--depth", str(self.clone_depth)]
+        if self.clone_filter:
+            args += ["--filter", self.clone_filter]
+        for path in self.sparse_paths:
+            args += ["--sparse-path", path]
+        args += ["--workers", str(self.max_workers), "--inventory-mode", self.inventory_mode]
+        if self.install_cache_dir:
+            args += ["--install-cache-dir", str(self.install_cache_dir)]
+        if self.blob_counts_file:
+            args += ["--blob-counts", str(self.blob_counts_file)]
+        if self.use_existing_checkout:
+            args.append("--use-existing-checkout")
+        return args
+
+    def _repository_analyzer(self) -> "RepositoryAnalyzer":
+        """محلل المستودع بخيارات الاستنساخ الحالية"""
+        from build_analysis import RepositoryAnalyzer
+
+        return RepositoryAnalyzer(
+            self.repo_url, str(self.output_dir), self.branch, self.clone_cache_dir,
+            clone_depth=self.clone_depth, clone_filter=self.clone_filter,
+            sparse_paths=self.sparse_paths, max_workers=self.max_workers,
+            inventory_mode=self.inventory_mode, install_cache_dir=self.install_cache_dir,
+            blob_counts_file=self.blob_counts_file, use_existing_checkout=self.use_existing_checkout
+        )
+
+    def _build_in_process(self) -> bool:
+        """تنفيذ مرحلة BUILD داخل العملية"""
+        analyzer = self._repository_analyzer()
+        if not analyzer.clone_repository():
+            return False
+
+        self.artifacts[CODEBASE_ARTIFACT] = analyzer.analyze_codebase_structure()
+        self.artifacts[INVENTORY_ARTIFACT] = analyzer.inventory
+        return True
+
+    def _run_build_tests_phase(self) -> bool:
+        """تشغيل اختبارات البناء (بالتوازي مع ASSEMBLE)"""
+        self.logger.info("🧪 المرحلة 1ب: BUILD - اختبارات البناء...")
+
+        return self._run_phase("build_tests", in_process=self._build_tests_in_process)
+
+    def _build_tests_in_process(self) -> bool:
+        """تنفيذ اختبارات البناء داخل العملية"""
+        analyzer = self._repository_analyzer()
+        self.artifacts["artifacts/build/test_results.json"] = analyzer.run_build_tests()
+        return True
+
+    def _run_build_history_phase(self) -> bool:
+        """تشغيل تحليل تاريخ التعديلات (بالتوازي مع ASSEMBLE)"""
+        self.logger.info("📜 المرحلة 1ج: BUILD - تحليل التاريخ...")
+
+        return self._run_phase("build_history", in_process=self._build_history_in_process)
+
+    def _build_history_in_process(self) -> bool:
+        """تنفيذ تحليل التاريخ داخل العملية"""
+        analyzer = self._repository_analyzer()
+        self.artifacts[HISTORY_ARTIFACT] = analyzer.analyze_history()
+        return True
+
+    def _run_assemble_graph_phase(self) -> bool:
+        """تشغيل مرحلة ASSEMBLE - خريطة التبعيات"""
+        self.logger.info("🗺️ المرحلة 2: ASSEMBLE - خريطة التبعيات...")
+
+        return self._run_phase("assemble_graph", in_process=self._assemble_graph_in_process)
+
+    def _assemble_graph_in_process(self) -> bool:
+        """إنتاج خريطة التبعيات داخل العملية"""
+        from assemble_architecture import ArchitectureMapper
+
+        mapper = ArchitectureMapper(
+            str(self.repo_path), str(self.output_dir), artifacts=self.artifacts,
+            max_workers=self.max_workers, parse_cache_dir=self.parse_cache_dir,
+            layout_cache_dir=self.layout_cache_dir
+        )
+        self.artifacts["artifacts/assemble/dependency_graph.json"] = mapper.generate_dependency_graph()
+        return True
+
+    def _run_assemble_api_phase(self) -> bool:
+        """تشغيل مرحلة ASSEMBLE - واجهات API"""
+        self.logger.info("🔌 المرحلة 2ب: ASSEMBLE - تحليل واجهات API...")
+
+        return self._run_phase("assemble_api", in_process=self._assemble_api_in_process)
+
+    def _assemble_api_in_process(self) -> bool:
+        """تحليل واجهات API داخل العملية"""
+        from assemble_architecture import ArchitectureMapper
+
+        mapper = ArchitectureMapper(str(self.repo_path), str(self.output_dir), artifacts=self.artifacts)
+        self.artifacts["artifacts/assemble/api_analysis.json"] = mapper.analyze_api_interfaces()
+        return True
+
     def _run_grade_phase(self) -> bool:
         """تشغيل مرحلة GRADE"""
         self.logger.info("📊 المرحلة 3: GRADE - التقييم والتحكيم...")
 
-        try:
-            result = subprocess.run(
-                [
-                    sys.executable,
-                    self.scripts_dir / "grade_assessment.py",
-                    str(self.repo_path),
-                    str(self.output_dir)
-                ],
-                capture_output=True,
-                text=True,
-                timeout=300
-            )
+        return self._run_phase("grade", in_process=self._grade_in_process)
 
-            if result.returncode == 0:
-                self._update_phase_status("grade", "completed")
-                self.logger.info("✅ مرحلة GRADE مكتملة")
-                return True
-            else:
-                self.logger.error(f"❌ فشل في مرحلة GRADE: {result.stderr}")
-                self._update_phase_status("grade", "failed")
-                return False
+    def _grade_in_process(self) -> bool:
+        """تنفيذ مرحلة GRADE داخل العملية"""
+        from grade_assessment import QualityAssessor
 
-        except Exception as e:
-            self.logger.error(f"❌ خطأ في مرحلة GRADE: {e}")
-            self._update_phase_status("grade", "error")
-            return False
+        assessor = QualityAssessor(str(self.repo_path), str(self.output_dir), artifacts=self.artifacts)
+        report = assessor.generate_scorecard_report()
+        report["summary"]["assessment_date"] = datetime.now().isoformat()
+        assessor.save_report(report)
+
+        self.artifacts["artifacts/grade/scorecard.json"] = report
+        return True
 
     def _run_mix_phase(self) -> bool:
         """تشغيل مرحلة MIX"""
         self.logger.info("🎯 المرحلة 4: MIX - توليد الفرص الاستراتيجية...")
 
-        try:
-            result = subprocess.run(
-                [
-                    sys.executable,
-                    self.scripts_dir / "mix_opportunities.py",
-                    str(self.repo_path),
-                    str(self.output_dir)
-                ],
-                capture_output=True,
-                text=True,
-                timeout=300
-            )
+        return self._run_phase("mix", in_process=self._mix_in_process)
 
-            if result.returncode == 0:
-                self._update_phase_status("mix", "completed")
-                self.logger.info("✅ مرحلة MIX مكتملة")
-                return True
-            else:
-                self.logger.error(f"❌ فشل في مرحلة MIX: {result.stderr}")
-                self._update_phase_status("mix", "failed")
-                return False
+    def _mix_in_process(self) -> bool:
+        """تنفيذ مرحلة MIX داخل العملية"""
+        from mix_opportunities import OpportunityGenerator
 
-        except Exception as e:
-            self.logger.error(f"❌ خطأ في مرحلة MIX: {e}")
-            self._update_phase_status("mix", "error")
-            return False
+        generator = OpportunityGenerator(str(self.repo_path), str(self.output_dir), artifacts=self.artifacts)
+        opportunities = generator.generate_opportunities()
+        shortlist = generator.generate_shortlist(opportunities)
+        longlist_data, shortlist_data = generator.save_opportunities(opportunities, shortlist)
+
+        self.artifacts["artifacts/mix/opportunity_longlist.json"] = longlist_data
+        self.artifacts["artifacts/mix/opportunity_shortlist.json"] = shortlist_data
+        return True
 
     def _run_render_phase(self) -> bool:
         """تشغيل مرحلة RENDER"""
         self.logger.info("🎨 المرحلة 5: RENDER - صياغة مفاهيم المنتجات...")
 
-        try:
-            result = subprocess.run(
-                [
-                    sys.executable,
-                    self.scripts_dir / "render_concepts.py",
-                    str(self.repo_path),
-                    str(self.output_dir)
-                ],
-                capture_output=True,
-                text=True,
-                timeout=300
-            )
+        return self._run_phase("render", in_process=self._render_in_process)
 
-            if result.returncode == 0:
-                self._update_phase_status("render", "completed")
-                self.logger.info("✅ مرحلة RENDER مكتملة")
-                return True
-            else:
-                self.logger.error(f"❌ فشل في مرحلة RENDER: {result.stderr}")
-                self._update_phase_status("render", "failed")
-                return False
+    def _render_in_process(self) -> bool:
+        """تنفيذ مرحلة RENDER داخل العملية"""
+        from render_concepts import ConceptRenderer
 
-        except Exception as e:
-            self.logger.error(f"❌ خطأ في مرحلة RENDER: {e}")
-            self._update_phase_status("render", "error")
-            return False
+        renderer = ConceptRenderer(str(self.repo_path), str(self.output_dir), artifacts=self.artifacts)
+        concepts = renderer.render_top_concepts(3)
+        renderer.export_concepts(concepts)
+        return True
 
     def _run_export_phase(self) -> bool:
         """تشغيل مرحلة EXPORT"""
         self.logger.info("📦 المرحلة 6: EXPORT - تصدير التسليمات...")
 
-        try:
-            result = subprocess.run(
-                [
-                    sys.executable,
-                    self.scripts_dir / "export_deliverables.py",
-                    str(self.output_dir),
-                    self.analysis_id
-                ],
-                capture_output=True,
-                text=True,
-                timeout=300
-            )
+        return self._run_phase("export", in_process=self._export_in_process)
 
-            if result.returncode == 0:
-                self._update_phase_status("export", "completed")
-                self.logger.info("✅ مرحلة EXPORT مكتملة")
-                return True
-            else:
-                self.logger.error(f"❌ فشل في مرحلة EXPORT: {result.stderr}")
-                self._update_phase_status("export", "failed")
-                return False
+    def _export_in_process(self) -> bool:
+        """تنفيذ مرحلة EXPORT داخل العملية"""
+        from export_deliverables import DeliverablesExporter
 
-        except Exception as e:
-            self.logger.error(f"❌ خطأ في مرحلة EXPORT: {e}")
-            self._update_phase_status("export", "error")
-            return False
+        exporter = DeliverablesExporter(
+            str(self.output_dir), self.analysis_id,
+            artifacts=self.artifacts, max_workers=self.max_workers
+        )
+        exporter.export_all_deliverables()
+        return True
 
     def _update_phase_status(self, phase: str, status: str) -> None:
-        """تحديث حالة المرحلة"""
+        """تحديث حالة المرحلة (حدث إلحاقي متين لأن الاستئناف يعتمد عليه)"""
+        self.phase_statuses[phase] = status
+        self._emit(event_journal.PHASE_FINISHED, durable=True, phase=phase, status=status)
+
+    def _emit(self, event_type: str, durable: bool = False, **data: Any) -> None:
+        """إلحاق حدث بسجل الأحداث"""
+        if not self.journal:
+            return
+
         try:
-            config_path = self.output_dir / "config.json"
-            with open(config_path, 'r') as f:
-                config = json.load(f)
+            self.journal.append(event_type, durable=durable, **data)
+        except Exception as e:
+            self.logger.warning(f"⚠️ تعذر تسجيل الحدث {event_type}: {e}")
 
-            config["phases"][phase]["status"] = status
-            config["phases"][phase]["timestamp"] = datetime.now().isoformat()
+    def _load_state(self) -> Dict[str, Any]:
+        """تحميل الحالة السابقة من سجل الأحداث، أو من config.json للتحليلات الأقدم"""
+        if self.journal_path.exists():
+            return event_journal.fold_events(event_journal.read_events(str(self.journal_path)))
 
-            with open(config_path, 'w') as f:
-                json.dump(config, f, indent=2)
+        with open(self.output_dir / "config.json", "r") as f:
+            return json.load(f)
 
+    def write_config_snapshot(self) -> Dict[str, Any]:
+        """توليد config.json من سجل الأحداث عند الطلب"""
+        try:
+            return event_journal.write_snapshot(
+                str(self.journal_path), str(self.output_dir / "config.json")
+            )
         except Exception as e:
-            self.logger.warning(f"⚠️ تعذر تحديث حالة المرحلة {phase}: {e}")
+            self.logger.warning(f"⚠️ تعذر كتابة لقطة config.json: {e}")
+            return {}
 
 def main():
     """الدالة الرئيسية"""
@@ -357,8 +987,7 @@ def main():
 
     parser.add_argument(
         "--repo-url",
-        required=True,
-        help="رابط المستودع للتحليل"
+        help="رابط المستودع للتحليل (مطلوب إلا عند الاستئناف)"
     )
 
     parser.add_argument(
@@ -372,6 +1001,122 @@ def main():
         help="مجلد النتائج (افتراضي: analysis_[timestamp])"
     )
 
+    parser.add_argument(
+        "--execution-mode",
+        choices=EXECUTION_MODES,
+        default="inprocess",
+        help="وضع تنفيذ المراحل: داخل العملية (أسرع) أو عمليات فرعية منفصلة (عزل أكبر) "
+             "أو عمليات فرعية يشرف عليها asyncio (إلغاء فوري عند أول فشل)"
+    )
+
+    parser.add_argument(
+        "--deadline",
+        type=float,
+        help="المهلة الإجمالية للتحليل بالثواني (وضع asyncio)"
+    )
+
+    parser.add_argument(
+        "--max-workers",
+        type=int,
+        help="الحد الأقصى للمراحل المتوازية (افتراضي: عدد الأنوية)"
+    )
+
+    parser.add_argument(
+        "--cache-dir",
+        default=str(DEFAULT_CACHE_DIR),
+        help=f"مجلد الذاكرة المؤقتة لنتائج المراحل (افتراضي: {DEFAULT_CACHE_DIR})"
+    )
+
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="تعطيل الذاكرة المؤقتة لنتائج المراحل"
+    )
+
+    parser.add_argument(
+        "--clone-cache-dir",
+        help="مجلد مرايا Git محلية مشتركة لتسريع الاستنساخ"
+    )
+
+    parser.add_argument(
+        "--install-cache-dir",
+        default=str(DEFAULT_INSTALL_CACHE_DIR),
+        help=f"ذاكرة تثبيت التبعيات معنونة بملفات القفل (افتراضي: {DEFAULT_INSTALL_CACHE_DIR})"
+    )
+
+    parser.add_argument(
+        "--no-install-cache",
+        action="store_true",
+        help="تثبيت التبعيات من جديد في كل تشغيل"
+    )
+
+    parser.add_argument(
+        "--clone-depth",
+        type=int,
+        help="استنساخ سطحي بعدد التزامات محدد (يُعمّق عند الحاجة)"
+    )
+
+    parser.add_argument(
+        "--clone-filter",
+        help="استنساخ جزئي دون كائنات غير مطلوبة، مثل blob:none"
+    )
+
+    parser.add_argument(
+        "--sparse-path",
+        action="append",
+        help="قصر شجرة العمل على مسار محدد (sparse checkout، قابل للتكرار)"
+    )
+
+    parser.add_argument(
+        "--inventory-mode",
+        choices=INVENTORY_MODES,
+        default="auto",
+        help="مصدر جرد الملفات: فهرس git للملفات المتتبعة فقط أو المرور على القرص (افتراضي: auto)"
+    )
+
+    parser.add_argument(
+        "--history-file",
+        default=str(DEFAULT_HISTORY_FILE),
+        help=f"سجل مدد المراحل لتقدير الزمن وضبط المهل (افتراضي: {DEFAULT_HISTORY_FILE})"
+    )
+
+    parser.add_argument(
+        "--no-history",
+        action="store_true",
+        help="استخدام المهل الثابتة دون تاريخ التشغيلات"
+    )
+
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="استئناف تحليل فاشل في --output-dir من أول مرحلة غير مكتملة"
+    )
+
+    parser.add_argument(
+        "--daemon",
+        action="store_true",
+        help="تشغيل خادم تحليل طويل التشغيل يستقبل المهام بدلاً من تحليل واحد"
+    )
+
+    parser.add_argument(
+        "--listen",
+        default="127.0.0.1:8765",
+        help="عنوان الخادم: host:port أو unix:/path/to/socket (افتراضي: 127.0.0.1:8765)"
+    )
+
+    parser.add_argument(
+        "--daemon-workers",
+        type=int,
+        default=1,
+        help="عدد المهام المتزامنة في وضع الخادم (افتراضي: 1)"
+    )
+
+    parser.add_argument(
+        "--jobs-root",
+        default="./analysis_jobs",
+        help="المجلد الجذر لنتائج مهام الخادم (افتراضي: ./analysis_jobs)"
+    )
+
     parser.add_argument(
         "--verbose",
         action="store_true",
@@ -380,6 +1125,26 @@ def main():
 
     args = parser.parse_args()
 
+    if args.daemon:
+        from analysis_daemon import AnalysisDaemon, serve
+
+        serve(args.listen, AnalysisDaemon(
+            jobs_root=args.jobs_root,
+            workers=args.daemon_workers,
+            execution_mode=args.execution_mode,
+            max_workers=args.max_workers,
+            cache_dir=None if args.no_cache else args.cache_dir,
+            clone_cache_dir=args.clone_cache_dir,
+            history_file=None if args.no_history else args.history_file,
+            install_cache_dir=None if args.no_install_cache else args.install_cache_dir
+        ))
+        sys.exit(0)
+
+    if args.resume and not args.output_dir:
+        parser.error("--resume يتطلب --output-dir لتحليل سابق")
+    if not args.resume and not args.repo_url:
+        parser.error("--repo-url مطلوب")
+
     if args.verbose:
         logging.getLogger().setLevel(logging.DEBUG)
 
@@ -387,7 +1152,19 @@ def main():
     runner = FullAnalysisRunner(
         repo_url=args.repo_url,
         branch=args.branch,
-        output_dir=args.output_dir
+        output_dir=args.output_dir,
+        execution_mode=args.execution_mode,
+        max_workers=args.max_workers,
+        cache_dir=None if args.no_cache else args.cache_dir,
+        resume=args.resume,
+        clone_cache_dir=args.clone_cache_dir,
+        deadline=args.deadline,
+        history_file=None if args.no_history else args.history_file,
+        clone_depth=args.clone_depth,
+        clone_filter=args.clone_filter,
+        sparse_paths=args.sparse_path,
+        inventory_mode=args.inventory_mode,
+        install_cache_dir=None if args.no_install_cache else args.install_cache_dir
     )
 
     success = runner.run_complete_analysis()
@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+# script: runtime_history.py
+
+import json
+import math
+from pathlib import Path
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Set
+
+# خصائص المستودع التي يعتمد عليها نموذج المدة
+FEATURES = ["files", "loc", "dependencies"]
+
+# أقل عدد من التشغيلات السابقة لمرحلة قبل استخدام الانحدار
+MIN_SAMPLES = 5
+
+# هامش الأمان: ضعف المدة المتوقعة أو ثلاثة انحرافات، مع مهلة إضافية ثابتة
+SAFETY_FACTOR = 2.0
+RESIDUAL_MARGIN = 3.0
+SLACK_SECONDS = 60
+
+MIN_TIMEOUT = 60
+MAX_TIMEOUT = 4 * 3600
+
+# معامل التنظيم (ridge) لتجنب المعاملات المتطرفة مع عينات قليلة
+RIDGE = 1e-3
+
+def extract_features(codebase: Dict[str, Any]) -> Dict[str, float]:
+    """استخراج خصائص المستودع من codebase_analysis.json"""
+    line_counts = codebase.get("line_counts") or {}
+    loc = line_counts.get("SUM", {}).get("code", 0) if isinstance(line_counts, dict) else 0
+
+    return {
+        "files": float(codebase.get("directory_structure", {}).get("total_files", 0)),
+        "loc": float(loc or 0),
+        "dependencies": float(codebase.get("dependencies", {}).get("total_dependencies", 0))
+    }
+
+def _solve(matrix: List[List[float]], vector: List[float]) -> List[float]:
+    """حل نظام خطي صغير بالحذف الغاوسي مع اختيار المحور"""
+    n = len(vector)
+    rows = [matrix[i][:] + [vector[i]] for i in range(n)]
+
+    for col in range(n):
+        pivot = max(range(col, n), key=lambda r: abs(rows[r][col]))
+        rows[col], rows[pivot] = rows[pivot], rows[col]
+        if abs(rows[col][col]) < 1e-12:
+            raise ValueError("نظام منفرد")
+
+        for r in range(n):
+            if r != col:
+                factor = rows[r][col] / rows[col][col]
+                rows[r] = [a - factor * b for a, b in zip(rows[r], rows[col])]
+
+    return [rows[i][n] / rows[i][i] for i in range(n)]
+
+class PhaseModel:
+    """نموذج خطي لمدة مرحلة: المدة ≈ a + Σ bᵢ·خاصيةᵢ"""
+
+    def __init__(self, samples: List[Dict[str, Any]]):
+        # تطبيع الخصائص بمتوسطها حتى يكون للتنظيم معنى موحد
+        self.scales = {
+            name: max(sum(s["features"].get(name, 0) for s in samples) / len(samples), 1.0)
+            for name in FEATURES
+        }
+
+        rows = [self._row(s["features"]) for s in samples]
+        targets = [s["seconds"] for s in samples]
+        size = len(FEATURES) + 1
+
+        gram = [[sum(r[i] * r[j] for r in rows) + (RIDGE if i == j and i else 0.0)
+                 for j in range(size)] for i in range(size)]
+        moments = [sum(r[i] * t for r, t in zip(rows, targets)) for i in range(size)]
+        self.coefficients = _solve(gram, moments)
+
+        residuals = [t - self.predict(s["features"]) for s, t in zip(samples, targets)]
+        self.rmse = math.sqrt(sum(e * e for e in residuals) / len(residuals))
+
+    def _row(self, features: Dict[str, float]) -> List[float]:
+        return [1.0] + [features.get(name, 0) / self.scales[name] for name in FEATURES]
+
+    def predict(self, features: Dict[str, float]) -> float:
+        return max(sum(c * x for c, x in zip(self.coefficients, self._row(features))), 0.0)
+
+class RuntimeHistory:
+    """سجل محلي لمدد المراحل مع خصائص المستودع (JSONL، سطر لكل تحليل)
+
+    يُستخدم لتقدير زمن التحليل قبل بدئه وضبط مهل المراحل بدلاً من القيم
+    الثابتة. تُلحق التشغيلات بسطر واحد فيبقى الملف آمناً مع الدفعات المتوازية.
+    """
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self._records: Optional[List[Dict[str, Any]]] = None
+        self._models: Dict[str, Optional[PhaseModel]] = {}
+
+    def records(self) -> List[Dict[str, Any]]:
+        """قراءة التشغيلات السابقة مع تجاهل الأسطر التالفة"""
+        if self._records is None:
+            self._records = []
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    for line in f:
+                        try:
+                            self._records.append(json.loads(line))
+                        except json.JSONDecodeError:
+                            continue
+            except FileNotFoundError:
+                pass
+        return self._records
+
+    def record(self, analysis_id: str, repo_url: str, features: Dict[str, float],
+               durations: Dict[str, float], timed_out: Optional[Dict[str, float]] = None) -> None:
+        """إلحاق مدد المراحل المكتملة لتحليل واحد
+
+        timed_out مهل المراحل التي أُوقفت قبل اكتمالها: حدود دنيا لمدتها الفعلية.
+        """
+        if not durations and not timed_out:
+            return
+
+        entry = {
+            "analysis_id": analysis_id,
+            "repo_url": repo_url,
+            "timestamp": datetime.now().isoformat(),
+            "features": features,
+            "phases": durations
+        }
+        if timed_out:
+            entry["timed_out"] = timed_out
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+        self.records().append(entry)
+        self._models.clear()
+
+    def features_for(self, repo_url: str) -> Optional[Dict[str, float]]:
+        """خصائص آخر تحليل للمستودع نفسه (تقدير مبدئي قبل مرحلة BUILD)"""
+        for entry in reversed(self.records()):
+            if entry.get("repo_url") == repo_url and entry.get("features"):
+                return entry["features"]
+        return None
+
+    def _samples(self, phase: str) -> List[Dict[str, Any]]:
+        return [
+            {"features": entry.get("features", {}), "seconds": entry["phases"][phase]}
+            for entry in self.records() if phase in entry.get("phases", {})
+        ]
+
+    def _lower_bound(self, phase: str, features: Optional[Dict[str, float]]) -> float:
+        """أطول مهلة أُوقفت عندها المرحلة في مستودع لا يكبر هذا المستودع
+
+        بلا خصائص تُعتبر كل المهل السابقة، فالمرحلة قد تستغرق على الأقل هذه المدة.
+        """
+        bound = 0.0
+        for entry in self.records():
+            seconds = entry.get("timed_out", {}).get(phase)
+            if seconds is None:
+                continue
+            if features is None:
+                bound = max(bound, seconds)
+                continue
+            recorded = entry.get("features") or {}
+            # مهلة مستودع مجهول الخصائص لا تُعمم إلا على مستودع مجهول أيضاً
+            if recorded and all(recorded.get(name, 0) <= features.get(name, 0) for name in FEATURES):
+                bound = max(bound, seconds)
+        return bound
+
+    def _within_range(self, phase: str, features: Optional[Dict[str, float]]) -> bool:
+        """هل تقع الخصائص ضمن مدى العينات المسجلة (النموذج الخطي لا يُستقرأ خارجه)"""
+        samples = self._samples(phase)
+        if not features or not samples:
+            return False
+        for name in FEATURES:
+            values = [s["features"].get(name, 0) for s in samples]
+            if not min(values) <= features.get(name, 0) <= max(values):
+                return False
+        return True
+
+    def _model(self, phase: str) -> Optional[PhaseModel]:
+        if phase not in self._models:
+            samples = self._samples(phase)
+            try:
+                self._models[phase] = PhaseModel(samples) if len(samples) >= MIN_SAMPLES else None
+            except ValueError:
+                self._models[phase] = None
+        return self._models[phase]
+
+    def predict(self, phase: str, features: Optional[Dict[str, float]]) -> Optional[Dict[str, float]]:
+        """المدة المتوقعة للمرحلة وخطؤها المعتاد، أو None بلا تاريخ
+
+        لا تقل المدة عن الحد الأدنى المعروف من المهل التي أُوقفت عندها المرحلة.
+        """
+        samples = self._samples(phase)
+        bound = self._lower_bound(phase, features)
+        if not samples:
+            return {"seconds": bound, "rmse": 0.0} if bound else None
+
+        model = self._model(phase)
+        if model and features:
+            return {"seconds": max(model.predict(features), bound), "rmse": model.rmse}
+
+        # عينات قليلة أو خصائص غير معروفة: أسوأ مدة مسجلة كتقدير متحفظ
+        return {"seconds": max(max(s["seconds"] for s in samples), bound), "rmse": 0.0}
+
+    def timeout_for(self, phase: str, features: Optional[Dict[str, float]],
+                    default: Optional[float]) -> Optional[float]:
+        """مهلة المرحلة من النموذج مع هامش أمان، أو المهلة الافتراضية بلا تاريخ
+
+        التاريخ يخفض المهلة تحت الافتراضية فقط لمستودع معروف الخصائص ضمن مدى
+        العينات المسجلة؛ خارجه أو بلا خصائص تبقى الافتراضية حداً أدنى.
+        """
+        prediction = self.predict(phase, features)
+        if not prediction:
+            return default
+
+        seconds = prediction["seconds"]
+        timeout = max(seconds * SAFETY_FACTOR, seconds + RESIDUAL_MARGIN * prediction["rmse"]) + SLACK_SECONDS
+        if default is not None and not self._within_range(phase, features):
+            timeout = max(timeout, default)
+        return round(min(max(timeout, MIN_TIMEOUT), MAX_TIMEOUT))
+
+def critical_path_seconds(dependencies: Dict[str, Set[str]], durations: Dict[str, float],
+                          skip: Optional[Set[str]] = None) -> float:
+    """طول المسار الحرج: الزمن المتوقع للتشغيل المتوازي الكامل"""
+    skip = skip or set()
+    finish: Dict[str, float] = {}
+
+    def finish_time(name: str) -> float:
+        if name not in finish:
+            start = max((finish_time(dep) for dep in dependencies.get(name, ())), default=0.0)
+            finish[name] = start + (0.0 if name in skip else durations.get(name, 0.0))
+        return finish[name]
+
+    return max((finish_time(name) for name in dependencies), default=0.0)
@@ -0,0 +1,32 @@
+#!/usr/bin/env python3
+# script: test_line_counter.py
+
+import unittest
+
+from line_counter import LANGUAGES, classify_lines
+
+class ClassifyLinesTest(unittest.TestCase):
+    """رموز التعليق داخل السلاسل النصية لا تُعد تعليقاً"""
+
+    def test_block_comment_token_inside_string(self):
+        source = 'const a = "/*";\nconst b = 1;\nconst c = 2;\n'
+        self.assertEqual(classify_lines(source, LANGUAGES[".js"]), (0, 0, 3))
+
+    def test_glob_inside_string(self):
+        source = "export default [\n  { files: ['**/*.{ts,tsx}'] },\n];\n"
+        self.assertEqual(classify_lines(source, LANGUAGES[".ts"]), (0, 0, 3))
+
+    def test_escaped_quote(self):
+        source = 's = "a\\"/*"; // comment\n/* real */\n'
+        self.assertEqual(classify_lines(source, LANGUAGES[".js"]), (0, 1, 1))
+
+    def test_template_literal_spans_lines(self):
+        source = "const t = `a\n// not a comment\n`;\n// comment\n"
+        self.assertEqual(classify_lines(source, LANGUAGES[".ts"]), (0, 1, 3))
+
+    def test_python_strings_and_docstrings(self):
+        source = 'x = "#"\n# comment\n"""doc\nstring"""\ny = 1\n'
+        self.assertEqual(classify_lines(source, LANGUAGES[".py"]), (0, 3, 2))
+
+if __name__ == "__main__":
+    unittest.main()
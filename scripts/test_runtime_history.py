@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+# script: test_runtime_history.py
+
+import os
+import tempfile
+import unittest
+
+from runtime_history import RuntimeHistory
+
+SMALL = {"files": 10, "loc": 100, "dependencies": 1}
+LARGE = {"files": 20000, "loc": 3000000, "dependencies": 500}
+
+class RuntimeHistoryTest(unittest.TestCase):
+    """التقدير والمهل بلا خصائص المستودع ومع مراحل موقوفة بالمهلة"""
+
+    def setUp(self):
+        handle, self.path = tempfile.mkstemp(suffix=".jsonl")
+        os.close(handle)
+        self.history = RuntimeHistory(self.path)
+
+    def tearDown(self):
+        os.remove(self.path)
+
+    def test_no_history_keeps_default(self):
+        self.assertIsNone(self.history.predict("build", None))
+        self.assertEqual(self.history.timeout_for("build", None, 600), 600)
+
+    def test_timed_out_phase_without_features(self):
+        self.history.record("a", "u1", SMALL, {}, {"build": 600})
+        self.assertEqual(self.history.predict("build", None)["seconds"], 600)
+        self.assertGreater(self.history.timeout_for("build", None, 600), 600)
+
+    def test_unknown_features_never_below_default(self):
+        for i in range(6):
+            features = {"files": 100 + i * 10, "loc": 5000 + i * 500, "dependencies": 20 + i}
+            self.history.record(f"a{i}", "u", features, {"assemble_graph": 10})
+        self.assertEqual(self.history.timeout_for("assemble_graph", None, 300), 300)
+        self.assertEqual(self.history.timeout_for("assemble_graph", LARGE, 300), 300)
+
+    def test_timeout_applies_to_larger_repositories_only(self):
+        self.history.record("a", "u1", LARGE, {}, {"build": 600})
+        self.assertIsNone(self.history.predict("build", SMALL))
+        self.assertEqual(self.history.predict("build", LARGE)["seconds"], 600)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -6,6 +6,9 @@ import sys
 import json
 from typing import Dict, List, Tuple
 
+# الأدوات التي يفشل التحقق بدونها
+CRITICAL_TOOLS = ["git", "python", "node"]
+
 class RequirementsVerifier:
     """فئة للتحقق من توفر الأدوات والمتطلبات اللازمة"""
 
@@ -86,22 +89,29 @@ class RequirementsVerifier:
 
         return json.dumps(report, indent=2, ensure_ascii=False)
 
-if __name__ == "__main__":
-    verifier = RequirementsVerifier()
-    results = verifier.verify_all()
+    def run(self, report_path: str = "verification_report.json") -> bool:
+        """تشغيل التحقق الكامل وحفظ التقرير"""
+        results = self.verify_all()
 
-    report = verifier.generate_report(results)
+        report = self.generate_report(results)
 
-    # حفظ التقرير
-    with open("verification_report.json", "w", encoding="utf-8") as f:
-        f.write(report)
+        # حفظ التقرير
+        with open(report_path, "w", encoding="utf-8") as f:
+            f.write(report)
 
-    print(f"\n📊 تم حفظ تقرير التحقق في: verification_report.json")
+        print(f"\n📊 تم حفظ تقرير التحقق في: {report_path}")
 
-    # الخروج بحالة خطأ إذا فشل أي تحقق أساسي
-    critical_tools = ["git", "python", "node"]
-    if not all(results.get(tool, False) for tool in critical_tools):
-        print("❌ فشل في التحقق من الأدوات الأساسية")
-        sys.exit(1)
+        # فشل التحقق إذا غابت أي أداة أساسية
+        if not all(results.get(tool, False) for tool in CRITICAL_TOOLS):
+            print("❌ فشل في التحقق من الأدوات الأساسية")
+            return False
+
+        print("✅ تم التحقق بنجاح من جميع المتطلبات")
+        return True
 
-    print("✅ تم التحقق بنجاح من جميع المتطلبات")
\ No newline at end of file
+if __name__ == "__main__":
+    verifier = RequirementsVerifier()
+
+    # الخروج بحالة خطأ إذا فشل أي تحقق أساسي
+    if not verifier.run():
+        sys.exit(1)
\ No newline at end of file